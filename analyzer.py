@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+八字分析引擎：bazi.py 中计算部分的无全局状态版本。
+
+bazi.py 在模块级解析命令行、把命盘放在全局变量里并边算边打印，
+只能每个命盘起一个解释器。ChartAnalyzer 把同样的计算封装成可导入的
+API，接受四柱或出生时间，每次调用返回一个新的 Chart，可在同一进程内
+反复调用。Chart 是 namedtuple，但其中的十神、分数等字段是普通的列表
+和字典，调用方修改它们不会影响其它命盘。
+
+    >>> from analyzer import ChartAnalyzer
+    >>> chart = ChartAnalyzer().analyze_pillars("庚午 辛巳 壬午 甲辰")
+    >>> chart.scores["火"], chart.strong
+    (20, 18)
+"""
+
+import collections
+import datetime
+
+from ganzhi import Gan, Zhi
+from gzcore import *
+from scoring import score_signature, signature
+
+Gans = collections.namedtuple("Gans", "year month day time")
+Zhis = collections.namedtuple("Zhis", "year month day time")
+
+Chart = collections.namedtuple("Chart", [
+    "gans",         # Gans 四柱天干
+    "zhis",         # Zhis 四柱地支
+    "me",           # 日主
+    "is_female",
+    "gan_shens",    # 天干十神，日主位置为 '--'
+    "zhi_shens",    # 地支主气十神
+    "zhi_shens2",   # 地支所有藏干十神，平铺
+    "zhi_shen3",    # 每个地支藏干十神拼成的字符串
+    "shens",        # gan_shens + zhi_shens
+    "shens2",       # gan_shens + zhi_shens2
+    "me_status",    # 日主在四支的十二长生
+    "scores",       # 五行分数
+    "gan_scores",   # 十天干分数
+    "weak",         # 子平真诠：无强根
+    "strong",       # 比劫印枭分数之和，中值29
+    "direction",    # 大运顺逆 1/-1
+    "dayuns",       # 十二步大运干支
+    "nayins",       # 四柱纳音
+    "empties",      # 日柱空亡的两个地支
+    "lunar",        # lunar_python 的 Lunar 对象，仅按出生时间排盘时有值
+])
+
+
+class ChartAnalyzer:
+    """Stateless chart analyzer.
+
+    An instance carries no chart data, so one analyzer can be shared by
+    threads or reused for any number of charts.
+    """
+
+    def analyze(self, gans, zhis, is_female=False, lunar=None):
+        """Analyze a chart given its four stems and four branches."""
+        gans = Gans(*gans)
+        zhis = Zhis(*zhis)
+        me = gans.day
+        gan_codes, zhi_codes = encode(gans, zhis)
+        me_row = gan_codes[2] * 10
+
+        gan_shens = [TEN_GODS[me_row + item] for item in gan_codes]
+        gan_shens[2] = '--'
+
+        zhi_shens = [TEN_GODS[me_row + MAIN_STEM[item]] for item in zhi_codes] # 地支的主气神
+        shens = gan_shens + zhi_shens
+
+        zhi_shens2 = [] # 地支的所有神，包含余气和尾气, 混合在一起
+        zhi_shen3 = [] # 地支所有神，字符串格式
+        for item in zhi_codes:
+            tmp = [TEN_GODS[me_row + gan] for gan in HIDDEN_STEMS[item]]
+            zhi_shens2.extend(tmp)
+            zhi_shen3.append(''.join(tmp))
+        shens2 = gan_shens + zhi_shens2
+
+        # 计算五行分数 http://www.131.com.tw/word/b3_2_14.htm
+        points = score_signature(signature(gans, zhis))
+        scores = dict(zip(ELEMENTS, points.elements))
+        gan_scores = dict(zip(Gan, points.gans))
+
+        # 计算八字强弱
+        # 子平真诠的计算
+        me_status = [LIFE_STAGES[gan_codes[2] * 12 + item] for item in zhi_codes]
+        weak = not any(item in ('长', '帝', '建') for item in me_status)
+
+        if weak:
+            if shens.count('比') + me_status.count('库') >2:
+                weak = False
+
+        # 网上的计算：比劫印枭分数之和
+        strong = points.strong
+
+        direction = get_direction(gans.year, is_female)
+
+        return Chart(
+            gans=gans, zhis=zhis, me=me, is_female=is_female,
+            gan_shens=gan_shens, zhi_shens=zhi_shens, zhi_shens2=zhi_shens2,
+            zhi_shen3=zhi_shen3, shens=shens, shens2=shens2, me_status=me_status,
+            scores=scores, gan_scores=gan_scores, weak=weak, strong=strong,
+            direction=direction, dayuns=get_dayuns(gans.month, zhis.month, direction),
+            nayins=[NAYIN[pillar_code(*item)] for item in zip(gan_codes, zhi_codes)],
+            empties=tuple(Zhi[item] for item in KONGWANG[pillar_code(gan_codes[2], zhi_codes[2])]),
+            lunar=lunar)
+
+    def analyze_pillars(self, pillars, is_female=False):
+        """Analyze a chart given as "甲子 丙寅 戊辰 庚午" or four 2-char strings."""
+        if isinstance(pillars, str):
+            pillars = pillars.split()
+        if len(pillars) != 4 or any(len(item) != 2 for item in pillars):
+            raise ValueError("need four pillars such as '甲子 丙寅 戊辰 庚午': {!r}".format(pillars))
+        return self.analyze([item[0] for item in pillars], [item[1] for item in pillars],
+                            is_female=is_female)
+
+    def analyze_birth(self, year, month, day, hour, minute=0, is_female=False,
+                      use_lunar=False, leap=False):
+        """Analyze a chart from a birth time, solar (公历) by default.
+
+        With ``use_lunar`` the date is read as a lunar date, and ``leap``
+        marks a leap month, the same as ``bazi.py`` without ``-g`` and
+        with ``-r``.
+        """
+        from lunar_python import Lunar, Solar
+
+        if use_lunar:
+            month_ = month * -1 if leap else month
+            lunar = Lunar.fromYmdHms(year, month_, day, hour, minute, 0)
+        else:
+            lunar = Solar.fromYmdHms(year, month, day, hour, minute, 0).getLunar()
+
+        ba = lunar.getEightChar()
+        gans = Gans(year=ba.getYearGan(), month=ba.getMonthGan(), day=ba.getDayGan(), time=ba.getTimeGan())
+        zhis = Zhis(year=ba.getYearZhi(), month=ba.getMonthZhi(), day=ba.getDayZhi(), time=ba.getTimeZhi())
+        return self.analyze(gans, zhis, is_female=is_female, lunar=lunar)
+
+    def analyze_datetime(self, dt, is_female=False):
+        """Analyze a chart from a solar ``datetime.datetime``."""
+        if not isinstance(dt, datetime.datetime):
+            raise TypeError("expected datetime.datetime, got {}".format(type(dt).__name__))
+        return self.analyze_birth(dt.year, dt.month, dt.day, dt.hour, dt.minute,
+                                  is_female=is_female)
+
+
+def get_direction(year_gan, is_female=False):
+    """大运方向：阳男阴女顺行，阴男阳女逆行。"""
+    seq = GAN_INDEX[year_gan]
+    if is_female:
+        return -1 if seq % 2 == 0 else 1
+    return 1 if seq % 2 == 0 else -1
+
+
+def get_dayuns(month_gan, month_zhi, direction, count=12):
+    """从月柱按方向排出 count 步大运。"""
+    start = pillar_code(GAN_INDEX[month_gan], ZHI_INDEX[month_zhi])
+    return [PILLARS[(start + direction * i) % 60] for i in range(1, count + 1)]
@@ -14,7 +14,15 @@ netlify_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify
 sys.path.insert(0, netlify_path)
 
 # Import netlify functions
-from bazi_utils import generate_random_bazi, detect_all_relationships
+from bazi_utils import parse_seed
+from chart_pool import generate_game, get_pool
+from difficulty_index import draw_game, parse_query
+from game_sessions import check_request, create_session
+from new_games import new_games as new_games_body
+from catalog import catalog_headers
+from relation_catalog import compact_game, entries
+from daily import daily_response
+from daily_puzzles import entry_json, parse_date
 
 app = Flask(__name__)
 CORS(app)
@@ -45,83 +53,93 @@ def new_game():
         settings = DEFAULT_SETTINGS.copy()
         settings.update(custom_settings)
         
-        # Generate a new Bazi chart
-        chart = generate_random_bazi(advanced_mode)
+        try:
+            seed = parse_seed(data['seed']) if data.get('seed') is not None else None
+            query = parse_query(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        # Detect all possible relationships
-        all_relationships = detect_all_relationships(chart, settings)
+        if seed is not None:
+            # Replay a chart from its seed instead of taking a random one
+            chart, all_relationships = generate_game(advanced_mode, settings, seed)
+        elif query:
+            # Difficulty / relationship type conditions: a random chart from the matching bucket
+            try:
+                chart, all_relationships = draw_game(advanced_mode, settings, query)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except LookupError as e:
+                return jsonify({'error': str(e)}), 404
+        else:
+            # Take a ready chart with its relationships from the pool (generated inline if empty)
+            chart, all_relationships = get_pool().get(advanced_mode, settings)
+        session = create_session(chart, all_relationships, settings=settings)
+        if data.get('compact'):
+            return jsonify(compact_game(chart, all_relationships, session))
         
         return jsonify({
             'chart': chart,
-            'all_relationships': all_relationships
+            'all_relationships': all_relationships,
+            'session': session
         })
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/new_games', methods=['POST'])
+def new_games():
+    """Start several games at once for prefetching - local version of netlify function"""
+    try:
+        status, body = new_games_body(request.get_json() or {})
+        return jsonify(body), status
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/catalog')
+def catalog():
+    """Relationship description catalog for compact payloads"""
+    status, headers = catalog_headers(request.args, request.headers)
+    response = jsonify(entries()) if status == 200 else app.response_class(status=304)
+    response.headers.update(headers)
+    return response
+
+@app.route('/api/daily')
+def daily():
+    """Today's (or ?date=) daily puzzle - local version of netlify function"""
+    status, headers, body = daily_response(request.args)
+    return app.response_class(body, status=status, headers=headers, mimetype='application/json')
+
+@app.route('/daily/<date>.json')
+def daily_file(date):
+    """Static daily puzzle file, generated on the fly when the build hasn't written it"""
+    try:
+        parse_date(date)
+    except ValueError:
+        return jsonify({'error': 'Not found'}), 404
+    if os.path.exists(os.path.join('daily', date + '.json')):
+        return send_from_directory('daily', date + '.json')
+    return app.response_class(entry_json(parse_date(date)), mimetype='application/json')
+
+@app.route('/packs/<path:name>')
+def chart_pack(name):
+    """Offline chart packs written by netlify/functions/chart_packs.py"""
+    if name.endswith('.gz'):
+        return send_from_directory('packs', name, mimetype='application/gzip')
+    return send_from_directory('packs', name)
+
+@app.route('/api/pool_stats')
+def pool_stats():
+    """Chart pool counters and queue sizes"""
+    return jsonify(get_pool().stats())
+
 @app.route('/api/check_relationship', methods=['POST'])
 def check_relationship():
     """Check a relationship - local version of netlify function"""
     try:
         data = request.get_json() or {}
-        positions = data.get('positions', [])
-        chart = data.get('chart')
-        all_relationships = data.get('all_relationships', [])
-        found_relationships = data.get('found_relationships', [])
-        
-        # Basic validation
-        if not all([chart, positions]):
-            return jsonify({'error': 'Missing required data: chart and positions.'}), 400
-        
-        if len(positions) < 2 or len(positions) > 3:
-            return jsonify({'error': 'Invalid number of positions selected'}), 400
-
-        # Normalize positions for comparison
-        sorted_positions = sorted(positions)
-        
-        # Check if this exact combination of positions has already been found
-        for rel in found_relationships:
-            if sorted(rel.get('actual_positions', [])) == sorted_positions:
-                return jsonify({'found': False, 'message': 'This relationship has already been found.'})
-
-        # Find a matching relationship from the pre-calculated list
-        found_match = None
-        for rel in all_relationships:
-            # We must match the characters because positions might differ if zhis are duplicated
-            selected_chars = []
-            num_pillars = 6 if chart.get('advanced_mode') else 4
-            gans = chart.get('gans', [])
-            zhis = chart.get('zhis', [])
-
-            for pos in sorted_positions:
-                if pos >= num_pillars: # This is a zhi position
-                    selected_chars.append(zhis[pos - num_pillars])
-                else: # This is a gan position
-                    selected_chars.append(gans[pos])
-
-            # Check if the selected characters match the relationship's characters
-            if sorted(rel['characters']) == sorted(selected_chars):
-                # Check if this EXACT combination of positions has been found before
-                # For duplicates like 甲庚庚, [0,1] and [0,2] are different relationships
-                is_already_found = False
-                for found_rel in found_relationships:
-                    if (found_rel['type'] == rel['type'] and 
-                        sorted(found_rel.get('actual_positions', found_rel['positions'])) == sorted_positions):
-                        is_already_found = True
-                        break
-                
-                if not is_already_found:
-                    found_match = rel
-                    break
-
-        if found_match:
-            # Add the actual positions from user selection to the found relationship
-            response_rel = found_match.copy()
-            response_rel['actual_positions'] = sorted_positions
-
-            return jsonify({'found': True, 'relationship': response_rel})
-        else:
-            return jsonify({'found': False, 'message': 'No valid relationship found for the selection.'})
+        status, body = check_request(data)
+        return jsonify(body), status
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
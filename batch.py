@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量排盘：python bazi.py batch rows.jsonl -o charts.jsonl
+
+Each input row is analysed by a warm pool of worker processes, one per
+core by default, instead of one `python bazi.py` process per record.
+
+Input is JSONL or CSV (chosen by file extension or --format). A row has
+either the birth time fields
+
+    year, month, day, hour[, minute][, female][, lunar][, leap]
+
+where lunar/leap mean the same as bazi.py without -g and with -r, or a
+`pillars` field such as "庚午 辛巳 壬午 甲辰". Any `id` column is copied
+to the output. Output is one JSON object per line; rows that fail carry
+an `error` field instead of the chart. Throughput is reported on stderr.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from analyzer import ChartAnalyzer
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 't')
+
+_analyzer = None
+
+
+def _init_worker():
+    """Build the analyzer and import lunar_python once per worker."""
+    global _analyzer
+    import lunar_python
+    _analyzer = ChartAnalyzer()
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_VALUES
+    return bool(value)
+
+
+def analyze_row(row, analyzer=None):
+    """Analyse one input row and return the output row as a dict.
+
+    A row is a dict, or the text of a JSONL line, which is parsed here so
+    that a malformed line becomes an error row like any other failure.
+    """
+    analyzer = analyzer or _analyzer or ChartAnalyzer()
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError as e:
+            return {'error': "{}: {}".format(type(e).__name__, e)}
+        if not isinstance(row, dict):
+            return {'error': "ValueError: expected a JSON object, got {}".format(type(row).__name__)}
+    result = {'id': row['id']} if 'id' in row else {}
+    try:
+        is_female = _as_bool(row.get('female', False))
+        if row.get('pillars'):
+            chart = analyzer.analyze_pillars(row['pillars'], is_female=is_female)
+        else:
+            chart = analyzer.analyze_birth(
+                int(row['year']), int(row['month']), int(row['day']), int(row['hour']),
+                int(row.get('minute') or 0), is_female=is_female,
+                use_lunar=_as_bool(row.get('lunar', False)), leap=_as_bool(row.get('leap', False)))
+    except Exception as e:
+        result['error'] = "{}: {}".format(type(e).__name__, e)
+        return result
+
+    result.update({
+        'pillars': ' '.join(''.join(item) for item in zip(chart.gans, chart.zhis)),
+        'female': chart.is_female,
+        'me': chart.me,
+        'gan_shens': chart.gan_shens,
+        'zhi_shens': chart.zhi_shens,
+        'scores': chart.scores,
+        'gan_scores': chart.gan_scores,
+        'strong': chart.strong,
+        'weak': chart.weak,
+        'direction': chart.direction,
+        'dayuns': chart.dayuns,
+        'nayins': chart.nayins,
+    })
+    if chart.lunar is not None:
+        solar = chart.lunar.getSolar()
+        result['solar'] = solar.toYmdHms()
+        result['lunar'] = "{}年{}月{}日".format(
+            chart.lunar.getYear(), chart.lunar.getMonth(), chart.lunar.getDay())
+    return result
+
+
+def _dump_row(row):
+    return json.dumps(analyze_row(row), ensure_ascii=False)
+
+
+def read_rows(stream, fmt):
+    """Yield input rows from a JSONL or CSV stream.
+
+    CSV rows are dicts; JSONL lines are yielded as text and parsed by
+    analyze_row in the worker.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield row
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def run(rows, out, workers=None, ordered=True, chunksize=64):
+    """Analyse rows in a process pool and write JSONL to out.
+
+    Returns (count, seconds).
+    """
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    start = time.time()
+    if workers == 1:
+        _init_worker()
+        for row in rows:
+            out.write(_dump_row(row) + '\n')
+            count += 1
+    else:
+        # fork 让工作进程直接继承已导入的模块；没有 fork 的平台（Windows）
+        # 会重新导入主模块，请改用 python batch.py
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        ctx = multiprocessing.get_context(method)
+        with ctx.Pool(workers, initializer=_init_worker) as pool:
+            mapper = pool.imap if ordered else pool.imap_unordered
+            for line in mapper(_dump_row, rows, chunksize):
+                out.write(line + '\n')
+                count += 1
+    return count, time.time() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='bazi.py batch', description=__doc__,
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('input', help=u'输入文件，- 表示标准输入')
+    parser.add_argument('-o', '--output', default='-', help=u'输出 JSONL 文件，默认标准输出')
+    parser.add_argument('--format', choices=('jsonl', 'csv'),
+                        help=u'输入格式，默认按扩展名判断')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help=u'工作进程数，默认 CPU 核数')
+    parser.add_argument('--unordered', action='store_true', default=False,
+                        help=u'按完成顺序输出，不保持输入顺序')
+    parser.add_argument('--chunksize', type=int, default=64, help=u'每次分给工作进程的行数')
+    options = parser.parse_args(argv)
+
+    fmt = options.format or ('csv' if options.input.lower().endswith('.csv') else 'jsonl')
+    src = sys.stdin if options.input == '-' else open(options.input, encoding='utf-8', newline='')
+    dst = sys.stdout if options.output == '-' else open(options.output, 'w', encoding='utf-8')
+    try:
+        count, seconds = run(read_rows(src, fmt), dst, workers=options.workers,
+                             ordered=not options.unordered, chunksize=options.chunksize)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    rate = count / seconds if seconds else 0.0
+    print("{} rows in {:.2f}s, {:.0f} rows/sec, {} workers".format(
+        count, seconds, rate, options.workers), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
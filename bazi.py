@@ -7,6 +7,7 @@ import argparse
 import collections
 import pprint
 import datetime
+import sys
 
 from lunar_python import Lunar, Solar
 from colorama import init
@@ -15,6 +16,11 @@ from datas import *
 from sizi import summarys
 from common import *
 from yue import months
+from analyzer import ChartAnalyzer, Gans, Zhis
+from gzcore import GAN_INDEX, ZHI_INDEX, encode
+from shensha import chart_stars, star_names
+from timeline import PATTERNS, timeline
+from pillar_index import open_index
 
 def get_gen(gan, zhis):
     zhus = []
@@ -62,8 +68,8 @@ def get_gong(zhis):
             continue
         zhi1 = zhis[i]
         zhi2 = zhis[i+1]
-        if abs(Zhi.index(zhi1) - Zhi.index(zhi2)) == 2:
-            value = Zhi[(Zhi.index(zhi1) + Zhi.index(zhi2))//2]
+        if abs(ZHI_INDEX[zhi1] - ZHI_INDEX[zhi2]) == 2:
+            value = Zhi[(ZHI_INDEX[zhi1] + ZHI_INDEX[zhi2])//2]
             #if value in ("丑", "辰", "未", "戌"):
             result.append(value)
         if (zhi1 + zhi2 in gong_he) and (gong_he[zhi1 + zhi2] not in zhis):
@@ -77,29 +83,37 @@ def get_gong(zhis):
 
 def get_shens(gans, zhis, gan_, zhi_):
     
-    all_shens = []
-    for item in year_shens:
-        if zhi_ in year_shens[item][zhis.year]:    
-            all_shens.append(item)
-                
-    for item in month_shens:
-        if gan_ in month_shens[item][zhis.month] or zhi_ in month_shens[item][zhis.month]:     
-            all_shens.append(item)
-                
-    for item in day_shens:
-        if zhi_ in day_shens[item][zhis.day]:     
-            all_shens.append(item)
-                
-    for item in g_shens:
-        if zhi_ in g_shens[item][me]:    
-            all_shens.append(item) 
+    all_shens = star_names(gans, zhis, gan_, zhi_)
     if all_shens:  
         return "  神:" + ' '.join(all_shens)
     else:
         return ""
                 
+def timeline_text(row):
+    """timeline.Row 转为大运部分的一行输出。"""
+    zhi5_ = ''.join("{}{}　".format(gan, shen) for gan, shen in row.hidden)
+    he_chong = ''.join(type_ + gan for type_, gan in row.he_chong)
+    relations = '  '.join(type_ + ":" + item for type_, item in row.relations)
+    if row.kind == '大运':
+        head = "{1:<4d}{2:<5s}{3}"
+        year = ''
+    else:
+        head = "{1:>3d} {2:<5d}{3}"
+        year = row.year
+    out = (head + " {15} {14} {13}  {4}:{5}{8}{6:{0}<6s}{12}{7}{8}{9} - {10:{0}<10s} {11}").format(
+        chr(12288), row.age, year, row.gan + row.zhi, row.gan_shen, row.gan, he_chong,
+        row.zhi, yinyang(row.zhi), row.zhi_shen, zhi5_, relations, '空' if row.empty else chr(12288),
+        '*' if row.fu else " ", row.nayin, row.zhi_shen)
+    out = out + ''.join("  --{}：{}".format(type_, item) for type_, item in row.jia)
+    if row.stars:
+        out = out + "  神:" + ' '.join(row.stars)
+    for name, items in PATTERNS:
+        if name in row.patterns:
+            out = out + "  {}：{}".format(name, items)
+    return out
+
 def jin_jiao(first, second):
-    return True if Zhi.index(second) - Zhi.index(first) == 1 else False
+    return True if ZHI_INDEX[second] - ZHI_INDEX[first] == 1 else False
 
 def is_ku(zhi):
     return True if zhi in "辰戌丑未" else False  
@@ -108,14 +122,19 @@ def zhi_ku(zhi, items):
     return True if is_ku(zhi) and min(zhi5[zhi], key=zhi5[zhi].get) in items else False
 
 def is_yang():
-    return True if Gan.index(me) % 2 == 0 else False
+    return True if GAN_INDEX[me] % 2 == 0 else False
 
 def not_yang():
-    return False if Gan.index(me) % 2 == 0 else True
+    return False if GAN_INDEX[me] % 2 == 0 else True
 
 def gan_ke(gan1, gan2):
     return True if ten_deities[gan1]['克'] == ten_deities[gan2]['本'] or ten_deities[gan2]['克'] == ten_deities[gan1]['本'] else False
     
+# 批量排盘：python bazi.py batch rows.jsonl -o charts.jsonl，详见 batch.py
+if __name__ == '__main__' and sys.argv[1:2] == ['batch']:
+    import batch
+    sys.exit(batch.main(sys.argv[2:]))
+
 description = '''
 
 '''
@@ -136,9 +155,6 @@ parser.add_argument('--version', action='version',
                     version='%(prog)s 1.0 Rongzhong xu 2022 06 15')
 options = parser.parse_args()
 
-Gans = collections.namedtuple("Gans", "year month day time")
-Zhis = collections.namedtuple("Zhis", "year month day time")
-
 print("-"*120)
 
 if options.b:
@@ -147,10 +163,16 @@ if options.b:
                 day=options.day[0],  time=options.time[0])
     zhis = Gans(year=options.year[1], month=options.month[1], 
                 day=options.day[1],  time=options.time[1])
-    jds = sxtwl.siZhu2Year(getGZ(options.year), getGZ(options.month), getGZ(options.day), getGZ(options.time), options.start, int(options.end));
-    for jd in jds:
-        t = sxtwl.JD2DD(jd )
-        print("可能出生时间: python bazi.py -g %d %d %d %d :%d:%d"%(t.Y, t.M, t.D, t.h, t.m, round(t.s)))   
+    # 有 pillars.idx 时查索引（python pillar_index.py build 生成），否则用 sxtwl 逐年搜索
+    index = open_index()
+    if index is not None:
+        for t, _ in index.lookup(options.year, options.month, options.day, options.time, options.start, int(options.end)):
+            print("可能出生时间: python bazi.py -g %d %d %d %d :%d:%d"%(t.year, t.month, t.day, t.hour, t.minute, t.second))
+    else:
+        jds = sxtwl.siZhu2Year(getGZ(options.year), getGZ(options.month), getGZ(options.day), getGZ(options.time), options.start, int(options.end));
+        for jd in jds:
+            t = sxtwl.JD2DD(jd )
+            print("可能出生时间: python bazi.py -g %d %d %d %d :%d:%d"%(t.Y, t.M, t.D, t.h, t.m, round(t.s)))   
     
 else:
 
@@ -168,95 +190,35 @@ else:
     zhis = Zhis(year=ba.getYearZhi(), month=ba.getMonthZhi(), day=ba.getDayZhi(), time=ba.getTimeZhi())
 
 
-me = gans.day
+chart = ChartAnalyzer().analyze(gans, zhis, is_female=options.n)
+
+me = chart.me
 month = zhis.month
 alls = list(gans) + list(zhis)
 zhus = [item for item in zip(gans, zhis)]
 
-gan_shens = []
-for seq, item in enumerate(gans):    
-    if seq == 2:
-        gan_shens.append('--')
-    else:
-        gan_shens.append(ten_deities[me][item])
-#print(gan_shens)
-
-zhi_shens = [] # 地支的主气神
-for item in zhis:
-    d = zhi5[item]
-    zhi_shens.append(ten_deities[me][max(d, key=d.get)])
-#print(zhi_shens)
-shens = gan_shens + zhi_shens
-
-zhi_shens2 = [] # 地支的所有神，包含余气和尾气, 混合在一起
-zhi_shen3 = [] # 地支所有神，字符串格式
-for item in zhis:
-    d = zhi5[item]
-    tmp = ''
-    for item2 in d:
-        zhi_shens2.append(ten_deities[me][item2])
-        tmp += ten_deities[me][item2]
-    zhi_shen3.append(tmp)
-shens2 = gan_shens + zhi_shens2
-    
+gan_shens = chart.gan_shens
+zhi_shens = chart.zhi_shens # 地支的主气神
+shens = chart.shens
 
+zhi_shens2 = chart.zhi_shens2 # 地支的所有神，包含余气和尾气, 混合在一起
+zhi_shen3 = chart.zhi_shen3 # 地支所有神，字符串格式
+shens2 = chart.shens2
 
 # 计算五行分数 http://www.131.com.tw/word/b3_2_14.htm
-
-scores = {"金":0, "木":0, "水":0, "火":0, "土":0}
-gan_scores = {"甲":0, "乙":0, "丙":0, "丁":0, "戊":0, "己":0, "庚":0, "辛":0,
-              "壬":0, "癸":0}   
-
-for item in gans:  
-    scores[gan5[item]] += 5
-    gan_scores[item] += 5
-
-
-for item in list(zhis) + [zhis.month]:  
-    for gan in zhi5[item]:
-        scores[gan5[gan]] += zhi5[item][gan]
-        gan_scores[gan] += zhi5[item][gan]
-
+scores = chart.scores
+gan_scores = chart.gan_scores
 
 # 计算八字强弱
-# 子平真诠的计算
-weak = True
-me_status = []
-for item in zhis:
-    me_status.append(ten_deities[me][item])
-    if ten_deities[me][item] in ('长', '帝', '建'):
-        weak = False
-        
-
-if weak:
-    if shens.count('比') + me_status.count('库') >2:
-        weak = False
+weak = chart.weak
+me_status = chart.me_status
 
 # 计算大运
-seq = Gan.index(gans.year)
-if options.n:
-    if seq % 2 == 0:
-        direction = -1
-    else:
-        direction = 1
-else:
-    if seq % 2 == 0:
-        direction = 1
-    else:
-        direction = -1
-
-dayuns = []
-gan_seq = Gan.index(gans.month)
-zhi_seq = Zhi.index(zhis.month)
-for i in range(12):
-    gan_seq += direction
-    zhi_seq += direction
-    dayuns.append(Gan[gan_seq%10] + Zhi[zhi_seq%12])
+direction = chart.direction
+dayuns = chart.dayuns
 
 # 网上的计算
-me_attrs_ = ten_deities[me].inverse
-strong = gan_scores[me_attrs_['比']] + gan_scores[me_attrs_['劫']] \
-    + gan_scores[me_attrs_['枭']] + gan_scores[me_attrs_['印']]
+strong = chart.strong
 
 
 if not options.b:
@@ -393,7 +355,7 @@ for seq, item in enumerate(zhus):
     # 检查劫杀 
     result = "{}－{}".format(result, '劫杀') if zhis[seq] == jieshas[zhis[0]] else result
     # 检查元辰
-    result = "{}－{}".format(result, '元辰') if zhis[seq] == Zhi[(Zhi.index(zhis[0]) + direction*-1*5)%12] else result    
+    result = "{}－{}".format(result, '元辰') if zhis[seq] == Zhi[(ZHI_INDEX[zhis[0]] + direction*-1*5)%12] else result    
     print("{1:{0}<15s} ".format(chr(12288), result), end='')
 
 print()
@@ -407,35 +369,13 @@ strs = ['','','','',]
 all_shens = set()
 all_shens_list = []
 
-for item in year_shens:
-    for i in (1,2,3):
-        if zhis[i] in year_shens[item][zhis.year]:    
-            strs[i] = item if not strs[i] else strs[i] + chr(12288) + item
-            all_shens.add(item)
-            all_shens_list.append(item)
-            
-for item in month_shens:
-    for i in range(4):
-        if gans[i] in month_shens[item][zhis.month] or zhis[i] in month_shens[item][zhis.month]:     
-            strs[i] = item if not strs[i] else strs[i] + chr(12288) + item
-            if i == 2 and gans[i] in month_shens[item][zhis.month]:
-                strs[i] = strs[i] + "●"
-            all_shens.add(item)
-            all_shens_list.append(item)
-            
-for item in day_shens:
-    for i in (0,1,3):
-        if zhis[i] in day_shens[item][zhis.day]:     
-            strs[i] = item if not strs[i] else strs[i] + chr(12288) + item    
-            all_shens.add(item)
-            all_shens_list.append(item)
-            
-for item in g_shens:
-    for i in range(4):
-        if zhis[i] in g_shens[item][me]:    
-            strs[i] = item if not strs[i] else strs[i] + chr(12288) + item
-            all_shens.add(item)
-            all_shens_list.append(item)
+for i, stars in enumerate(chart_stars(*encode(gans, zhis))):
+    for star in stars:
+        strs[i] = star.name if not strs[i] else strs[i] + chr(12288) + star.name
+        if i == 2 and star.by_gan:
+            strs[i] = strs[i] + "●"
+        all_shens.add(star.name)
+        all_shens_list.append(star.name)
             
 # print(all_shens_list)
 #print(strs)           
@@ -487,46 +427,8 @@ if options.b:
     print()
 
 else:
-    for dayun in yun.getDaYun()[1:]:
-        gan_ = dayun.getGanZhi()[0]
-        zhi_ = dayun.getGanZhi()[1]
-        fu = '*' if (gan_, zhi_) in zhus else " "
-        zhi5_ = ''
-        for gan in zhi5[zhi_]:
-            zhi5_ = zhi5_ + "{}{}　".format(gan, ten_deities[me][gan]) 
-        
-        zhi__ = set() # 大运地支关系
-        
-        for item in zhis:
-        
-            for type_ in zhi_atts[zhi_]:
-                if item in zhi_atts[zhi_][type_]:
-                    zhi__.add(type_ + ":" + item)
-        zhi__ = '  '.join(zhi__)
-        
-        empty = chr(12288)
-        if zhi_ in empties[zhus[2]]:
-            empty = '空'        
-        
-        jia = ""
-        if gan_ in gans:
-            for i in range(4):
-                if gan_ == gans[i]:
-                    if abs(Zhi.index(zhi_) - Zhi.index(zhis[i])) == 2:
-                        jia = jia + "  --夹：" +  Zhi[( Zhi.index(zhi_) + Zhi.index(zhis[i]) )//2]
-                    if abs( Zhi.index(zhi_) - Zhi.index(zhis[i]) ) == 10:
-                        jia = jia + "  --夹：" +  Zhi[(Zhi.index(zhi_) + Zhi.index(zhis[i]))%12]
-                
-        out = "{1:<4d}{2:<5s}{3} {15} {14} {13}  {4}:{5}{8}{6:{0}<6s}{12}{7}{8}{9} - {10:{0}<10s} {11}".format(
-            chr(12288), dayun.getStartAge(), '', dayun.getGanZhi(),ten_deities[me][gan_], gan_,check_gan(gan_, gans), 
-            zhi_, yinyang(zhi_), ten_deities[me][zhi_], zhi5_, zhi__,empty, fu, nayins[(gan_, zhi_)], ten_deities[me][zhi_]) 
-        gan_index = Gan.index(gan_)
-        zhi_index = Zhi.index(zhi_)
-        out = out + jia + get_shens(gans, zhis, gan_, zhi_)
-        
-        print(out)
-        zhis2 = list(zhis) + [zhi_]
-        gans2 = list(gans) + [gan_]
+    for row in timeline(yun, gans, zhis, liunian=False):
+        print(timeline_text(row))
 
 print("-"*120)
 
@@ -612,8 +514,9 @@ if emptie4s.get(zhus[2], 0) != 0:
     if scores[emptie4s.get(zhus[2], 0)] == 0:
         print("四大空亡：33岁以前身体不佳！")
 
-for item in all_shens:
-    print(item, ":",  shens_infos[item])
+for item in shens_infos:
+    if item in all_shens:
+        print(item, ":",  shens_infos[item])
     
 if options.n:
     print("#"*20, "女命")
@@ -635,7 +538,7 @@ liuqins = bidict({'才': '父亲',"财":'财' if options.n else '妻', "印": '
 # 六亲分析
 for item in Gan:
     print("{}:{} {}-{} {} {} {}".format(item, ten_deities[me][item], liuqins[ten_deities[me][item]],  ten_deities[item][zhis[0]] ,ten_deities[item][zhis[1]], ten_deities[item][zhis[2]], ten_deities[item][zhis[3]]), end='  ')
-    if Gan.index(item) == 4:
+    if GAN_INDEX[item] == 4:
         print()
     
 print()
@@ -668,7 +571,7 @@ print("-"*120)
 yinyangs(zhis)
 shen_zhus = list(zip(gan_shens, zhi_shens))
 
-minggong = Zhi[::-1][(Zhi.index(zhis[1]) + Zhi.index(zhis[3]) -6  )%12 ]
+minggong = Zhi[::-1][(ZHI_INDEX[zhis[1]] + ZHI_INDEX[zhis[3]] -6  )%12 ]
 print(minggong, minggongs[minggong])
 print("坐：", rizhus[me+zhis.day])
 
@@ -706,7 +609,7 @@ if max(scores.values()) > 25:
     
     
 if zhi_6he[3]:
-    if abs(Gan.index(gans[3]) - Gan.index(gans[2])) == 1:
+    if abs(GAN_INDEX[gans[3]] - GAN_INDEX[gans[2]]) == 1:
         print("日时干邻支合：连珠得合：妻贤子佳，与事业无关。母法总则P21-11")
         
 for i,item in enumerate(zhis):
@@ -865,7 +768,7 @@ if '比' in gan_shens:
             print("比肩坐杀:稳重。")    
         if zhi_shens[seq] == '枭':
             print("比肩坐偏印：三五年发达，后面守成。")    
-        if zhi_shens[seq] == '劫' and Gan.index(me) % 2 == 0:
+        if zhi_shens[seq] == '劫' and GAN_INDEX[me] % 2 == 0:
             print("比肩坐阳刃：父亲先亡，基于在哪柱判断时间。基51：丙午 丙申 丙申 丁酉。E在年不利父，在其他有刀伤、车祸、意外灾害。\t基52女命年克父亲，月若30岁以前结婚不利婚姻")    
         if zhi_shens[seq] in ('劫','比') and'劫' in gan_shens:
             print("天干比劫并立，比肩又坐比劫，女多遇争夫，个性强，不易协调。")   
@@ -1009,11 +912,11 @@ if zhi_shens[1] == '劫' and is_yang():
         print("阳刃格:时柱成偏印格，贫、夭、带疾。 母法总则P28-107 癸未 辛酉 庚寅 戊寅")
                 
         
-if zhi_shens.count('劫') > 1 and Gan.index(me) % 2 == 0:
+if zhi_shens.count('劫') > 1 and GAN_INDEX[me] % 2 == 0:
     if zhis.day == yin_lu:
         print("双阳刃，自坐印专位：刑妻、妨子。凶终、官非、意外灾害。母法总则P21-13")
         
-if zhi_shens[1:].count('劫') > 0 and Gan.index(me) % 2 == 0:
+if zhi_shens[1:].count('劫') > 0 and GAN_INDEX[me] % 2 == 0:
     if zhis.day == yin_lu and ('劫' in gan_shens or '比' in gan_shens):
         print("阳刃，自坐印专位，透比或劫：刑妻。母法总则P36-8 己酉 丁卯 甲子 乙亥")
         
@@ -1340,9 +1243,9 @@ if (not '财' in shens2) and (not '才' in shens2):
     #print("女命一财得所，红颜失配。")  
     
 if zhis.day in (cai_lu, cai_di):
-    if (zhi_shens[1] == '劫' or zhi_shens[3] == '劫' ) and Gan.index(me) % 2 == 0:
+    if (zhi_shens[1] == '劫' or zhi_shens[3] == '劫' ) and GAN_INDEX[me] % 2 == 0:
         print("自坐财禄，月支或时支为阳刃，凶。无冲是非多，冲刑主病灾。 母法总则P22-15  母法总则P36-4 丙寅 戊戌 甲午 丁卯 P56-32 己未 丙寅 丙申 甲午")   
-    if ('劫' in zhi_shens ) and Gan.index(me) % 2 == 0 and '劫' in gan_shens :
+    if ('劫' in zhi_shens ) and GAN_INDEX[me] % 2 == 0 and '劫' in gan_shens :
         print("自坐财禄，透劫财，有阳刃，刑妻无结局。 母法总则P36-7 戊子 乙卯 甲午 乙亥") 
     if me in ('甲', '乙') and ('戊' in gans or '己' in gans):
         print("火土代用财，如果透财，多成多败，早年灰心。 母法总则P22-19 辛未 癸巳 甲午 戊辰") 
@@ -1472,7 +1375,7 @@ if '官' in gan_shens:
             print("天干正官，地支比肩或劫财，亲友之间不适合合作，但是他适合经营烂摊子。")
         if zhi_shens[seq] == '杀' :
             print("正官坐七杀，男命恐有诉讼之灾。女命婚姻不佳。月柱尤其麻烦，二度有感情纠纷。年不算，时从轻。 基64 壬子 壬子 丁丑 癸卯")
-        if zhi_shens[seq] == '劫' and Gan.index(me) % 2 == 0:
+        if zhi_shens[seq] == '劫' and GAN_INDEX[me] % 2 == 0:
             print("官坐羊刃：要杀才能制服阳刃，有力不从心之事情。 辛卯 丁酉 庚午 庚辰 基65")   
         if zhi_shens[seq] == '印':
             print("官坐印，无刑冲合，吉")   
@@ -1806,100 +1709,8 @@ if sum_index in summarys:
 if not options.b:
     print("\n\n大运")    
     print("="*120)  
-    for dayun in yun.getDaYun()[1:]:
-        gan_ = dayun.getGanZhi()[0]
-        zhi_ = dayun.getGanZhi()[1]
-        fu = '*' if (gan_, zhi_) in zhus else " "
-        zhi5_ = ''
-        for gan in zhi5[zhi_]:
-            zhi5_ = zhi5_ + "{}{}　".format(gan, ten_deities[me][gan]) 
-        
-        zhi__ = set() # 大运地支关系
-        
-        for item in zhis:
-        
-            for type_ in zhi_atts[zhi_]:
-                if item in zhi_atts[zhi_][type_]:
-                    zhi__.add(type_ + ":" + item)
-        zhi__ = '  '.join(zhi__)
-        
-        empty = chr(12288)
-        if zhi_ in empties[zhus[2]]:
-            empty = '空'        
-        
-        jia = ""
-        if gan_ in gans:
-            for i in range(4):
-                if gan_ == gans[i]:
-                    if abs(Zhi.index(zhi_) - Zhi.index(zhis[i])) == 2:
-                        jia = jia + "  --夹：" +  Zhi[( Zhi.index(zhi_) + Zhi.index(zhis[i]) )//2]
-                    if abs( Zhi.index(zhi_) - Zhi.index(zhis[i]) ) == 10:
-                        jia = jia + "  --夹：" +  Zhi[(Zhi.index(zhi_) + Zhi.index(zhis[i]))%12]
-                
-        out = "{1:<4d}{2:<5s}{3} {15} {14} {13}  {4}:{5}{8}{6:{0}<6s}{12}{7}{8}{9} - {10:{0}<10s} {11}".format(
-            chr(12288), dayun.getStartAge(), '', dayun.getGanZhi(),ten_deities[me][gan_], gan_,check_gan(gan_, gans), 
-            zhi_, yinyang(zhi_), ten_deities[me][zhi_], zhi5_, zhi__,empty, fu, nayins[(gan_, zhi_)], ten_deities[me][zhi_]) 
-        gan_index = Gan.index(gan_)
-        zhi_index = Zhi.index(zhi_)
-        out = out + jia + get_shens(gans, zhis, gan_, zhi_)
-        
-        print(out)
-        zhis2 = list(zhis) + [zhi_]
-        gans2 = list(gans) + [gan_]
-        for liunian in dayun.getLiuNian():
-            gan2_ = liunian.getGanZhi()[0]
-            zhi2_ = liunian.getGanZhi()[1]
-            fu2 = '*' if (gan2_, zhi2_) in zhus else " "
-            #print(fu2, (gan2_, zhi2_),zhus)
-            
-            zhi6_ = ''
-            for gan in zhi5[zhi2_]:
-                zhi6_ = zhi6_ + "{}{}　".format(gan, ten_deities[me][gan])        
-            
-            # 大运地支关系
-            zhi__ = set() # 大运地支关系
-            for item in zhis2:
-            
-                for type_ in zhi_atts[zhi2_]:
-                    if type_ == '破':
-                        continue
-                    if item in zhi_atts[zhi2_][type_]:
-                        zhi__.add(type_ + ":" + item)
-            zhi__ = '  '.join(zhi__)
-            
-            empty = chr(12288)
-            if zhi2_ in empties[zhus[2]]:
-                empty = '空'       
-            out = "{1:>3d} {2:<5d}{3} {15} {14} {13}  {4}:{5}{8}{6:{0}<6s}{12}{7}{8}{9} - {10:{0}<10s} {11}".format(
-                chr(12288), liunian.getAge(), liunian.getYear(), gan2_+zhi2_,ten_deities[me][gan2_], gan2_,check_gan(gan2_, gans2), 
-                zhi2_, yinyang(zhi2_), ten_deities[me][zhi2_], zhi6_, zhi__,empty, fu2, nayins[(gan2_, zhi2_)], ten_deities[me][zhi2_]) 
-            
-            jia = ""
-            if gan2_ in gans2:
-                for i in range(5):
-                    if gan2_ == gans2[i]:
-                        zhi1 = zhis2[i]
-                        if abs(Zhi.index(zhi2_) - Zhi.index(zhis2[i])) == 2:
-                            # print(2, zhi2_, zhis2[i])
-                            jia = jia + "  --夹：" +  Zhi[( Zhi.index(zhi2_) + Zhi.index(zhis2[i]) )//2]
-                        if abs( Zhi.index(zhi2_) - Zhi.index(zhis2[i]) ) == 10:
-                            # print(10, zhi2_, zhis2[i])
-                            jia = jia + "  --夹：" +  Zhi[(Zhi.index(zhi2_) + Zhi.index(zhis2[i]))%12]  
-
-                        if (zhi1 + zhi2_ in gong_he) and (gong_he[zhi1 + zhi2_] not in zhis):
-                            jia = jia + "  --拱：" + gong_he[zhi1 + zhi2_]
-                            
-            out = out + jia + get_shens(gans, zhis, gan2_, zhi2_)
-            all_zhis = set(zhis2) | set(zhi2_)
-            if set('戌亥辰巳').issubset(all_zhis):
-                out = out + "  天罗地网：戌亥辰巳"
-            if set('寅申巳亥').issubset(all_zhis) and len(set('寅申巳亥')&set(zhis)) == 2 :
-                out = out + "  四生：寅申巳亥"   
-            if set('子午卯酉').issubset(all_zhis) and len(set('子午卯酉')&set(zhis)) == 2 :
-                out = out + "  四败：子午卯酉"  
-            if set('辰戌丑未').issubset(all_zhis) and len(set('辰戌丑未')&set(zhis)) == 2 :
-                out = out + "  四库：辰戌丑未"             
-            print(out)
+    for row in timeline(yun, gans, zhis):
+        print(timeline_text(row))
             
         
     
@@ -1908,8 +1719,8 @@ if not options.b:
     print("星宿", lunar.getXiu(), lunar.getXiuSong())
     
     # 计算建除
-    seq = 12 - Zhi.index(zhis.month)
-    print(jianchus[(Zhi.index(zhis.day) + seq)%12])        
+    seq = 12 - ZHI_INDEX[zhis.month]
+    print(jianchus[(ZHI_INDEX[zhis.day] + seq)%12])        
     
 # 检查三会 三合的拱合
 result = ''
@@ -2392,7 +2203,7 @@ print("年份:", zhis[0], "特点：--", zhi_desc[zhis[0]],"\n")
 
 
 # 羊刃分析
-key = '帝' if Gan.index(me)%2 == 0 else '冠'
+key = '帝' if GAN_INDEX[me]%2 == 0 else '冠'
 
 if ten_deities[me].inverse[key] in zhis:
     print("\n羊刃:", me, ten_deities[me].inverse[key])  
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Netlify 函数 new_game、check_relationship 的性能测试。
+
+    python bench.py                          # 冷启动 10 次、热调用 200 次，打印结果
+    python bench.py --save bench.json        # 保存为基线
+    python bench.py --compare bench.json     # 与基线比较，变慢超过 --threshold 时返回 1
+
+冷启动：每次在新的子进程里导入一个处理函数并调用一次，记录导入时间和首次调用延迟。
+热调用：在一个子进程里反复调用。两种都在 netlify/functions 目录下运行，
+用的是部署时的那份模块（不是顶层的 ganzhi、jieqi 等）。
+
+部署时 new_game 和 check_relationship 是两个函数，互不共享内存。所以
+check_relationship 按两种请求分别统计：带完整游戏状态的，以及只带会话令牌、
+由本实例按令牌重建该局的（check_relationship_token，每次换一个空的会话缓存）。
+四柱和六柱（advanced_mode）分别统计 p50/p95/p99 延迟（毫秒）和响应大小（字节）。
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions')
+MODES = {'basic': False, 'advanced': True}
+METRICS = ('p50', 'p95', 'p99')
+
+
+def percentile(values, fraction):
+    """最近秩百分位数。"""
+    values = sorted(values)
+    return values[max(math.ceil(fraction * len(values)) - 1, 0)]
+
+
+def summarize(latencies, sizes, import_times=None):
+    result = {'count': len(latencies)}
+    for name in METRICS:
+        result[name] = round(percentile(latencies, int(name[1:]) / 100), 3)
+    result['bytes'] = round(sum(sizes) / len(sizes), 1)
+    if import_times:
+        result['import_p50'] = round(percentile(import_times, 0.5), 3)
+    return result
+
+
+def _new_game_event(advanced):
+    return {'httpMethod': 'POST', 'body': json.dumps({'advanced_mode': advanced})}
+
+
+def _check_event(game, session=True):
+    """取该局第一个关系的位置（地支位置加上柱数）；session 为假时带上完整的游戏状态。"""
+    chart = game['chart']
+    num_pillars = 6 if chart.get('advanced_mode') else 4
+    rel = game['all_relationships'][0]
+    offset = num_pillars if rel['type'].startswith('地支') else 0
+    body = {'positions': [item + offset for item in rel['positions']]}
+    if session:
+        body.update(session=game['session'], found_positions=[])
+    else:
+        body.update(chart=chart, all_relationships=game['all_relationships'], found_relationships=[])
+    return {'httpMethod': 'POST', 'body': json.dumps(body, ensure_ascii=False)}
+
+
+def _timed(handler, event):
+    start = time.perf_counter()
+    response = handler(event, None)
+    elapsed = (time.perf_counter() - start) * 1000
+    if response['statusCode'] != 200:
+        raise RuntimeError("{} answered {}: {}".format(handler.__module__, response['statusCode'], response['body']))
+    return elapsed, len(response['body'].encode('utf-8')), json.loads(response['body'])
+
+
+def worker_games(advanced, count):
+    """子进程：生成 count 局有关系的游戏，供冷启动的 check_relationship 使用。"""
+    import new_game
+    games = []
+    while len(games) < count:
+        game = _timed(new_game.handler, _new_game_event(advanced))[2]
+        if game['all_relationships']:
+            games.append(game)
+    return games
+
+
+def worker_cold(name, advanced, game=None):
+    """子进程：导入一个处理函数并调用一次，返回 (导入毫秒, 调用毫秒, 响应字节)。
+
+    每个 Netlify 函数单独部署，所以每个处理函数各用一个新进程。新进程里
+    没有会话，check_relationship 收到的是完整的游戏状态。
+    """
+    start = time.perf_counter()
+    module = __import__(name)
+    import_time = (time.perf_counter() - start) * 1000
+    event = _new_game_event(advanced) if name == 'new_game' else _check_event(game, session=False)
+    latency, size, _ = _timed(module.handler, event)
+    return import_time, latency, size
+
+
+def worker_warm(advanced, count):
+    """子进程：先调用几次预热，再各调用 count 次。"""
+    import new_game
+    import check_relationship
+    import game_sessions
+
+    for _ in range(5):
+        _timed(new_game.handler, _new_game_event(advanced))
+    result = {'new_game': ([], []), 'check_relationship': ([], []), 'check_relationship_token': ([], [])}
+    games = []
+    for _ in range(count):
+        latency, size, game = _timed(new_game.handler, _new_game_event(advanced))
+        result['new_game'][0].append(latency)
+        result['new_game'][1].append(size)
+        if game['all_relationships']:
+            games.append(game)
+    games = games or worker_games(advanced, 1)
+    for seq in range(count):
+        game = games[seq % len(games)]
+        latency, size, _ = _timed(check_relationship.handler, _check_event(game, session=False))
+        result['check_relationship'][0].append(latency)
+        result['check_relationship'][1].append(size)
+        # 部署时 new_game 存下的会话在这里看不到：清空会话缓存，按令牌重建
+        game_sessions._store = None
+        latency, size, _ = _timed(check_relationship.handler, _check_event(game))
+        result['check_relationship_token'][0].append(latency)
+        result['check_relationship_token'][1].append(size)
+    return result
+
+
+def _run_worker(*args, data=None):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '_worker', *map(str, args)],
+                            input=json.dumps(data), cwd=FUNCTIONS, capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def run(cold=10, warm=200):
+    """跑一遍，返回 {'cold': {...}, 'warm': {...}}，键为 '处理函数/模式'。"""
+    results = {'cold': {}, 'warm': {}}
+    for mode, advanced in MODES.items():
+        if cold:
+            games = _run_worker('games', int(advanced), cold)
+            for name in ('new_game', 'check_relationship'):
+                samples = [_run_worker('cold', name, int(advanced), data=game) for game in games]
+                results['cold']['{}/{}'.format(name, mode)] = summarize(
+                    [item[1] for item in samples], [item[2] for item in samples], [item[0] for item in samples])
+        if warm:
+            samples = _run_worker('warm', int(advanced), warm)
+            for name, (latencies, sizes) in samples.items():
+                results['warm']['{}/{}'.format(name, mode)] = summarize(latencies, sizes)
+    return results
+
+
+def compare(results, baseline, threshold=1.25, floor=0.5):
+    """与基线比较，返回变慢的 [(阶段, 键, 指标, 基线, 本次), ...]。
+
+    低于 floor 毫秒的差异视为噪声。
+    """
+    regressions = []
+    for phase, items in results.items():
+        for key, current in items.items():
+            old = baseline.get(phase, {}).get(key)
+            if old is None:
+                continue
+            for name in METRICS + ('import_p50',):
+                if name not in current or name not in old:
+                    continue
+                if current[name] > old[name] * threshold and current[name] - old[name] > floor:
+                    regressions.append((phase, key, name, old[name], current[name]))
+    return regressions
+
+
+def report(results, baseline=None):
+    lines = ["{:<6} {:<34} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+        'phase', 'handler/mode', 'import', 'p50', 'p95', 'p99', 'bytes')]
+    for phase, items in results.items():
+        for key, item in items.items():
+            line = "{:<6} {:<34} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+                phase, key, item.get('import_p50', '-'), item['p50'], item['p95'], item['p99'], item['bytes'])
+            old = (baseline or {}).get(phase, {}).get(key)
+            if old:
+                line += "   p50 {:+.0%}".format(item['p50'] / old['p50'] - 1 if old['p50'] else 0)
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ['_worker']:
+        sys.path.insert(0, FUNCTIONS)
+        data = json.load(sys.stdin)
+        if argv[1] == 'games':
+            print(json.dumps(worker_games(bool(int(argv[2])), int(argv[3])), ensure_ascii=False))
+        elif argv[1] == 'cold':
+            print(json.dumps(worker_cold(argv[2], bool(int(argv[3])), data)))
+        else:
+            print(json.dumps(worker_warm(bool(int(argv[2])), int(argv[3]))))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('--cold', type=int, default=10, help=u'每种模式冷启动的次数')
+    parser.add_argument('--warm', type=int, default=200, help=u'每种模式热调用的次数')
+    parser.add_argument('--save', help=u'结果保存为基线 JSON')
+    parser.add_argument('--compare', help=u'与基线 JSON 比较')
+    parser.add_argument('--threshold', type=float, default=1.25, help=u'超过基线的倍数视为变慢')
+    options = parser.parse_args(argv)
+
+    results = run(options.cold, options.warm)
+    baseline = None
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(report(results, baseline))
+
+    if options.save:
+        with open(options.save, 'w', encoding='utf-8') as f:
+            json.dump(dict(results, python=platform.python_version(), machine=platform.machine(),
+                           created=time.strftime('%Y-%m-%d %H:%M:%S')), f, indent=2)
+        print("baseline saved to", options.save)
+    if baseline:
+        regressions = compare(results, baseline, options.threshold)
+        for phase, key, name, old, new in regressions:
+            print("slower: {} {} {} {} -> {}".format(phase, key, name, old, new))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -92,11 +92,11 @@ empties = {
     ('庚', '寅'): ('午','未'), ('辛', '卯'): ('午','未'),
     ('壬', '辰'): ('午','未'), ('癸', '巳'): ('午','未'),
 
-    ('甲', '午'): ('辰','己'), ('乙', '未'): ('辰','己'),
-    ('丙', '申'): ('辰','己'), ('丁', '酉'): ('辰','己'),
-    ('戊', '戌'): ('辰','己'), ('己', '亥'): ('辰','己'),
-    ('庚', '子'): ('辰','己'), ('辛', '丑'): ('辰','己'),
-    ('壬', '寅'): ('辰','己'), ('癸', '卯'): ('辰','己'),
+    ('甲', '午'): ('辰','巳'), ('乙', '未'): ('辰','巳'),
+    ('丙', '申'): ('辰','巳'), ('丁', '酉'): ('辰','巳'),
+    ('戊', '戌'): ('辰','巳'), ('己', '亥'): ('辰','巳'),
+    ('庚', '子'): ('辰','巳'), ('辛', '丑'): ('辰','巳'),
+    ('壬', '寅'): ('辰','巳'), ('癸', '卯'): ('辰','巳'),
 
     ('甲', '辰'): ('寅','卯'), ('乙', '巳'): ('寅','卯'),
     ('丙', '午'): ('寅','卯'), ('丁', '未'): ('寅','卯'),
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整数编码的干支核心。
+
+天干编码 0-9（甲=0），地支编码 0-11（子=0），六十甲子编码 0-59（甲子=0，
+癸亥=59），干支编码满足 pillar % 10 == 天干, pillar % 12 == 地支。
+
+下面的表都在导入时由 ganzhi.py 和 datas.py 生成一次，之后全是元组下标
+访问，代替 ten_deities[me][item] 的 bidict、zhi5[item] 的 OrderedDict、
+Gan.index()/Zhi.index() 的线性查找、nayins[(gan, zhi)] 和
+ganzhi60.inverse。
+
+    >>> me, zhi = GAN_INDEX['壬'], ZHI_INDEX['午']
+    >>> TEN_GODS[me * 10 + GAN_INDEX['甲']], LIFE_STAGES[me * 12 + zhi]
+    ('食', '胎')
+    >>> p = pillar_code(me, zhi)
+    >>> PILLARS[p], NAYIN[p], [Zhi[item] for item in KONGWANG[p]]
+    ('壬午', '杨柳木', ['申', '酉'])
+"""
+
+from ganzhi import Gan, Zhi, ten_deities, zhi5, zhi_atts, gan_hes, gan_chongs, gan5
+from datas import nayins
+
+GAN_INDEX = {item: seq for seq, item in enumerate(Gan)}
+ZHI_INDEX = {item: seq for seq, item in enumerate(Zhi)}
+
+# 六十甲子
+PILLARS = tuple(Gan[seq % 10] + Zhi[seq % 12] for seq in range(60))
+PILLAR_INDEX = {item: seq for seq, item in enumerate(PILLARS)}
+
+
+def pillar_code(gan, zhi):
+    """天干、地支编码合成干支编码，二者阴阳必须相同。"""
+    return (6 * gan - 5 * zhi) % 60
+
+
+def encode(gans, zhis):
+    """汉字天干、地支序列转为编码列表。"""
+    return [GAN_INDEX[item] for item in gans], [ZHI_INDEX[item] for item in zhis]
+
+
+def decode(gans, zhis):
+    """编码列表转回汉字列表。"""
+    return [Gan[item] for item in gans], [Zhi[item] for item in zhis]
+
+
+# 五行，顺序与 bazi.py 的 scores 相同
+ELEMENTS = ("金", "木", "水", "火", "土")
+GAN_ELEMENT = tuple(ELEMENTS.index(gan5[item]) for item in Gan)
+
+# 十神：TEN_GODS[me * 10 + gan]
+TEN_GOD_NAMES = ('比', '劫', '食', '伤', '才', '财', '杀', '官', '枭', '印')
+TEN_GODS = tuple(ten_deities[me][item] for me in Gan for item in Gan)
+
+# 十二长生：LIFE_STAGES[me * 12 + zhi]
+LIFE_STAGE_NAMES = ('长', '沐', '冠', '建', '帝', '衰', '病', '死', '墓', '绝', '胎', '养')
+LIFE_STAGES = tuple(ten_deities[me][item] for me in Gan for item in Zhi)
+
+# 藏干及分数，顺序同 zhi5：本气、中气、余气
+HIDDEN_STEMS = tuple(tuple(GAN_INDEX[gan] for gan in zhi5[item]) for item in Zhi)
+HIDDEN_WEIGHTS = tuple(tuple(zhi5[item].values()) for item in Zhi)
+MAIN_STEM = tuple(GAN_INDEX[max(zhi5[item], key=zhi5[item].get)] for item in Zhi)
+
+# 纳音：NAYIN[pillar]
+NAYIN = tuple(nayins[(item[0], item[1])] for item in PILLARS)
+
+# 空亡：每旬（十个干支）空出旬首地支之前的两个地支
+KONGWANG = tuple(((seq - seq % 10 + 10) % 12, (seq - seq % 10 + 11) % 12) for seq in range(60))
+
+
+def _zhi_table(key):
+    return tuple(ZHI_INDEX[zhi_atts[item][key]] if zhi_atts[item][key] else -1 for item in Zhi)
+
+
+def _gan_table(pairs):
+    table = [-1] * 10
+    for first, second in pairs:
+        table[GAN_INDEX[first]] = GAN_INDEX[second]
+        table[GAN_INDEX[second]] = GAN_INDEX[first]
+    return tuple(table)
+
+
+# 两两关系，值为对方编码，-1 表示没有
+GAN_HE = _gan_table(gan_hes)
+GAN_CHONG = _gan_table(gan_chongs)
+ZHI_LIUHE = _zhi_table('六')
+ZHI_CHONG = _zhi_table('冲')
+ZHI_XING = _zhi_table('刑')
+ZHI_HAI = _zhi_table('害')
+ZHI_PO = _zhi_table('破')
+ZHI_AN = _zhi_table('暗')
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+节气表与四柱的算术计算，不用 lunar_python。
+
+    python jieqi.py build             # 由 lunar_python 生成 jieqi.bin（1600-2400年）
+    python jieqi.py check -n 20000    # 随机时刻与 lunar_python 的 getEightChar() 比对
+
+jieqi.bin 按时间顺序存放从 1599 年冬至起的全部二十四节气时刻（精确到秒，
+取 lunar_python 的 Solar.fromJulianDay 的取整结果）。四柱的算法与
+lunar_python 八字（EightChar，流派2）完全一致：
+
+- 年柱：以立春交接时刻换年
+- 月柱：以节（小寒、立春、惊蛰……）交接时刻换月，二分查找节气表
+- 日柱：儒略日数 - 11 模 60，晚子时不换日
+- 时柱：时干按五鼠遁，23 点起用次日日干
+
+    >>> from gzcore import PILLARS
+    >>> [PILLARS[item] for item in four_pillars(1990, 5, 17, 8)]
+    ['庚午', '辛巳', '壬午', '甲辰']
+"""
+
+import argparse
+import bisect
+import datetime
+import itertools
+import os
+import random
+import struct
+import sys
+from array import array
+
+from gzcore import pillar_code
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jieqi.bin')
+
+# 节气表中的顺序，从冬至开始，奇数位为节
+NAMES = ('冬至', '小寒', '大寒', '立春', '雨水', '惊蛰', '春分', '清明', '谷雨', '立夏', '小满', '芒种',
+         '夏至', '小暑', '大暑', '立秋', '处暑', '白露', '秋分', '寒露', '霜降', '立冬', '小雪', '大雪')
+
+# 文件头：标识、起止年份、第一个节气的时刻；之后是相邻节气的秒数差，均为小端
+_HEADER = struct.Struct('<4sHHq')
+_MAGIC = b'JQ24'
+_DAY_SECONDS = 86400
+# date.toordinal() 与儒略日数之差
+_JDN_OFFSET = 1721425
+
+_table = None
+
+
+class JieqiTable:
+    """二十四节气时刻表，从 start_year 前一年的冬至起，时刻为公历 0001-01-01 起的秒数。"""
+
+    def __init__(self, start_year, end_year, instants):
+        self.start_year = start_year
+        self.end_year = end_year
+        self.instants = instants
+        self.lower = _seconds(start_year, 1, 1)
+        self.upper = _seconds(end_year + 1, 1, 1)
+
+    def month_year_codes(self, seconds):
+        """某时刻的年柱、月柱编码。"""
+        if not self.lower <= seconds < self.upper:
+            raise ValueError("only {}-{} is covered by the jieqi table".format(self.start_year, self.end_year))
+        term = bisect.bisect_right(self.instants, seconds) - 1
+        # 第 term 个节气起算；中气并入前一个节
+        jie = term if term % 2 else term - 1
+        year = self.start_year + (term - 3) // 24
+        # 表中第一个节是 start_year 的小寒，即上一年的丑月
+        month = (self.start_year - 1 - 4) % 10 % 5 * 12 + 2 + 11 + (jie - 1) // 2
+        return (year - 4) % 60, month % 60
+
+    def term(self, index):
+        """第 index 个节气的名称和时刻（datetime）。"""
+        return NAMES[index % 24], _from_seconds(self.instants[index])
+
+    def around(self, seconds):
+        """某时刻之前（含）和之后最近的节气，(名称, datetime) 各一个。"""
+        term = bisect.bisect_right(self.instants, seconds) - 1
+        return self.term(term), self.term(term + 1)
+
+
+def _seconds(year, month, day, hour=0, minute=0, second=0):
+    # 允许 day 越过月末（Solar.fromJulianDay 进位时会出现）
+    days = datetime.date(year, month, 1).toordinal() + day - 1
+    return days * _DAY_SECONDS + hour * 3600 + minute * 60 + second
+
+
+def _from_seconds(seconds):
+    days, rest = divmod(seconds, _DAY_SECONDS)
+    return datetime.datetime.fromordinal(days) + datetime.timedelta(seconds=rest)
+
+
+def build_table(path=TABLE_PATH, start_year=1600, end_year=2400):
+    """用 lunar_python 生成节气表并写入 path，返回节气个数。"""
+    from lunar_python import LunarYear, Solar
+
+    instants = []
+    # LunarYear(y) 的节气表从上一年大雪起，第 1 到 24 项为上一年冬至到本年大雪
+    for year in range(start_year, end_year + 3):
+        julian_days = LunarYear.fromYear(year).getJieQiJulianDays()
+        for julian_day in julian_days[1:25]:
+            solar = Solar.fromJulianDay(julian_day)
+            instants.append(_seconds(solar.getYear(), solar.getMonth(), solar.getDay(),
+                                     solar.getHour(), solar.getMinute(), solar.getSecond()))
+
+    deltas = array('I', (b - a for a, b in zip(instants, instants[1:])))
+    if sys.byteorder != 'little':
+        deltas.byteswap()
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, start_year, end_year, instants[0]))
+        f.write(deltas.tobytes())
+    return len(instants)
+
+
+def load_table(path=TABLE_PATH):
+    """读入 build_table 写的节气表。"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, start_year, end_year, first = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("not a jieqi table: {}".format(path))
+    deltas = array('I')
+    deltas.frombytes(data[_HEADER.size:])
+    if sys.byteorder != 'little':
+        deltas.byteswap()
+    instants = array('q', itertools.accumulate(deltas, initial=first))
+    return JieqiTable(start_year, end_year, instants)
+
+
+def get_table():
+    """默认节气表，第一次用到时读入。"""
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+
+def four_pillars(year, month, day, hour, minute=0, second=0, table=None):
+    """公历时刻的四柱，返回年、月、日、时柱的干支编码（见 gzcore.PILLARS）。"""
+    table = table or get_table()
+    seconds = _seconds(year, month, day, hour, minute, second)
+    year_code, month_code = table.month_year_codes(seconds)
+
+    day_code = (datetime.date(year, month, day).toordinal() + _JDN_OFFSET - 11) % 60
+    time_zhi = (hour + 1) // 2 % 12
+    # 晚子时：时干按次日日干起
+    day_gan = (day_code + (1 if hour == 23 else 0)) % 10
+    time_code = pillar_code((day_gan % 5 * 2 + time_zhi) % 10, time_zhi)
+    return year_code, month_code, day_code, time_code
+
+
+def check(count, seed=None, table=None, boundaries=True):
+    """随机抽取 count 个时刻，加上每个节交接时刻及其前一秒，与 lunar_python 比对。
+
+    返回 (比对的时刻数, 不一致的列表)。
+    """
+    from lunar_python import Solar
+    from gzcore import PILLARS
+
+    table = table or get_table()
+    rng = random.Random(seed)
+    moments = []
+    for _ in range(count):
+        seconds = rng.randrange(table.lower, table.upper)
+        moments.append(_from_seconds(seconds))
+    for index in range(1, len(table.instants) if boundaries else 0, 2):
+        for offset in (-1, 0):
+            seconds = table.instants[index] + offset
+            if table.lower <= seconds < table.upper:
+                moments.append(_from_seconds(seconds))
+
+    mismatches = []
+    for dt in moments:
+        ba = Solar.fromYmdHms(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second).getLunar().getEightChar()
+        expected = [ba.getYear(), ba.getMonth(), ba.getDay(), ba.getTime()]
+        got = [PILLARS[item] for item in four_pillars(dt.year, dt.month, dt.day, dt.hour, dt.minute,
+                                                     dt.second, table)]
+        if got != expected:
+            mismatches.append((dt, expected, got))
+    return len(moments), mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('action', choices=('build', 'check'))
+    parser.add_argument('-o', '--output', default=TABLE_PATH, help=u'节气表文件')
+    parser.add_argument('--start', type=int, default=1600, help=u'起始年份')
+    parser.add_argument('--end', type=int, default=2400, help=u'结束年份')
+    parser.add_argument('-n', '--count', type=int, default=20000, help=u'check 随机抽取的时刻数')
+    options = parser.parse_args(argv)
+
+    if options.action == 'build':
+        count = build_table(options.output, options.start, options.end)
+        print("{} jieqi written to {}".format(count, options.output))
+        return 0
+
+    count, mismatches = check(options.count, table=load_table(options.output))
+    for dt, expected, got in mismatches[:20]:
+        print(dt, expected, got)
+    print("{} moments checked, {} mismatches".format(count, len(mismatches)))
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -15,6 +15,7 @@ from lunar_python import Lunar
 from colorama import init
 
 from ganzhi import Gan, Zhi, ymc, rmc, zhi_time, jis, zhi_atts, get_jizhu, datouxiu, xiaotouxiu
+from gzcore import PILLARS, ZHI_CHONG, pillar_code
 
 def get_hou(d, xiazhi, dongzhi):
     cal_day = sxtwl.fromSolar(d.year, d.month, d.day)
@@ -49,7 +50,7 @@ def get_hou(d, xiazhi, dongzhi):
         print(item + zhi_time[item], end='')
     
     
-    day_ganzhi = gans[2] + zhis[2]
+    day_ganzhi = PILLARS[pillar_code(dTG.tg, dTG.dz)]
     
     if day_ganzhi == year_hous[zhis[0]]:
         print(" 年猴:{}年{}日".format(zhis[0], day_ganzhi), end=' ')
@@ -79,14 +80,14 @@ def get_hou(d, xiazhi, dongzhi):
         print(" {}{}".format(item, items[item]), end='') 
     print()
     zeri = ""
-    if zhis.day == zhi_atts[zhis.year]["冲"]:
+    if dTG.dz == ZHI_CHONG[yTG.dz]:
         zeri += "\t岁破，大事不宜"
-    elif zhis.day == zhi_atts[zhis.month]["冲"]:
+    elif dTG.dz == ZHI_CHONG[mTG.dz]:
         zeri += "\t月破，大事不宜" 
     #print(gans.day + zhis.day)
-    if gans.day + zhis.day in datouxiu:
+    if day_ganzhi in datouxiu:
         zeri += "\t大偷休" 
-    elif gans.day + zhis.day in xiaotouxiu:
+    elif day_ganzhi in xiaotouxiu:
             zeri += "\t小偷休"    
     print(zeri)
 
@@ -1,47 +1,81 @@
 # netlify/functions/bazi_utils.py
 # -*- coding: utf-8 -*-
+import functools
+import itertools
 import random
-from datas import *
-from ganzhi import *
-from common import *
-from lunar_python import Solar, Lunar
+# 表从 tables.snap 快照读入，启动时不导入 ganzhi/datas（见 tables.py）
+from tables import (Gan, Zhi, GAN_INDEX, ZHI_INDEX, PILLARS, GAN_MATRIX, GAN_RECORDS, ZHI_MATRIX,
+                    ZHI_RECORDS, TRIPLE_PATTERNS, encode, pillar_code)
+from chart_sampler import get_sampler
+from relation_bits import DETECTED_BITS, settings_mask
 
 # Standalone, stateless utility functions for Bazi calculations.
 
-def calculate_dayun(year_gan, month_gz, is_female):
-    """Calculate current luck pillar (大运)"""
-    gan_seq_year = Gan.index(year_gan)
+SEED_BITS = 48              # 种子在 JSON/JavaScript 里仍是精确整数
+_seed_source = random.SystemRandom()
+
+
+def new_seed():
+    """A fresh seed for generate_random_bazi, drawn from os.urandom (no shared RNG state)."""
+    return _seed_source.getrandbits(SEED_BITS)
+
+
+def parse_seed(value):
+    """A request's seed as an int in [0, 2**SEED_BITS); raises ValueError otherwise."""
+    if isinstance(value, str) and value.strip().isdigit():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError('seed must be an integer.')
+    seed = value
+    if not 0 <= seed < 1 << SEED_BITS:
+        raise ValueError('seed must be between 0 and 2**{} - 1.'.format(SEED_BITS))
+    return seed
+
+
+def _dayun_code(year_gan_seq, month_code, is_female, age_periods):
+    """大运干支编码：从月柱顺排或逆排 age_periods 步（阳男阴女顺排）。"""
     if is_female:
-        direction = -1 if gan_seq_year % 2 == 0 else 1
+        direction = -1 if year_gan_seq % 2 == 0 else 1
     else:
-        direction = 1 if gan_seq_year % 2 == 0 else -1
-    
-    age_periods = random.randint(2, 6)
-    
-    gan_seq_month = Gan.index(month_gz[0])
-    zhi_seq_month = Zhi.index(month_gz[1])
-    
-    for _ in range(age_periods):
-        gan_seq_month = (gan_seq_month + direction) % 10
-        zhi_seq_month = (zhi_seq_month + direction) % 12
-        
-    return Gan[gan_seq_month], Zhi[zhi_seq_month]
-
-def generate_random_bazi(advanced_mode=False):
-    """Generate a random Bazi chart for the game"""
-    year = random.randint(1950, 2020)
-    month = random.randint(1, 12)
-    day = random.randint(1, 28)
-    hour = random.randint(0, 23)
-    is_female = random.choice([True, False])
-    
-    solar = Solar.fromYmdHms(year, month, day, hour, 0, 0)
-    lunar = solar.getLunar()
+        direction = 1 if year_gan_seq % 2 == 0 else -1
+    # 干、支各走一步即六十甲子中走一步
+    return (month_code + direction * age_periods) % 60
+
+
+def calculate_dayun(year_gan, month_gz, is_female, rng=random):
+    """Calculate current luck pillar (大运); rng is a random.Random or the random module"""
+    age_periods = rng.randint(2, 6)
+    month_code = pillar_code(GAN_INDEX[month_gz[0]], ZHI_INDEX[month_gz[1]])
+    dayun = PILLARS[_dayun_code(GAN_INDEX[year_gan], month_code, is_female, age_periods)]
+    return dayun[0], dayun[1]
+
+# 干支编码 -> (天干, 地支)，取 Gan/Zhi 里的同一批字符串，不必每次切片新建
+_PILLAR_CHARS = tuple((Gan[code % 10], Zhi[code % 12]) for code in range(60))
+
+
+def generate_random_bazi(advanced_mode=False, seed=None, rng=None):
+    """Generate a random Bazi chart for the game
+
+    With a seed the chart is drawn from random.Random(seed), records the
+    seed and is the same on every call and in every process. rng may
+    instead be a caller's own random.Random. With neither, the global
+    random module is used as before.
+
+    The birth time, sex, luck steps and current year are one draw from
+    chart_sampler, which looks the pillars up instead of converting the
+    date (same distribution as drawing each with randint).
+    """
+    if seed is not None:
+        rng = random.Random(seed)
+    elif rng is None:
+        rng = random
+    draw = get_sampler().sample(rng, advanced_mode)
+    year, month, day, hour, is_female = draw.year, draw.month, draw.day, draw.hour, draw.is_female
     
-    year_gz = lunar.getYearInGanZhi()
-    month_gz = lunar.getMonthInGanZhi()
-    day_gz = lunar.getDayInGanZhi()
-    hour_gz = lunar.getTimeInGanZhi()
+    # 四柱按节气表算，同 lunar_python 八字：立春换年、交节换月
+    year_code, month_code, day_code, hour_code = draw.codes
+    year_gz, month_gz, day_gz = _PILLAR_CHARS[year_code], _PILLAR_CHARS[month_code], _PILLAR_CHARS[day_code]
+    hour_gz = _PILLAR_CHARS[hour_code]
     
     chart = {
         'year_gan': year_gz[0], 'year_zhi': year_gz[1],
@@ -54,12 +88,14 @@ def generate_random_bazi(advanced_mode=False):
         'is_female': is_female,
         'advanced_mode': advanced_mode
     }
+    if seed is not None:
+        chart['seed'] = seed
     
     if advanced_mode:
-        dayun_gan, dayun_zhi = calculate_dayun(year_gz[0], month_gz, is_female)
-        current_year = random.randint(2020, 2024)
-        current_solar = Solar.fromYmdHms(current_year, 1, 1, 0, 0, 0)
-        liunian_gz = current_solar.getLunar().getYearInGanZhi()
+        dayun_gan, dayun_zhi = _PILLAR_CHARS[_dayun_code(year_code % 10, month_code, is_female, draw.dayun_steps)]
+        current_year = draw.current_year
+        # 元旦在立春前，流年为上一年的干支
+        liunian_gz = _PILLAR_CHARS[draw.liunian]
         
         chart.update({
             'dayun_gan': dayun_gan, 'dayun_zhi': dayun_zhi,
@@ -71,112 +107,129 @@ def generate_random_bazi(advanced_mode=False):
     
     return chart
 
-def detect_all_relationships(chart, relationship_settings):
-    """Detect all possible relationships in the chart"""
+DETECT_CACHE_SIZE = 4096
+
+
+class FrozenList(list):
+    """A list that refuses in-place changes; compares and serializes like a list."""
+
+    def _frozen(self, *args, **kwargs):
+        raise TypeError("cached relationships are read-only; copy before changing")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _frozen
+    append = extend = insert = pop = remove = clear = sort = reverse = _frozen
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+
+class FrozenRelationship(dict):
+    """A relationship dict that refuses changes; .copy() gives a plain dict."""
+
+    def _frozen(self, *args, **kwargs):
+        raise TypeError("cached relationships are read-only; copy before changing")
+
+    __setitem__ = __delitem__ = __ior__ = _frozen
+    update = setdefault = pop = popitem = clear = _frozen
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+
+def _relationship(type_, positions, characters, desc, full_desc, points):
+    relationship = {'type': type_, 'positions': FrozenList(positions), 'characters': FrozenList(characters),
+                    'description': desc}
+    if full_desc:
+        relationship['full_description'] = full_desc
+    relationship['points'] = points
+    return FrozenRelationship(relationship)
+
+
+def _pair_relationships(relationships, codes, chars, size, matrix, records, enabled, boosted):
+    """Append the enabled pair relations of codes, in pair order."""
+    for i in range(len(codes)):
+        row = codes[i] * size
+        for j in range(i+1, len(codes)):
+            cell = row + codes[j]
+            if not matrix[cell] & enabled:
+                continue
+            for bit, type_, desc, full_desc, points, boosted_points in records[cell]:
+                if bit & enabled:
+                    relationships.append(_relationship(type_, [i, j], [chars[i], chars[j]], desc, full_desc,
+                                                       boosted_points if boosted[j] else points))
+
+
+def _combinations(zhi_codes, codes):
+    """Every way to take one position of each branch in codes: sorted position lists, ascending."""
+    position_lists = [[seq for seq, code in enumerate(zhi_codes) if code == item] for item in codes]
+    return sorted(sorted(combo) for combo in itertools.product(*position_lists))
+
+
+@functools.lru_cache(maxsize=DETECT_CACHE_SIZE)
+def detect_relationships(gans, zhis, enabled):
+    """Relationships of a 4- or 6-pillar chart given as tuples of characters.
+
+    enabled is the settings mask (see relation_masks.settings_mask). The
+    result is cached and shared: a FrozenList of FrozenRelationship.
+    detect_relationships.cache_info() gives the hit/miss counters.
+    """
     relationships = []
-    gans = chart['gans']
-    zhis = chart['zhis']
-    num_pillars = 6 if chart.get('advanced_mode', False) else 4
-    
+    num_pillars = len(gans)
+    gan_codes, zhi_codes = encode(gans, zhis)
+    enabled &= DETECTED_BITS
+    # 六柱模式下涉及大运或流年的位置加分
+    boosted = [num_pillars == 6 and seq >= 4 for seq in range(num_pillars)]
+
     # Check Gan relationships (天干)
-    for i in range(num_pillars):
-        for j in range(i+1, num_pillars):
-            gan1, gan2 = gans[i], gans[j]
-            
-            if relationship_settings.get('天干五合', True) and ((gan1, gan2) in gan_hes or (gan2, gan1) in gan_hes):
-                rel_info = gan_hes.get((gan1, gan2), gan_hes.get((gan2, gan1)))
-                points = 15 if (i >= 4 or j >= 4) and num_pillars == 6 else 10
-                element = "".join(c for c in rel_info if c in "土金水木火")
-                short_desc = f"{gan1}{gan2}合化{element}" if element else f"{gan1}{gan2}相合"
-                relationships.append({'type': '天干五合','positions': [i, j],'characters': [gan1, gan2],'description': short_desc,'full_description': rel_info,'points': points})
-            
-            if relationship_settings.get('天干相冲', True) and ((gan1, gan2) in gan_chongs or (gan2, gan1) in gan_chongs):
-                points = 12 if (i >= 4 or j >= 4) and num_pillars == 6 else 8
-                relationships.append({'type': '天干相冲','positions': [i, j],'characters': [gan1, gan2],'description': "天干相冲，主冲突不和",'points': points})
+    _pair_relationships(relationships, gan_codes, gans, 10, GAN_MATRIX, GAN_RECORDS, enabled, boosted)
 
     # Check Zhi relationships (地支)
-    for i in range(num_pillars):
-        for j in range(i+1, num_pillars):
-            zhi1, zhi2 = zhis[i], zhis[j]
-            
-            if relationship_settings.get('地支六合', True) and zhi_atts[zhi1]['六'] == zhi2:
-                points = 18 if (i >= 4 or j >= 4) and num_pillars == 6 else 12
-                pair_key, reverse_key = f"{zhi1}{zhi2}", f"{zhi2}{zhi1}"
-                element = zhi_6hes.get(pair_key, zhi_6hes.get(reverse_key, ""))
-                desc = f"{zhi1}{zhi2}六合化{element}" if element else f"{zhi1}{zhi2}六合"
-                relationships.append({'type': '地支六合','positions': [i, j],'characters': [zhi1, zhi2],'description': desc,'points': points})
-
-            if relationship_settings.get('地支相冲', True) and zhi_atts[zhi1]['冲'] == zhi2:
-                points = 15 if (i >= 4 or j >= 4) and num_pillars == 6 else 10
-                relationships.append({'type': '地支相冲','positions': [i, j],'characters': [zhi1, zhi2],'description': "地支相冲，主动荡变化",'points': points})
-
-            if relationship_settings.get('地支相刑', True) and zhi_atts[zhi1]['刑'] == zhi2:
-                points = 20 if (i >= 4 or j >= 4) and num_pillars == 6 else 15
-                relationships.append({'type': '地支相刑','positions': [i, j],'characters': [zhi1, zhi2],'description': "地支相刑，主刑伤阻滞",'points': points})
-
-            if relationship_settings.get('地支相害', True) and zhi_atts[zhi1]['害'] == zhi2:
-                points = 18 if (i >= 4 or j >= 4) and num_pillars == 6 else 12
-                relationships.append({'type': '地支相害','positions': [i, j],'characters': [zhi1, zhi2],'description': "地支相害，主暗中损害",'points': points})
-
-            if relationship_settings.get('地支相破', True) and zhi_atts[zhi1]['破'] == zhi2:
-                points = 15 if (i >= 4 or j >= 4) and num_pillars == 6 else 10
-                relationships.append({'type': '地支相破','positions': [i, j],'characters': [zhi1, zhi2],'description': "地支相破，主破坏损失",'points': points})
-
-    # Check 三合 (triple harmonies)
-    if relationship_settings.get('地支三合局', True):
-        sanhe_patterns = [
-            (['申', '子', '辰'], '申子辰三合水局'), (['寅', '午', '戌'], '寅午戌三合火局'),
-            (['巳', '酉', '丑'], '巳酉丑三合金局'), (['亥', '卯', '未'], '亥卯未三合木局')
-        ]
-        for pattern, desc in sanhe_patterns:
-            # This complex logic handles full combinations, partial combinations, and avoids duplicates
-            # It's copied verbatim from the original BaziGame class
-            positions, chars = [], []
-            temp_zhis = list(zhis[:num_pillars])
-            
-            for p_char in pattern:
-                if p_char in temp_zhis:
-                    idx = temp_zhis.index(p_char)
-                    positions.append(idx)
-                    chars.append(p_char)
-                    temp_zhis[idx] = None # Avoid reusing the same character
-            
-            if len(positions) == 3:
-                points = 30 if any(p >= 4 for p in positions) and num_pillars == 6 else 20
-                relationships.append({'type': '地支三合', 'positions': sorted(positions), 'characters': chars, 'description': desc, 'points': points})
-            elif len(positions) == 2:
-                points = 18 if any(p >= 4 for p in positions) and num_pillars == 6 else 12
-                element_map = {'水':"水", '火':"火", '金':"金", '木':"木"}
-                element = element_map.get(desc[-2])
-                pair_tuple = tuple(sorted(chars))
-                half_info = zhi_half_3hes.get(pair_tuple, zhi_half_3hes.get(tuple(reversed(pair_tuple)), ""))
-                half_desc = f"{''.join(chars)}半合 {half_info}" if half_info else f"{''.join(chars)}半合化{element}"
-                relationships.append({'type': '地支半合', 'positions': sorted(positions), 'characters': chars, 'description': half_desc, 'points': points})
-
-    # Check 三会 (triple meetings)
-    if relationship_settings.get('地支三会方', True):
-        sanhui_patterns = [
-            (['亥', '子', '丑'], '亥子丑三会水方'), (['寅', '卯', '辰'], '寅卯辰三会木方'),
-            (['巳', '午', '未'], '巳午未三会火方'), (['申', '酉', '戌'], '申酉戌三会金方')
-        ]
-        for pattern, desc in sanhui_patterns:
-            positions, chars = [], []
-            temp_zhis = list(zhis[:num_pillars])
-            for p_char in pattern:
-                if p_char in temp_zhis:
-                    idx = temp_zhis.index(p_char)
-                    positions.append(idx)
-                    chars.append(p_char)
-                    temp_zhis[idx] = None # Avoid reusing
-            
-            if len(positions) == 3:
-                points = 27 if any(p >= 4 for p in positions) and num_pillars == 6 else 18
-                relationships.append({'type': '地支三会', 'positions': sorted(positions), 'characters': chars, 'description': desc, 'points': points})
-            elif len(positions) == 2:
-                points = 15 if any(p >= 4 for p in positions) and num_pillars == 6 else 10
-                element_map = {'水':"水", '木':"木", '火':"火", '金':"金"}
-                element = element_map.get(desc[-2])
-                half_desc = f"{''.join(chars)}半会化{element}"
-                relationships.append({'type': '地支半会', 'positions': sorted(positions), 'characters': chars, 'description': half_desc, 'points': points})
-
-    return relationships
\ No newline at end of file
+    _pair_relationships(relationships, zhi_codes, zhis, 12, ZHI_MATRIX, ZHI_RECORDS, enabled, boosted)
+
+    # Check 三合 (triple harmonies), 三会 (triple meetings) and 三刑
+    # 一次记下出现的地支、重复的地支和每个地支第一次出现的位置；
+    # 地支重复时每种位置组合各算一条
+    first_pos = [-1] * 12
+    branch_mask = repeated_mask = 0
+    for seq in range(num_pillars - 1, -1, -1):
+        code = zhi_codes[seq]
+        if first_pos[code] >= 0:
+            repeated_mask |= 1 << code
+        first_pos[code] = seq
+        branch_mask |= 1 << code
+
+    for pattern in TRIPLE_PATTERNS:
+        if not pattern.bit & enabled:
+            continue
+        result = pattern.results.get(branch_mask & pattern.mask)
+        if result is None:
+            continue
+        type_, desc, points, boosted_points, codes, chars = result
+        if repeated_mask & pattern.mask:
+            combinations = _combinations(zhi_codes, codes)
+        else:
+            combinations = [sorted(first_pos[item] for item in codes)]
+        for positions in combinations:
+            relationships.append(_relationship(type_, positions, chars, desc, None,
+                                               boosted_points if boosted[positions[-1]] else points))
+
+    return FrozenList(relationships)
+
+
+def detect_all_relationships(chart, relationship_settings):
+    """Detect all possible relationships in the chart
+
+    Results are shared through detect_relationships' cache and read-only;
+    copy a relationship before changing it.
+    """
+    num_pillars = 6 if chart.get('advanced_mode', False) else 4
+    return detect_relationships(tuple(chart['gans'][:num_pillars]), tuple(chart['zhis'][:num_pillars]),
+                                settings_mask(relationship_settings) & DETECTED_BITS)
+
+
+def detection_stats():
+    """Hit/miss counters of the detection cache."""
+    info = detect_relationships.cache_info()
+    total = info.hits + info.misses
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize,
+            'hit_rate': info.hits / total if total else 0.0}
@@ -0,0 +1,58 @@
+# netlify/functions/catalog.py
+# -*- coding: utf-8 -*-
+import json
+import sys
+import os
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+
+from relation_catalog import VERSION, entries
+
+ETAG = '"{}"'.format(VERSION)
+
+
+def catalog_headers(query, request_headers):
+    """(status code, cache headers) for a catalog request.
+
+    Requests naming the current version (?v=...) may be cached for good;
+    others are revalidated hourly against the ETag.
+    """
+    headers = {'ETag': ETAG}
+    if (query or {}).get('v') == VERSION:
+        headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        headers['Cache-Control'] = 'public, max-age=3600'
+    request_headers = {key.lower(): value for key, value in (request_headers or {}).items()}
+    if request_headers.get('if-none-match') == ETAG:
+        return 304, headers
+    return 200, headers
+
+
+def handler(event, context):
+    """
+    Netlify Function handler for the relationship description catalog.
+    """
+    # Handle CORS preflight requests
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Methods': 'GET, OPTIONS'
+            },
+            'body': ''
+        }
+
+    status, headers = catalog_headers(event.get('queryStringParameters'), event.get('headers'))
+    headers.update({
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type',
+    })
+    return {
+        'statusCode': status,
+        'headers': headers,
+        'body': json.dumps(entries(), ensure_ascii=False) if status == 200 else ''
+    }
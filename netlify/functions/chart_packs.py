@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline chart packs: precomputed games the frontend keeps for offline play.
+
+    python netlify/functions/chart_packs.py [--count 2000] [--shards 2] [--jobs N] [--seed S]
+
+For each mode (basic, advanced) and settings preset (PRESETS) this
+writes `shards` gzip'd JSON files of `count` games each under packs/ in
+the publish directory. It also writes packs/manifest.json, which lists
+them with their settings and the catalog version.
+
+A pack is {'mode', 'preset', 'mask', 'catalog', 'games': [row, ...]},
+with each game stored as a row (see pack_row):
+
+    [seed, gans, zhis, date_info, is_female, current_year, relationships]
+
+gans and zhis are strings, current_year is None in basic mode, and the
+relationships are in relation_catalog's compact form. The frontend
+rebuilds the chart from the row and checks selections locally.
+
+Games are generated by a process pool across all cores. Shards are
+independent tasks, and the tool prints each pack's size plus the
+overall throughput.
+"""
+import argparse
+import concurrent.futures
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bazi_utils import SEED_BITS, detect_all_relationships, generate_random_bazi, new_seed
+from new_game import DEFAULT_SETTINGS
+from relation_bits import settings_mask
+from relation_catalog import VERSION, compact
+
+PUBLISH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+PACK_DIR = 'packs'
+MODES = {'basic': False, 'advanced': True}
+PRESETS = {
+    'default': DEFAULT_SETTINGS,
+    'all': {name: True for name in DEFAULT_SETTINGS},
+    'simple': {name: name in ('天干五合', '天干相冲', '地支六合', '地支相冲') for name in DEFAULT_SETTINGS},
+}
+
+
+def pack_row(chart, all_relationships):
+    return [chart['seed'], ''.join(chart['gans']), ''.join(chart['zhis']), chart['date_info'],
+            chart['is_female'], chart.get('current_year'), compact(all_relationships)]
+
+
+def chart_from_row(row, advanced_mode):
+    """The chart dict of a pack row (same as generate_random_bazi's)."""
+    seed, gans, zhis, date_info, is_female, current_year, _ = row
+    chart = {}
+    for seq, name in enumerate(('year', 'month', 'day', 'hour')):
+        chart[name + '_gan'], chart[name + '_zhi'] = gans[seq], zhis[seq]
+    chart.update({'gans': list(gans[:4]), 'zhis': list(zhis[:4]), 'date_info': date_info,
+                  'is_female': is_female, 'advanced_mode': advanced_mode, 'seed': seed})
+    if advanced_mode:
+        chart.update({'dayun_gan': gans[4], 'dayun_zhi': zhis[4], 'liunian_gan': gans[5], 'liunian_zhi': zhis[5],
+                      'gans': list(gans), 'zhis': list(zhis), 'current_year': current_year})
+    return chart
+
+
+def _seeds(base, mode, preset, shard, count):
+    rng = random.Random('{}:{}:{}:{}'.format(base, mode, preset, shard))
+    return [rng.getrandbits(SEED_BITS) for _ in range(count)]
+
+
+def build_pack(base, mode, preset, shard, count):
+    """One shard: returns (file name, pack dict). Runs in a worker process."""
+    advanced_mode, settings = MODES[mode], PRESETS[preset]
+    games = []
+    for seed in _seeds(base, mode, preset, shard, count):
+        chart = generate_random_bazi(advanced_mode, seed=seed)
+        games.append(pack_row(chart, detect_all_relationships(chart, settings)))
+    name = '{}-{}-{}.json.gz'.format(mode, preset, shard)
+    return name, {'mode': mode, 'preset': preset, 'mask': settings_mask(settings), 'catalog': VERSION,
+                  'games': games}
+
+
+def build(count=2000, shards=2, jobs=None, base=None, publish_dir=PUBLISH_DIR, log=print):
+    """Write all packs and the manifest; returns the manifest."""
+    base = new_seed() if base is None else base
+    directory = os.path.join(publish_dir, PACK_DIR)
+    os.makedirs(directory, exist_ok=True)
+    tasks = [(base, mode, preset, shard, count) for mode in MODES for preset in PRESETS for shard in range(shards)]
+    manifest = {'catalog': VERSION, 'created': time.strftime('%Y-%m-%d %H:%M:%S'), 'packs': []}
+
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(build_pack, *task) for task in tasks]
+        for future in futures:
+            name, pack = future.result()
+            data = json.dumps(pack, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            compressed = gzip.compress(data, 9, mtime=0)
+            with open(os.path.join(directory, name), 'wb') as f:
+                f.write(compressed)
+            manifest['packs'].append({'file': name, 'mode': pack['mode'], 'preset': pack['preset'],
+                                      'settings': PRESETS[pack['preset']], 'mask': pack['mask'],
+                                      'count': len(pack['games']), 'bytes': len(compressed)})
+            log("{:<28} {:>6} games {:>9} bytes json {:>8} bytes gz {:>6.1f} bytes/game".format(
+                name, len(pack['games']), len(data), len(compressed), len(compressed) / max(len(pack['games']), 1)))
+    elapsed = time.perf_counter() - start
+
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    total = count * len(tasks)
+    log("{} games in {:.2f} s ({:.0f} games/s, {} workers), {} bytes".format(
+        total, elapsed, total / elapsed, jobs or os.cpu_count(), sum(item['bytes'] for item in manifest['packs'])))
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=2000, help='games per pack shard')
+    parser.add_argument('--shards', type=int, default=2, help='shards per mode and preset')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--seed', type=int, default=None, help='base seed (default: random)')
+    parser.add_argument('--out', default=PUBLISH_DIR, help='publish directory')
+    options = parser.parse_args(argv)
+    build(options.count, options.shards, options.jobs, options.seed, options.out)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
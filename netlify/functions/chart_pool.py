@@ -0,0 +1,170 @@
+# netlify/functions/chart_pool.py
+# -*- coding: utf-8 -*-
+"""
+Pool of ready-made games for new_game.
+
+generate_random_bazi plus detect_all_relationships is the slowest part of
+new_game. The pool keeps charts with their relationships already
+detected, keyed by (advanced_mode, settings_mask(settings)). A daemon
+thread tops a key back up to `size` whenever a pop leaves it below
+`low_water`.
+
+A key is filled only after it is first requested. Until its queue has
+entries, get() generates inline. The size comes from BAZI_POOL_SIZE and
+the low-water mark from BAZI_POOL_LOW_WATER. A size of 0 turns the pool
+off.
+
+take() serves a batch (/api/new_games) from the same queues.
+stats() returns the hit and miss counters and the queue sizes.
+"""
+import collections
+import os
+import threading
+
+from bazi_utils import generate_random_bazi, detect_all_relationships, new_seed
+from relation_bits import settings_mask
+
+POOL_SIZE = int(os.environ.get('BAZI_POOL_SIZE', 32))
+LOW_WATER = int(os.environ.get('BAZI_POOL_LOW_WATER', 8))
+
+
+def generate_game(advanced_mode, settings, seed=None):
+    """One new game: (chart, all_relationships).
+
+    Every chart is generated from its own seed (a fresh one unless given),
+    recorded as chart['seed'], so any game can be replayed.
+    """
+    chart = generate_random_bazi(advanced_mode, seed=new_seed() if seed is None else seed)
+    return chart, detect_all_relationships(chart, settings)
+
+
+class ChartPool:
+    """Ready games per (mode, settings mask), refilled by a background thread."""
+
+    def __init__(self, size=POOL_SIZE, low_water=LOW_WATER, generate=generate_game):
+        self.size = size
+        self.low_water = min(low_water, size)
+        self._generate = generate
+        self._ready = {}                # key -> deque of (chart, all_relationships)
+        self._settings = {}             # key -> settings used to generate it
+        self._pending = collections.OrderedDict()
+        self._cond = threading.Condition()
+        self._worker = None
+        self._closed = False
+        self.counters = collections.Counter(hits=0, misses=0, generated=0, errors=0)
+
+    @staticmethod
+    def key(advanced_mode, settings):
+        return bool(advanced_mode), settings_mask(settings)
+
+    def get(self, advanced_mode, settings):
+        """Pop a ready game, or generate one inline when the queue is empty."""
+        key = self.key(advanced_mode, settings)
+        item = None
+        with self._cond:
+            queue = self._ready.setdefault(key, collections.deque())
+            self._settings.setdefault(key, dict(settings))
+            if queue:
+                item = queue.popleft()
+                self.counters['hits'] += 1
+            else:
+                self.counters['misses'] += 1
+            if len(queue) < self.low_water:
+                self._request(key)
+        if item is None:
+            item = self._generate(advanced_mode, settings)
+        return item
+
+    def take(self, advanced_mode, settings, count):
+        """Pop up to count ready games and generate the rest inline; returns a list of count games.
+
+        The refill thread is woken before the shortfall is generated, so it
+        tops the queue up for the next request while this one is served.
+        """
+        key = self.key(advanced_mode, settings)
+        with self._cond:
+            queue = self._ready.setdefault(key, collections.deque())
+            self._settings.setdefault(key, dict(settings))
+            items = [queue.popleft() for _ in range(min(count, len(queue)))]
+            self.counters['hits'] += len(items)
+            self.counters['misses'] += count - len(items)
+            if len(queue) < self.low_water:
+                self._request(key)
+        while len(items) < count:
+            items.append(self._generate(advanced_mode, settings))
+        return items
+
+    def fill(self, advanced_mode, settings, count=None):
+        """Generate games for a key in the calling thread, up to size (or count more)."""
+        key = self.key(advanced_mode, settings)
+        with self._cond:
+            queue = self._ready.setdefault(key, collections.deque())
+            self._settings.setdefault(key, dict(settings))
+            missing = self.size - len(queue) if count is None else count
+        for _ in range(max(missing, 0)):
+            self._add(key, self._generate(advanced_mode, settings))
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self.size,
+                'low_water': self.low_water,
+                'ready': {'{}:{}'.format('advanced' if key[0] else 'basic', key[1]): len(queue)
+                          for key, queue in self._ready.items()},
+                **self.counters,
+            }
+
+    def close(self):
+        """Stop the refill thread; get() keeps working inline."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+
+    def _add(self, key, item):
+        with self._cond:
+            self._ready[key].append(item)
+            self.counters['generated'] += 1
+
+    def _request(self, key):
+        # 调用时已持有 self._cond
+        if self.size <= 0 or self._closed:
+            return
+        self._pending[key] = True
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name='chart-pool', daemon=True)
+            self._worker.start()
+        self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key = next(iter(self._pending))
+                if len(self._ready[key]) >= self.size:
+                    del self._pending[key]
+                    continue
+                settings = self._settings[key]
+            try:
+                item = self._generate(key[0], settings)
+            except Exception:
+                with self._cond:
+                    self.counters['errors'] += 1
+                    del self._pending[key]
+                continue
+            self._add(key, item)
+
+
+_pool = None
+
+
+def get_pool():
+    """The process-wide pool, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ChartPool()
+    return _pool
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+随机命盘的查表抽样，generate_random_bazi 用。
+
+游戏的随机命盘取 1950–2020 年、1–12 月、1–28 日、0–23 时中均匀的一个时刻，
+性别各半；六柱再加大运步数 2–6、流年 2020–2024。这里把这些组合编成一个
+整数，一次 rng.randrange 抽出，再按表查出四柱，不再逐次换算节气：
+
+- 日柱、时柱是算术；
+- 年柱、月柱只在节的交接时刻变化，一天之内最多变一次。表中每天记三项：
+  0 时的年月柱、从哪个整点起变（24 为不变）、变后的年月柱。
+
+分布与逐项 randint 完全相同，同一 rng 状态抽出的组合不同而已。表存于
+charts.snap，记有 jieqi.bin、jieqi.py 的 CRC；缺失或过期时从节气表现算：
+
+    python chart_sampler.py     # 节气表或范围改动后重新生成并逐时核对
+"""
+
+import collections
+import datetime
+import marshal
+import os
+import sys
+import zlib
+from array import array
+
+import jieqi
+from tables import pillar_code
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.path.join(_HERE, 'charts.snap')
+SOURCES = ('jieqi.bin', 'jieqi.py')
+_VERSION = 1
+
+START_YEAR, END_YEAR = 1950, 2020
+DAYS_PER_MONTH = 28                     # 只取每月 1–28 日
+DAYS = (END_YEAR - START_YEAR + 1) * 12 * DAYS_PER_MONTH
+HOURS = 24
+DAYUN_STEPS = range(2, 7)
+LIUNIAN_YEARS = range(2020, 2025)
+# 四柱组合数（含性别）；六柱再乘大运步数和流年
+COMBOS = DAYS * HOURS * 2
+ADVANCED_COMBOS = COMBOS * len(DAYUN_STEPS) * len(LIUNIAN_YEARS)
+_NO_SWITCH = 24
+
+# codes 为年、月、日、时柱编码；liunian 为流年的干支编码
+Draw = collections.namedtuple('Draw', 'year month day hour is_female codes dayun_steps current_year liunian')
+
+def _date(day_index):
+    year, rest = divmod(day_index, 12 * DAYS_PER_MONTH)
+    month, day = divmod(rest, DAYS_PER_MONTH)
+    return START_YEAR + year, month + 1, day + 1
+
+
+def _checksum():
+    crc = 0
+    for name in SOURCES:
+        with open(os.path.join(_HERE, name), 'rb') as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+def _from_table(table=None):
+    """逐日算出年月柱表：(0 时编码, 变化整点, 变后编码) 三个数组，编码为 年柱*60+月柱。"""
+    table = table or jieqi.get_table()
+    start, switch, after = array('H'), array('B'), array('H')
+    for day_index in range(DAYS):
+        seconds = jieqi._seconds(*_date(day_index))
+        first = table.month_year_codes(seconds)
+        last = table.month_year_codes(seconds + 23 * 3600)
+        start.append(first[0] * 60 + first[1])
+        after.append(last[0] * 60 + last[1])
+        if first == last:
+            switch.append(_NO_SWITCH)
+        else:
+            # 当天交节：从交接时刻之后的第一个整点起用新的年月柱
+            instant = table.around(seconds)[1][1]
+            delta = (instant - datetime.datetime(*_date(day_index))).total_seconds()
+            switch.append(-int(-delta // 3600))
+    return start, switch, after
+
+
+def _liunian(table=None):
+    # 元旦在立春前，流年为上一年的干支
+    return tuple(jieqi.four_pillars(year, 1, 1, 0, table=table)[0] for year in LIUNIAN_YEARS)
+
+
+def build(path=SNAPSHOT_PATH):
+    """重新生成 charts.snap，并与 jieqi.four_pillars 逐时核对；返回核对的时刻数。"""
+    start, switch, after = _from_table()
+    sampler = Sampler(start, switch, after, _liunian())
+    checked = sampler.verify()
+    with open(path, 'wb') as f:
+        marshal.dump((_VERSION, _checksum(), START_YEAR, END_YEAR, start.tobytes(), switch.tobytes(),
+                      after.tobytes(), sampler.liunian), f)
+    return checked
+
+
+def _load(path=SNAPSHOT_PATH):
+    try:
+        with open(path, 'rb') as f:
+            version, checksum, start_year, end_year, start, switch, after, liunian = marshal.load(f)
+        if (version, checksum, start_year, end_year) != (_VERSION, _checksum(), START_YEAR, END_YEAR):
+            return None
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    arrays = array('H'), array('B'), array('H')
+    for item, data in zip(arrays, (start, switch, after)):
+        item.frombytes(data)
+        if sys.byteorder != 'little':
+            item.byteswap()
+    return Sampler(*arrays, liunian)
+
+
+class Sampler:
+    """按组合编号查出时刻和四柱。"""
+
+    def __init__(self, start, switch, after, liunian):
+        self.start = start
+        self.switch = switch
+        self.after = after
+        self.liunian = liunian
+
+    def draw(self, number):
+        """第 number 个组合（0 <= number < ADVANCED_COMBOS；小于 COMBOS 时不含大运、流年）。"""
+        number, hour = divmod(number, HOURS)
+        number, female = divmod(number, 2)
+        number, day_index = divmod(number, DAYS)
+        steps, liunian = divmod(number, len(LIUNIAN_YEARS))
+        month_index, day = divmod(day_index, DAYS_PER_MONTH)
+
+        ym = self.after[day_index] if hour >= self.switch[day_index] else self.start[day_index]
+        day_code = (_MONTH_DAY_CODES[month_index] + day) % 60
+        return Draw(START_YEAR + month_index // 12, month_index % 12 + 1, day + 1, hour, female == 1,
+                    (ym // 60, ym % 60, day_code, _TIME_CODES[day_code % 10 * HOURS + hour]),
+                    DAYUN_STEPS[steps], LIUNIAN_YEARS[liunian], self.liunian[liunian])
+
+    def sample(self, rng, advanced_mode=False):
+        """均匀抽一个组合。"""
+        return self.draw(rng.randrange(ADVANCED_COMBOS if advanced_mode else COMBOS))
+
+    def verify(self):
+        """与 jieqi.four_pillars 逐时比对全部组合，不一致时抛 ValueError；返回比对数。"""
+        for number in range(DAYS * HOURS * 2):
+            # 性别在第二位，跳过女命的一半
+            if number // HOURS % 2:
+                continue
+            draw = self.draw(number)
+            expected = jieqi.four_pillars(draw.year, draw.month, draw.day, draw.hour)
+            if draw.codes != expected:
+                raise ValueError("{}-{}-{} {}h: {} != {}".format(draw.year, draw.month, draw.day, draw.hour,
+                                                                 draw.codes, expected))
+        if self.liunian != _liunian():
+            raise ValueError("liunian {} != {}".format(self.liunian, _liunian()))
+        return DAYS * HOURS
+
+
+# 每月 1 日的日柱编码
+_MONTH_DAY_CODES = tuple((datetime.date(START_YEAR + seq // 12, seq % 12 + 1, 1).toordinal() + jieqi._JDN_OFFSET - 11)
+                         % 60 for seq in range(DAYS // DAYS_PER_MONTH))
+
+
+def _time_code(day_gan, hour):
+    time_zhi = (hour + 1) // 2 % 12
+    # 晚子时：时干按次日日干起
+    day_gan = (day_gan + (1 if hour == 23 else 0)) % 10
+    return pillar_code((day_gan % 5 * 2 + time_zhi) % 10, time_zhi)
+
+
+# 按日干、时辰查时柱编码
+_TIME_CODES = tuple(_time_code(day_gan, hour) for day_gan in range(10) for hour in range(HOURS))
+
+_sampler = None
+
+
+def get_sampler():
+    """默认抽样表，第一次用到时读入（快照过期则现算）。"""
+    global _sampler
+    if _sampler is None:
+        _sampler = _load()
+        if _sampler is None:
+            _sampler = Sampler(*_from_table(), _liunian())
+    return _sampler
+
+
+if __name__ == '__main__':
+    print("{} hours checked, table written to {}".format(build(), SNAPSHOT_PATH))
+    sys.exit(0)
@@ -7,12 +7,13 @@ import os
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
-from bazi_utils import detect_all_relationships
+from game_sessions import check_request
 
 def handler(event, context):
     """
     Netlify Function handler for checking a relationship.
-    This function is now stateless. It relies entirely on the data sent from the frontend.
+    With a session token only the positions are sent; otherwise the frontend
+    sends the whole game state, as before.
     """
     # Handle CORS preflight requests
     if event.get('httpMethod') == 'OPTIONS':
@@ -27,91 +28,18 @@ def handler(event, context):
         }
     
     try:
-        # Get all necessary data from the frontend
+        # Session token and positions, or the whole game state
         data = json.loads(event.get('body', '{}'))
-        positions = data.get('positions', [])
-        chart = data.get('chart')
-        all_relationships = data.get('all_relationships', [])
-        found_relationships = data.get('found_relationships', [])
-        
-        # Basic validation
-        if not all([chart, positions]):
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Missing required data: chart and positions.'})
-            }
-        
-        if len(positions) < 2 or len(positions) > 3:
-            return {
-                'statusCode': 400,
-                'body': json.dumps({'error': 'Invalid number of positions selected'})
-            }
-
-        # Normalize positions for comparison
-        sorted_positions = sorted(positions)
-        
-        # Check if this exact combination of positions has already been found
-        for rel in found_relationships:
-            if sorted(rel.get('actual_positions', [])) == sorted_positions:
-                return {
-                    'statusCode': 200,
-                    'body': json.dumps({'found': False, 'message': 'This relationship has already been found.'})
-                }
-
-        # Find a matching relationship from the pre-calculated list
-        found_match = None
-        for rel in all_relationships:
-            # We must match the characters because positions might differ if zhis are duplicated
-            selected_chars = []
-            num_pillars = 6 if chart.get('advanced_mode') else 4
-            gans = chart.get('gans', [])
-            zhis = chart.get('zhis', [])
-
-            for pos in sorted_positions:
-                if pos >= num_pillars: # This is a zhi position
-                    selected_chars.append(zhis[pos - num_pillars])
-                else: # This is a gan position
-                    selected_chars.append(gans[pos])
-
-            # Check if the selected characters match the relationship's characters
-            if sorted(rel['characters']) == sorted(selected_chars):
-                # Check if this EXACT combination of positions has been found before
-                # For duplicates like 甲庚庚, [0,1] and [0,2] are different relationships
-                is_already_found = False
-                for found_rel in found_relationships:
-                    if (found_rel['type'] == rel['type'] and 
-                        sorted(found_rel.get('actual_positions', found_rel['positions'])) == sorted_positions):
-                        is_already_found = True
-                        break
-                
-                if not is_already_found:
-                    found_match = rel
-                    break
-
-        if found_match:
-            # Add the actual positions from user selection to the found relationship
-            response_rel = found_match.copy()
-            response_rel['actual_positions'] = sorted_positions
-
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Headers': 'Content-Type',
-                },
-                'body': json.dumps({'found': True, 'relationship': response_rel}, ensure_ascii=False)
-            }
-        else:
-            return {
-                'statusCode': 200,
-                 'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*',
-                    'Access-Control-Allow-Headers': 'Content-Type',
-                },
-                'body': json.dumps({'found': False, 'message': 'No valid relationship found for the selection.'}, ensure_ascii=False)
-            }
+        status, body = check_request(data)
+        return {
+            'statusCode': status,
+            'headers': {
+                'Content-Type': 'application/json',
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type',
+            },
+            'body': json.dumps(body, ensure_ascii=False)
+        }
 
     except Exception as e:
         return {
@@ -0,0 +1,57 @@
+# netlify/functions/daily.py
+# -*- coding: utf-8 -*-
+import sys
+import os
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+
+from daily_puzzles import entry_json, parse_date, seconds_left, today
+
+YEAR_SECONDS = 365 * 24 * 3600
+
+
+def daily_response(query, now=None):
+    """(status code, cache headers, body) for a daily puzzle request.
+
+    ?date=YYYY-MM-DD never changes, so it is cached for a year. Without a
+    date the answer is today's puzzle, cached until the next one.
+    """
+    text = (query or {}).get('date')
+    if text:
+        try:
+            date = parse_date(text)
+        except ValueError:
+            return 400, {'Cache-Control': 'no-store'}, '{"error": "date must be YYYY-MM-DD."}'
+        cache = 'public, max-age={}, immutable'.format(YEAR_SECONDS)
+    else:
+        date = today(now)
+        cache = 'public, max-age={}'.format(seconds_left(now))
+    return 200, {'Cache-Control': cache}, entry_json(date)
+
+
+def handler(event, context):
+    """
+    Netlify Function handler for the daily puzzle.
+    The same entry is published as static daily/YYYY-MM-DD.json; this serves
+    today's (or ?date=) entry for clients that don't know the date or miss it.
+    """
+    # Handle CORS preflight requests
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Methods': 'GET, OPTIONS'
+            },
+            'body': ''
+        }
+
+    status, headers, body = daily_response(event.get('queryStringParameters'))
+    headers.update({
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Allow-Headers': 'Content-Type',
+    })
+    return {'statusCode': status, 'headers': headers, 'body': body}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Daily puzzle: the same chart for every player on a given day.
+
+A day's charts come from seeds derived from the date, so any process
+produces identical entries. The build writes a year of them as static
+files under the publish directory, where the CDN serves them:
+
+    python netlify/functions/daily_puzzles.py [START_DATE] [DAYS]   # default: today, 366 days
+
+Each entry is daily/YYYY-MM-DD.json:
+
+    {'date': ..., 'basic': {'chart': ..., 'all_relationships': [...]}, 'advanced': {...}}
+
+The daily function returns the same entry for dates outside the
+generated range, computing it on the fly. Days change at midnight
+China Standard Time (UTC+8).
+"""
+import datetime
+import hashlib
+import json
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bazi_utils import SEED_BITS, detect_all_relationships, generate_random_bazi
+from new_game import DEFAULT_SETTINGS
+
+UTC_OFFSET = datetime.timedelta(hours=8)
+PUBLISH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..')
+DAILY_DIR = 'daily'
+DAYS_AHEAD = 366
+MODES = {'basic': False, 'advanced': True}
+
+
+def today(now=None):
+    """The puzzle date (UTC+8) at now, a UTC datetime (default: the current time)."""
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    return (now + UTC_OFFSET).date()
+
+
+def seconds_left(now=None):
+    """Seconds until the next puzzle."""
+    now = now or datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    local = now + UTC_OFFSET
+    tomorrow = datetime.datetime.combine(local.date() + datetime.timedelta(days=1), datetime.time())
+    return max(int((tomorrow - local).total_seconds()), 1)
+
+
+def parse_date(text):
+    """YYYY-MM-DD to a date; raises ValueError otherwise."""
+    return datetime.datetime.strptime(text, '%Y-%m-%d').date()
+
+
+def daily_seed(date, mode):
+    digest = hashlib.sha256('bazi-daily:{}:{}'.format(date.isoformat(), mode).encode('ascii')).digest()
+    return int.from_bytes(digest[:8], 'big') >> (64 - SEED_BITS)
+
+
+def entry(date):
+    """The puzzle of a day, for both modes with the default relationship settings."""
+    result = {'date': date.isoformat()}
+    for mode, advanced_mode in MODES.items():
+        chart = generate_random_bazi(advanced_mode, seed=daily_seed(date, mode))
+        chart['daily'] = date.isoformat()
+        result[mode] = {'chart': chart, 'all_relationships': detect_all_relationships(chart, DEFAULT_SETTINGS)}
+    return result
+
+
+def entry_json(date):
+    return json.dumps(entry(date), ensure_ascii=False, separators=(',', ':'))
+
+
+def write_days(start, days=DAYS_AHEAD, publish_dir=PUBLISH_DIR):
+    """Write daily/YYYY-MM-DD.json for days days from start; returns the directory."""
+    directory = os.path.join(publish_dir, DAILY_DIR)
+    os.makedirs(directory, exist_ok=True)
+    for offset in range(days):
+        date = start + datetime.timedelta(days=offset)
+        with open(os.path.join(directory, date.isoformat() + '.json'), 'w', encoding='utf-8') as f:
+            f.write(entry_json(date))
+    return directory
+
+
+if __name__ == '__main__':
+    start = parse_date(sys.argv[1]) if len(sys.argv) > 1 else today()
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else DAYS_AHEAD
+    print("{} daily puzzles from {} written to {}".format(days, start, os.path.normpath(write_days(start, days))))
+    sys.exit(0)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按难度抽命盘：关系数、关系类型、总分的离线索引，new_game 的 difficulty 等参数用。
+
+随机命盘的关系从零个到十几个不等，逐个生成再挑会拖慢响应。这里预先为
+每种模式生成一批固定种子的命盘（第 i 个的种子见 corpus_seed），记下每盘
+各类关系的个数和分数，存于 difficulty.snap：
+
+    python difficulty_index.py      # 命盘生成或关系检测改动后重新生成
+
+按 (模式, 设置掩码) 第一次查询时把启用的类型加总，得到每盘的关系数和
+总分；每种条件的命盘编号列表算一次后缓存，之后抽一盘为 O(1)，再按种子
+生成同一命盘。难度按关系数的排名划分：至少有一个关系的命盘按关系数
+排序后平分三份，依次为 easy、medium、hard。关系数相同的命盘可能分在
+相邻两档，只开一两种关系时三档也都不空。
+
+快照记有生成所依赖文件的 CRC；缺失或过期时现算一个小语料。
+"""
+
+import collections
+import marshal
+import os
+import random
+import sys
+import zlib
+from array import array
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bazi_utils import SEED_BITS, detect_all_relationships, generate_random_bazi
+from chart_pool import generate_game
+from relation_bits import DETECTED_BITS, settings_mask
+from tables import GAN_RECORDS, ZHI_RECORDS, TRIPLE_PATTERNS
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.path.join(_HERE, 'difficulty.snap')
+SOURCES = ('bazi_utils.py', 'chart_sampler.py', 'charts.snap', 'tables.snap')
+_VERSION = 1
+
+CORPUS_SIZE = 20000
+FALLBACK_SIZE = 2000
+MODES = {'basic': False, 'advanced': True}
+DIFFICULTIES = ('easy', 'medium', 'hard')
+_MAX_BUCKETS = 256
+
+# 第 i 个命盘的种子：奇数乘子在 2**48 内是一一映射，两种模式错开
+_STRIDE = 0x9E3779B97F4B
+_MODE_OFFSETS = {'basic': 0, 'advanced': 0x5DEECE66D}
+
+
+def _relation_types():
+    """关系类型 -> 设置位，按表中出现的顺序。"""
+    types = collections.OrderedDict()
+    for records in GAN_RECORDS + ZHI_RECORDS:
+        for record in records:
+            types.setdefault(record[1], record[0])
+    for pattern in TRIPLE_PATTERNS:
+        for mask in sorted(pattern.results):
+            types.setdefault(pattern.results[mask][0], pattern.bit)
+    return types
+
+
+TYPE_BITS = _relation_types()
+TYPES = tuple(TYPE_BITS)
+
+# 抽命盘的条件：difficulty 为 DIFFICULTIES 之一，must_include 为类型元组，
+# relationships、points 为 (最小, 最大) 闭区间，None 表示不限
+Query = collections.namedtuple('Query', 'difficulty must_include relationships points')
+
+
+def corpus_seed(mode, index):
+    return (index * _STRIDE + _MODE_OFFSETS[mode]) & ((1 << SEED_BITS) - 1)
+
+
+def _checksum():
+    crc = 0
+    for name in SOURCES:
+        with open(os.path.join(_HERE, name), 'rb') as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+def _corpus(mode, size):
+    """逐盘生成，返回按类型分列的 (个数, 分数) 两个数组，第 t 列为 [t*size, (t+1)*size)。"""
+    column = {name: seq for seq, name in enumerate(TYPES)}
+    counts, points = array('B', bytes(len(TYPES) * size)), array('H', bytes(2 * len(TYPES) * size))
+    for index in range(size):
+        chart = generate_random_bazi(MODES[mode], seed=corpus_seed(mode, index))
+        for rel in detect_all_relationships(chart, {}):
+            cell = column[rel['type']] * size + index
+            counts[cell] += 1
+            points[cell] += rel['points']
+    return counts, points
+
+
+def build(path=SNAPSHOT_PATH, size=CORPUS_SIZE):
+    """重新生成 difficulty.snap；返回生成的命盘数。"""
+    modes = {mode: _corpus(mode, size) for mode in MODES}
+    data = {mode: (counts.tobytes(), points.tobytes()) for mode, (counts, points) in modes.items()}
+    with open(path, 'wb') as f:
+        f.write(zlib.compress(marshal.dumps((_VERSION, _checksum(), size, TYPES, data)), 9))
+    return size * len(MODES)
+
+
+def _load(path=SNAPSHOT_PATH):
+    try:
+        with open(path, 'rb') as f:
+            version, checksum, size, types, data = marshal.loads(zlib.decompress(f.read()))
+        if (version, checksum, types) != (_VERSION, _checksum(), TYPES):
+            return None
+    except (OSError, EOFError, ValueError, TypeError, zlib.error):
+        return None
+    modes = {}
+    for mode, raw in data.items():
+        counts, points = array('B'), array('H')
+        counts.frombytes(raw[0])
+        points.frombytes(raw[1])
+        if sys.byteorder != 'little':
+            points.byteswap()
+        modes[mode] = counts, points
+    return DifficultyIndex(size, modes)
+
+
+def _range(value, name):
+    if value is None:
+        return None
+    if (not isinstance(value, (list, tuple)) or len(value) != 2
+            or any(item is not None and (not isinstance(item, int) or isinstance(item, bool)) for item in value)):
+        raise ValueError('{} must be [min, max] (integers or null).'.format(name))
+    return tuple(value)
+
+
+def parse_query(params):
+    """new_game 请求里的抽盘条件；都没给时返回 None，取值不对抛 ValueError。"""
+    difficulty = params.get('difficulty')
+    must_include = params.get('must_include')
+    if difficulty is None and not must_include and params.get('relationships') is None \
+            and params.get('points') is None:
+        return None
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError('difficulty must be one of {}.'.format(', '.join(DIFFICULTIES)))
+    must_include = must_include or []
+    if isinstance(must_include, str) or not isinstance(must_include, list):
+        raise ValueError('must_include must be a list of relationship types.')
+    unknown = [name for name in must_include if name not in TYPE_BITS]
+    if unknown:
+        raise ValueError('Unknown relationship types: {}. Known: {}.'.format(', '.join(map(str, unknown)),
+                                                                            ', '.join(TYPES)))
+    return Query(difficulty, tuple(sorted(set(must_include), key=TYPES.index)),
+                 _range(params.get('relationships'), 'relationships'), _range(params.get('points'), 'points'))
+
+
+class DifficultyIndex:
+    """一批命盘的各类关系个数和分数，按条件分桶抽取。"""
+
+    def __init__(self, size, modes):
+        self.size = size
+        self.modes = modes              # mode -> (个数数组, 分数数组)，按类型分列
+        self._totals = {}               # (mode, mask) -> (关系数列表, 总分列表, 每盘难度档)
+        self._buckets = {}              # (mode, mask, query) -> 命盘编号元组
+
+    def _column(self, values, seq):
+        return values[seq * self.size:(seq + 1) * self.size]
+
+    def totals(self, mode, mask):
+        """每盘在该设置下的关系数和总分，以及每盘的难度档（DIFFICULTIES 的序号，没有关系为 -1）。"""
+        key = (mode, mask)
+        if key not in self._totals:
+            counts, points = self.modes[mode]
+            enabled = [seq for seq, name in enumerate(TYPES) if TYPE_BITS[name] & mask]
+            if enabled:
+                relationships = list(map(sum, zip(*[self._column(counts, seq) for seq in enabled])))
+                scores = list(map(sum, zip(*[self._column(points, seq) for seq in enabled])))
+            else:
+                relationships, scores = [0] * self.size, [0] * self.size
+            self._totals[key] = relationships, scores, _tiers(relationships)
+        return self._totals[key]
+
+    def levels(self, advanced_mode, settings):
+        """{难度: (最少, 最多关系数)}；相邻两档可能在边界上有同样的关系数。"""
+        mode = 'advanced' if advanced_mode else 'basic'
+        relationships, _, tiers = self.totals(mode, settings_mask(settings) & DETECTED_BITS)
+        levels = {}
+        for level, name in enumerate(DIFFICULTIES):
+            counts = [count for count, tier in zip(relationships, tiers) if tier == level]
+            levels[name] = (min(counts), max(counts)) if counts else (1, 0)
+        return levels
+
+    def bucket(self, advanced_mode, settings, query):
+        """符合条件的命盘编号；must_include 的类型未在设置中启用时抛 ValueError。"""
+        mode = 'advanced' if advanced_mode else 'basic'
+        mask = settings_mask(settings) & DETECTED_BITS
+        disabled = [name for name in query.must_include if not TYPE_BITS[name] & mask]
+        if disabled:
+            raise ValueError('Relationship types not enabled in settings: {}.'.format(', '.join(disabled)))
+        key = (mode, mask, query)
+        if key not in self._buckets:
+            relationships, scores, tiers = self.totals(mode, mask)
+            level = DIFFICULTIES.index(query.difficulty) if query.difficulty else None
+            ranges = []
+            if query.relationships:
+                ranges.append((relationships,) + query.relationships)
+            if query.points:
+                ranges.append((scores,) + query.points)
+            required = [self._column(self.modes[mode][0], TYPES.index(name)) for name in query.must_include]
+            if len(self._buckets) >= _MAX_BUCKETS:
+                self._buckets.clear()
+            self._buckets[key] = tuple(
+                index for index in range(self.size)
+                if (level is None or tiers[index] == level)
+                and all((first is None or values[index] >= first) and (last is None or values[index] <= last)
+                       for values, first, last in ranges)
+                and all(column[index] for column in required))
+        return self._buckets[key]
+
+    def draw(self, advanced_mode, settings, query, rng=random):
+        """均匀抽一个符合条件的命盘种子；没有时抛 LookupError。"""
+        bucket = self.bucket(advanced_mode, settings, query)
+        if not bucket:
+            raise LookupError('No chart matches the requested difficulty.')
+        return corpus_seed('advanced' if advanced_mode else 'basic', bucket[rng.randrange(len(bucket))])
+
+
+def _tiers(relationships):
+    # 按排名而不是按关系数的值切分：分位点落在同一个值上时，按值切会有一档为空
+    ranked = sorted((index for index, count in enumerate(relationships) if count), key=relationships.__getitem__)
+    tiers = [-1] * len(relationships)
+    for rank, index in enumerate(ranked):
+        tiers[index] = rank * len(DIFFICULTIES) // len(ranked)
+    return tiers
+
+
+_index = None
+
+
+def get_index():
+    """默认索引，第一次用到时读入（快照过期则现算小语料）。"""
+    global _index
+    if _index is None:
+        _index = _load()
+        if _index is None:
+            _index = DifficultyIndex(FALLBACK_SIZE, {mode: _corpus(mode, FALLBACK_SIZE) for mode in MODES})
+    return _index
+
+
+def draw_game(advanced_mode, settings, query, rng=random):
+    """按条件抽一局：(chart, all_relationships)。"""
+    return generate_game(advanced_mode, settings, get_index().draw(advanced_mode, settings, query, rng))
+
+
+if __name__ == '__main__':
+    print("{} charts indexed, written to {}".format(build(), SNAPSHOT_PATH))
+    sys.exit(0)
@@ -0,0 +1,382 @@
+# netlify/functions/game_sessions.py
+# -*- coding: utf-8 -*-
+"""
+Game sessions, so check_relationship only needs a token and positions.
+
+new_game and check_relationship are deployed as separate functions and
+share no memory, so the token describes the game itself:
+
+    <seed>.<advanced 0/1>.<settings mask>.<nonce>.<signature>
+
+check_relationship regenerates the chart from the seed and detects its
+relationships through the detect_relationships cache. The client sends
+the positions it has found so far, and they are replayed into the found
+set:
+
+    {'session': token, 'positions': [...], 'found_positions': [[...], ...]}
+
+The signature is an HMAC keyed by BAZI_SESSION_SECRET or, when that is
+not set, by session.key, a random key the build command writes for each
+deploy (python game_sessions.py). Tokens signed by another deployment
+are rejected. A deployed function with neither refuses to sign anything;
+a local server falls back to a random key per process. A token only names a chart the client
+could request by seed anyway. The nonce keeps two games of the same seed
+(a shared link, the daily puzzle) apart in the store.
+
+The rebuilt game is cached in a store under its token, so later clicks on
+a warm instance skip the rebuild. Two stores are available:
+
+- MemoryStore: a bounded LRU with TTL eviction. This is the default.
+- SQLiteStore: a local SQLite file, used when BAZI_SESSION_DB names a path.
+  It survives restarts and is shared between worker processes.
+
+A chart without a seed gets a random token that only the store knows.
+When check_request cannot resolve a token, it answers 410 with
+'expired', and the frontend resends the full game state instead.
+"""
+import base64
+import collections
+import contextlib
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+
+from relation_index import FoundSet, RelationshipIndex, check_selection
+
+MAX_SESSIONS = 1000
+SESSION_TTL = 2 * 3600      # seconds since last use
+SECRET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'session.key')
+_secret = None
+
+
+class SessionExpired(KeyError):
+    """The token is unknown, expired or was evicted."""
+
+
+class GameSession:
+    """One game: chart, indexed relationships and the relationships found so far."""
+
+    def __init__(self, chart, all_relationships, found_relationships=()):
+        self.chart = chart
+        self.all_relationships = all_relationships
+        self.found_relationships = list(found_relationships)
+        self.index = RelationshipIndex(all_relationships)
+        self.found = FoundSet(self.found_relationships)
+
+    def check(self, positions):
+        """Same response body as relation_index.check_selection; a match is recorded as found."""
+        result = check_selection(self.chart, positions, self.all_relationships, self.found, self.index)
+        if result['found']:
+            self.found_relationships.append(result['relationship'])
+            self.found.add(result['relationship'])
+        return result
+
+    def replay(self, found_positions):
+        """Record selections the client has already found, in order; returns True if any was new."""
+        changed = False
+        for positions in found_positions or ():
+            if isinstance(positions, list) and 2 <= len(positions) <= 3 \
+                    and tuple(sorted(positions)) not in self.found.positions:
+                changed = self.check(positions)['found'] or changed
+        return changed
+
+    def to_json(self):
+        return json.dumps({'chart': self.chart, 'all_relationships': self.all_relationships,
+                           'found_relationships': self.found_relationships}, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        return cls(data['chart'], data['all_relationships'], data['found_relationships'])
+
+
+class TokenLocks:
+    """One lock per token being checked, dropped when its last holder releases it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}        # token -> [lock, holders]
+
+    def __len__(self):
+        return len(self._locks)
+
+    @contextlib.contextmanager
+    def hold(self, token):
+        with self._lock:
+            entry = self._locks.setdefault(token, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[token]
+
+
+class MemoryStore:
+    """In-process sessions, least recently used first out, expired after ttl seconds idle."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL, clock=time.monotonic):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        self._sessions = collections.OrderedDict()    # token -> (last used, GameSession)
+        self._lock = threading.Lock()
+        self.token_locks = TokenLocks()     # held by check_session for one token
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _expire(self, now):
+        while self._sessions:
+            token, (used, _) = next(iter(self._sessions.items()))
+            if now - used < self.ttl:
+                break
+            del self._sessions[token]
+
+    def put(self, token, session):
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            self._sessions[token] = (now, session)
+            self._sessions.move_to_end(token)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get(self, token):
+        with self._lock:
+            now = self.clock()
+            self._expire(now)
+            if token not in self._sessions:
+                raise SessionExpired(token)
+            session = self._sessions[token][1]
+            self._sessions[token] = (now, session)
+            self._sessions.move_to_end(token)
+            return session
+
+    def save(self, token, session):
+        """Sessions are kept by reference; nothing to write back."""
+
+
+class SQLiteStore:
+    """Sessions as JSON rows in a local SQLite file."""
+
+    def __init__(self, path, max_sessions=MAX_SESSIONS, ttl=SESSION_TTL, clock=time.time):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.clock = clock
+        import sqlite3      # 只在用到时导入，减少冷启动时间
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.token_locks = TokenLocks()     # held by check_session for one token
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS sessions "
+                               "(token TEXT PRIMARY KEY, used REAL NOT NULL, data TEXT NOT NULL)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_used ON sessions (used)")
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def put(self, token, session):
+        with self._lock, self._conn:
+            now = self.clock()
+            self._conn.execute("DELETE FROM sessions WHERE used <= ?", (now - self.ttl,))
+            self._conn.execute("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", (token, now, session.to_json()))
+            self._conn.execute("DELETE FROM sessions WHERE token IN (SELECT token FROM sessions "
+                               "ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_sessions,))
+
+    def get(self, token):
+        with self._lock, self._conn:
+            now = self.clock()
+            row = self._conn.execute("SELECT data FROM sessions WHERE token = ? AND used > ?",
+                                     (token, now - self.ttl)).fetchone()
+            if row is None:
+                raise SessionExpired(token)
+            self._conn.execute("UPDATE sessions SET used = ? WHERE token = ?", (now, token))
+        return GameSession.from_json(row[0])
+
+    def save(self, token, session):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE sessions SET used = ?, data = ? WHERE token = ?",
+                               (self.clock(), session.to_json(), token))
+
+    def close(self):
+        self._conn.close()
+
+
+_store = None
+
+
+def get_store():
+    """Default store: SQLite if BAZI_SESSION_DB is set, memory otherwise. Created on first use."""
+    global _store
+    if _store is None:
+        path = os.environ.get('BAZI_SESSION_DB')
+        _store = SQLiteStore(path) if path else MemoryStore()
+    return _store
+
+
+def _get_secret():
+    """HMAC key: BAZI_SESSION_SECRET, else session.key; read on first use."""
+    global _secret
+    if _secret is None:
+        secret = os.environ.get('BAZI_SESSION_SECRET', '').encode('utf-8')
+        if not secret:
+            try:
+                with open(SECRET_PATH, 'rb') as f:
+                    secret = f.read().strip()
+            except OSError:
+                pass
+        if not secret:
+            if os.environ.get('AWS_LAMBDA_FUNCTION_NAME'):
+                raise RuntimeError('BAZI_SESSION_SECRET is not set and {} is missing; '
+                                   'run python game_sessions.py in the build.'.format(SECRET_PATH))
+            import secrets
+            secret = secrets.token_bytes(32)
+        _secret = secret
+    return _secret
+
+
+def _signature(payload):
+    digest = hmac.new(_get_secret(), payload.encode('ascii'), hashlib.sha256).digest()[:12]
+    return base64.urlsafe_b64encode(digest).decode('ascii')
+
+
+def game_token(seed, advanced_mode, mask, nonce=None):
+    """Signed token naming a game by its seed, mode and settings mask."""
+    if nonce is None:
+        import secrets
+        nonce = secrets.token_urlsafe(6)
+    payload = '{}.{}.{}.{}'.format(seed, int(bool(advanced_mode)), mask, nonce)
+    return payload + '.' + _signature(payload)
+
+
+def parse_token(token):
+    """(seed, advanced_mode, mask) of a game token; raises SessionExpired if it is not one."""
+    from relation_bits import ALL_BITS
+    parts = token.split('.') if isinstance(token, str) else []
+    if len(parts) != 5 or not all(part.isdigit() for part in parts[:3]):
+        raise SessionExpired(token)
+    if not hmac.compare_digest(parts[4], _signature('.'.join(parts[:4]))):
+        raise SessionExpired(token)
+    seed, advanced, mask = map(int, parts[:3])
+    if advanced > 1 or mask & ~ALL_BITS:
+        raise SessionExpired(token)
+    return seed, advanced == 1, mask
+
+
+def session_from_token(token):
+    """Rebuild a game from its token: same chart and relationships as new_game returned."""
+    seed, advanced_mode, mask = parse_token(token)
+    # 只在用到时导入，减少冷启动时间
+    from bazi_utils import detect_relationships, generate_random_bazi
+    chart = generate_random_bazi(advanced_mode, seed=seed)
+    num_pillars = 6 if advanced_mode else 4
+    return GameSession(chart, detect_relationships(tuple(chart['gans'][:num_pillars]),
+                                                   tuple(chart['zhis'][:num_pillars]), mask))
+
+
+def create_session(chart, all_relationships, store=None, settings=None):
+    """Return the token of a new game.
+
+    A seeded chart with its settings gets a game token (see game_token),
+    which any instance can resolve. Otherwise the game is stored under a
+    random token known only to this store.
+    """
+    if settings is not None and chart.get('seed') is not None:
+        from relation_bits import DETECTED_BITS, settings_mask
+        return game_token(chart['seed'], chart.get('advanced_mode', False), settings_mask(settings) & DETECTED_BITS)
+    if store is None:
+        store = get_store()
+    import secrets
+    token = secrets.token_urlsafe(16)
+    store.put(token, GameSession(chart, all_relationships))
+    return token
+
+
+def check_session(token, positions, store=None, found_positions=()):
+    """check_selection for a game token; raises SessionExpired if the token can't be resolved.
+
+    found_positions (the client's found selections) are replayed first, so a
+    game rebuilt from its token, or cached by an instance that missed some
+    clicks, catches up. Check and record run under a lock for this token,
+    so two quick clicks cannot both score the same relationship; other
+    games are checked in parallel.
+    """
+    if store is None:
+        store = get_store()
+    with store.token_locks.hold(token):
+        try:
+            session = store.get(token)
+            changed = False
+        except SessionExpired:
+            session = session_from_token(token)
+            store.put(token, session)
+            changed = True
+        changed = session.replay(found_positions) or changed
+        result = session.check(positions)
+        if result['found'] or changed:
+            store.save(token, session)
+    return result
+
+
+def check_request(data, store=None):
+    """Handle a check_relationship request body; returns (status code, response body).
+
+    With a session token only positions (and found_positions) are needed;
+    see check_session. Without one the body must
+    carry chart, all_relationships and found_relationships as before.
+    With 'compact' set, the matched relationship comes back in catalog form,
+    and the game state can be sent the same way: 'relationships' and
+    'found' as compact lists, plus the 'catalog' version.
+    """
+    if data.get('compact'):
+        from relation_catalog import CatalogMismatch, VERSION, compact_result, expand
+        try:
+            data = _expand_request(data, expand)
+        except CatalogMismatch as e:
+            return 409, {'error': str(e), 'catalog': VERSION}
+        status, body = check_request(dict(data, compact=False), store)
+        return status, compact_result(body) if status == 200 else body
+
+    positions = data.get('positions', [])
+    token = data.get('session')
+    chart = data.get('chart')
+
+    # Basic validation
+    if not (positions and (token or chart)):
+        return 400, {'error': 'Missing required data: session or chart, and positions.'}
+    if len(positions) < 2 or len(positions) > 3:
+        return 400, {'error': 'Invalid number of positions selected'}
+
+    if token:
+        try:
+            return 200, check_session(token, positions, store, data.get('found_positions'))
+        except SessionExpired:
+            if not chart:
+                return 410, {'error': 'Game session expired.', 'expired': True}
+    return 200, check_selection(chart, positions, data.get('all_relationships', []),
+                                data.get('found_relationships', []))
+
+
+def _expand_request(data, expand):
+    if not (data.get('chart') and 'relationships' in data):
+        return data
+    version = data.get('catalog')
+    return dict(data, all_relationships=expand(data['chart'], data['relationships'], version),
+                found_relationships=expand(data['chart'], data.get('found', []), version))
+
+
+if __name__ == '__main__':
+    # 构建时为每次部署生成新密钥；旧部署的令牌随之失效，前端会改发完整状态
+    import secrets
+    with open(SECRET_PATH, 'w') as f:
+        f.write(secrets.token_hex(32) + '\n')
+    print("session key written to {}".format(SECRET_PATH))
+    sys.exit(0)
@@ -79,6 +79,21 @@ rmc = ["初一", "初二", "初三", "初四", "初五", "初六", "初七", "
 
 # 简化了大量数据，保留核心功能所需的部分
 
+zhi_atts = {
+    "子":{"冲":"午", "刑":"卯", "被刑":"卯", "合":("申","辰"), "会":("亥","丑"), '害':'未', '破':'酉', "六":"丑","暗":"",},
+    "丑":{"冲":"未", "刑":"戌", "被刑":"未", "合":("巳","酉"), "会":("子","亥"), '害':'午', '破':'辰', "六":"子","暗":"寅",},
+    "寅":{"冲":"申", "刑":"巳", "被刑":"申", "合":("午","戌"), "会":("卯","辰"), '害':'巳', '破':'亥', "六":"亥","暗":"丑",},
+    "卯":{"冲":"酉", "刑":"子", "被刑":"子", "合":("未","亥"), "会":("寅","辰"), '害':'辰', '破':'午', "六":"戌","暗":"申",},
+    "辰":{"冲":"戌", "刑":"辰", "被刑":"辰", "合":("子","申"), "会":("寅","卯"), '害':'卯', '破':'丑', "六":"酉","暗":"",},
+    "巳":{"冲":"亥", "刑":"申", "被刑":"寅", "合":("酉","丑"), "会":("午","未"), '害':'寅', '破':'申', "六":"申","暗":"",},
+    "午":{"冲":"子", "刑":"午", "被刑":"午", "合":("寅","戌"), "会":("巳","未"), '害':'丑', '破':'卯', "六":"未","暗":"亥",},
+    "未":{"冲":"丑", "刑":"丑", "被刑":"戌", "合":("卯","亥"), "会":("巳","午"), '害':'子', '破':'戌', "六":"午","暗":"",},
+    "申":{"冲":"寅", "刑":"寅", "被刑":"巳", "合":("子","辰"), "会":("酉","戌"), '害':'亥', '破':'巳', "六":"巳","暗":"卯",},
+    "酉":{"冲":"卯", "刑":"酉", "被刑":"酉", "合":("巳","丑"), "会":("申","戌"), '害':'戌', '破':'子', "六":"辰","暗":"",},
+    "戌":{"冲":"辰", "刑":"未", "被刑":"丑", "合":("午","寅"), "会":("申","酉"), '害':'酉', '破':'未', "六":"卯","暗":"",},
+    "亥":{"冲":"巳", "刑":"亥", "被刑":"亥", "合":("卯","未"), "会":("子","丑"), '害':'申', '破':'寅', "六":"寅","暗":"午",},
+}
+
 gan_hes = {
     ("甲", "己"): "中正之合 化土",
     ("乙", "庚"): "仁义之合　化金",
@@ -108,6 +123,22 @@ zhi_6hes = {
 
 zhi_3hes = {"申子辰": "水", "巳酉丑": "金",  "寅午戌": "火", "亥卯未": "木"}
 
+zhi_half_3hes = {
+    ("申", "子"): "化水  马在寅",
+    ("子", "辰"): "化水  马在寅",
+    ("申", "辰"): "化水  马在寅",    
+    ("巳", "酉"): "化金 马在亥",  
+    ("酉", "丑"): "化金 马在亥",  
+    ("巳", "丑"): "化金 马在亥",      
+    ("寅", "午"): "化火 马在申",    
+    ("午", "戌"): "化火 马在申",   
+    ("寅", "戌"): "化火 马在申",   
+    ("亥", "卯"): "化木 马在巳",
+    ("亥","未"): "化木 马在巳",
+    ( "卯", "未"): "化木 马在巳",
+}
+
+
 zhi_huis = {
     "亥子丑": "水",
     "寅卯辰": "木",  
@@ -150,6 +181,8 @@ zhi_xings = {
     ("子", "卯"): "子刑卯　卯刑子 无礼之刑",       
 }
 
+zhi_zixings = ['辰', '午', '酉', '亥']
+
 gan5 = {"甲":"木", "乙":"木", "丙":"火", "丁":"火", "戊":"土", "己":"土", 
         "庚":"金", "辛":"金", "壬":"水", "癸":"水"}
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+整数编码的干支核心，顶层 gzcore.py 的精简版。
+
+天干编码 0-9（甲=0），地支编码 0-11（子=0），六十甲子编码 0-59（甲子=0），
+干支编码满足 pillar % 10 == 天干, pillar % 12 == 地支。
+"""
+
+from ganzhi import Gan, Zhi, zhi_atts, gan_hes, gan_chongs
+from datas import nayins
+
+# 简化版本，十神、长生、藏干表未带入，游戏只用到干支关系
+GAN_INDEX = {item: seq for seq, item in enumerate(Gan)}
+ZHI_INDEX = {item: seq for seq, item in enumerate(Zhi)}
+
+# 六十甲子
+PILLARS = tuple(Gan[seq % 10] + Zhi[seq % 12] for seq in range(60))
+PILLAR_INDEX = {item: seq for seq, item in enumerate(PILLARS)}
+
+
+def pillar_code(gan, zhi):
+    """天干、地支编码合成干支编码，二者阴阳必须相同。"""
+    return (6 * gan - 5 * zhi) % 60
+
+
+def encode(gans, zhis):
+    """汉字天干、地支序列转为编码列表。"""
+    return [GAN_INDEX[item] for item in gans], [ZHI_INDEX[item] for item in zhis]
+
+
+def decode(gans, zhis):
+    """编码列表转回汉字列表。"""
+    return [Gan[item] for item in gans], [Zhi[item] for item in zhis]
+
+
+# 纳音：NAYIN[pillar]
+NAYIN = tuple(nayins[(item[0], item[1])] for item in PILLARS)
+
+# 空亡：每旬（十个干支）空出旬首地支之前的两个地支
+KONGWANG = tuple(((seq - seq % 10 + 10) % 12, (seq - seq % 10 + 11) % 12) for seq in range(60))
+
+
+def _zhi_table(key):
+    return tuple(ZHI_INDEX[zhi_atts[item][key]] if zhi_atts[item][key] else -1 for item in Zhi)
+
+
+def _gan_table(pairs):
+    table = [-1] * 10
+    for first, second in pairs:
+        table[GAN_INDEX[first]] = GAN_INDEX[second]
+        table[GAN_INDEX[second]] = GAN_INDEX[first]
+    return tuple(table)
+
+
+# 两两关系，值为对方编码，-1 表示没有
+GAN_HE = _gan_table(gan_hes)
+GAN_CHONG = _gan_table(gan_chongs)
+ZHI_LIUHE = _zhi_table('六')
+ZHI_CHONG = _zhi_table('冲')
+ZHI_XING = _zhi_table('刑')
+ZHI_HAI = _zhi_table('害')
+ZHI_PO = _zhi_table('破')
+ZHI_AN = _zhi_table('暗')
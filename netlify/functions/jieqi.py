@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+节气表与四柱的算术计算，顶层 jieqi.py 的精简版。
+
+jieqi.bin 由顶层的 python jieqi.py build 生成后复制到这里，这里只读表、
+不依赖 lunar_python。四柱与 lunar_python 八字（EightChar）一致：年柱以
+立春交接时刻换年，月柱以节的交接时刻换月，日柱不因晚子时换日，时干
+23 点起用次日日干。
+"""
+
+import bisect
+import datetime
+import itertools
+import os
+import struct
+import sys
+from array import array
+
+from tables import pillar_code
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jieqi.bin')
+
+# 节气表中的顺序，从冬至开始，奇数位为节
+NAMES = ('冬至', '小寒', '大寒', '立春', '雨水', '惊蛰', '春分', '清明', '谷雨', '立夏', '小满', '芒种',
+         '夏至', '小暑', '大暑', '立秋', '处暑', '白露', '秋分', '寒露', '霜降', '立冬', '小雪', '大雪')
+
+# 文件头：标识、起止年份、第一个节气的时刻；之后是相邻节气的秒数差，均为小端
+_HEADER = struct.Struct('<4sHHq')
+_MAGIC = b'JQ24'
+_DAY_SECONDS = 86400
+# date.toordinal() 与儒略日数之差
+_JDN_OFFSET = 1721425
+
+_table = None
+
+
+class JieqiTable:
+    """二十四节气时刻表，从 start_year 前一年的冬至起，时刻为公历 0001-01-01 起的秒数。"""
+
+    def __init__(self, start_year, end_year, instants):
+        self.start_year = start_year
+        self.end_year = end_year
+        self.instants = instants
+        self.lower = _seconds(start_year, 1, 1)
+        self.upper = _seconds(end_year + 1, 1, 1)
+
+    def month_year_codes(self, seconds):
+        """某时刻的年柱、月柱编码。"""
+        if not self.lower <= seconds < self.upper:
+            raise ValueError("only {}-{} is covered by the jieqi table".format(self.start_year, self.end_year))
+        term = bisect.bisect_right(self.instants, seconds) - 1
+        # 第 term 个节气起算；中气并入前一个节
+        jie = term if term % 2 else term - 1
+        year = self.start_year + (term - 3) // 24
+        # 表中第一个节是 start_year 的小寒，即上一年的丑月
+        month = (self.start_year - 1 - 4) % 10 % 5 * 12 + 2 + 11 + (jie - 1) // 2
+        return (year - 4) % 60, month % 60
+
+    def term(self, index):
+        """第 index 个节气的名称和时刻（datetime）。"""
+        return NAMES[index % 24], _from_seconds(self.instants[index])
+
+    def around(self, seconds):
+        """某时刻之前（含）和之后最近的节气，(名称, datetime) 各一个。"""
+        term = bisect.bisect_right(self.instants, seconds) - 1
+        return self.term(term), self.term(term + 1)
+
+
+def _seconds(year, month, day, hour=0, minute=0, second=0):
+    days = datetime.date(year, month, 1).toordinal() + day - 1
+    return days * _DAY_SECONDS + hour * 3600 + minute * 60 + second
+
+
+def _from_seconds(seconds):
+    days, rest = divmod(seconds, _DAY_SECONDS)
+    return datetime.datetime.fromordinal(days) + datetime.timedelta(seconds=rest)
+
+
+def load_table(path=TABLE_PATH):
+    """读入 build_table 写的节气表。"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, start_year, end_year, first = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("not a jieqi table: {}".format(path))
+    deltas = array('I')
+    deltas.frombytes(data[_HEADER.size:])
+    if sys.byteorder != 'little':
+        deltas.byteswap()
+    instants = array('q', itertools.accumulate(deltas, initial=first))
+    return JieqiTable(start_year, end_year, instants)
+
+
+def get_table():
+    """默认节气表，第一次用到时读入。"""
+    global _table
+    if _table is None:
+        _table = load_table()
+    return _table
+
+
+def four_pillars(year, month, day, hour, minute=0, second=0, table=None):
+    """公历时刻的四柱，返回年、月、日、时柱的干支编码（见 gzcore.PILLARS）。"""
+    table = table or get_table()
+    seconds = _seconds(year, month, day, hour, minute, second)
+    year_code, month_code = table.month_year_codes(seconds)
+
+    day_code = (datetime.date(year, month, day).toordinal() + _JDN_OFFSET - 11) % 60
+    time_zhi = (hour + 1) // 2 % 12
+    # 晚子时：时干按次日日干起
+    day_gan = (day_code + (1 if hour == 23 else 0)) % 10
+    time_code = pillar_code((day_gan % 5 * 2 + time_zhi) % 10, time_zhi)
+    return year_code, month_code, day_code, time_code
@@ -7,7 +7,10 @@ import os
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(__file__))
 
-from bazi_utils import generate_random_bazi, detect_all_relationships
+from bazi_utils import parse_seed
+from chart_pool import generate_game, get_pool
+from difficulty_index import draw_game, parse_query
+from game_sessions import create_session
 
 # Default relationship settings
 DEFAULT_SETTINGS = {
@@ -44,17 +47,53 @@ def handler(event, context):
         settings = DEFAULT_SETTINGS.copy()
         settings.update(custom_settings)
         
-        # Generate a new Bazi chart
-        chart = generate_random_bazi(advanced_mode)
+        try:
+            seed = parse_seed(params['seed']) if params.get('seed') is not None else None
+            query = parse_query(params)
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': {
+                    'Content-Type': 'application/json',
+                    'Access-Control-Allow-Origin': '*',
+                    'Access-Control-Allow-Headers': 'Content-Type',
+                },
+                'body': json.dumps({'error': str(e)})
+            }
         
-        # Detect all possible relationships in the new chart with merged settings
-        all_relationships = detect_all_relationships(chart, settings)
+        if seed is not None:
+            # Replay a chart from its seed instead of taking a random one
+            chart, all_relationships = generate_game(advanced_mode, settings, seed)
+        elif query:
+            # Difficulty / relationship type conditions: a random chart from the matching bucket
+            try:
+                chart, all_relationships = draw_game(advanced_mode, settings, query)
+            except (ValueError, LookupError) as e:
+                return {
+                    'statusCode': 400 if isinstance(e, ValueError) else 404,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*',
+                        'Access-Control-Allow-Headers': 'Content-Type',
+                    },
+                    'body': json.dumps({'error': str(e)}, ensure_ascii=False)
+                }
+        else:
+            # Take a ready chart with its relationships from the pool (generated inline if empty)
+            chart, all_relationships = get_pool().get(advanced_mode, settings)
         
         # Prepare the response payload
-        payload = {
-            'chart': chart,
-            'all_relationships': all_relationships
-        }
+        session = create_session(chart, all_relationships, settings=settings)
+        if params.get('compact'):
+            # Descriptions are referenced by id; see the catalog function
+            from relation_catalog import compact_game
+            payload = compact_game(chart, all_relationships, session)
+        else:
+            payload = {
+                'chart': chart,
+                'all_relationships': all_relationships,
+                'session': session
+            }
         
         return {
             'statusCode': 200,
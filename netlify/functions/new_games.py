@@ -0,0 +1,90 @@
+# netlify/functions/new_games.py
+# -*- coding: utf-8 -*-
+import json
+import sys
+import os
+
+# Add current directory to path for imports
+sys.path.append(os.path.dirname(__file__))
+
+from chart_pool import get_pool
+from difficulty_index import draw_game, parse_query
+from game_sessions import create_session
+from new_game import DEFAULT_SETTINGS
+
+DEFAULT_COUNT = 3
+MAX_COUNT = 10
+
+HEADERS = {
+    'Content-Type': 'application/json',
+    'Access-Control-Allow-Origin': '*', # CORS header for development
+    'Access-Control-Allow-Headers': 'Content-Type',
+}
+
+
+def new_games(params):
+    """
+    Several games in one response, so the client can prefetch the next rounds.
+
+    params is the new_game request body plus 'count' (1..MAX_COUNT). Returns
+    (status code, body); the body is {'games': [...]}, each game shaped like
+    a new_game response (compact if params['compact']) with its own session.
+    Difficulty conditions (see difficulty_index.parse_query) apply to every game.
+    """
+    count = params.get('count', DEFAULT_COUNT)
+    if not isinstance(count, int) or isinstance(count, bool) or not 1 <= count <= MAX_COUNT:
+        return 400, {'error': 'count must be an integer from 1 to {}.'.format(MAX_COUNT)}
+
+    # Merge custom settings with defaults
+    settings = DEFAULT_SETTINGS.copy()
+    settings.update(params.get('settings', {}))
+
+    advanced_mode = params.get('advanced_mode', False)
+    try:
+        query = parse_query(params)
+        if query:
+            batch = [draw_game(advanced_mode, settings, query) for _ in range(count)]
+        else:
+            batch = get_pool().take(advanced_mode, settings, count)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except LookupError as e:
+        return 404, {'error': str(e)}
+
+    games = []
+    for chart, all_relationships in batch:
+        session = create_session(chart, all_relationships, settings=settings)
+        if params.get('compact'):
+            from relation_catalog import compact_game
+            games.append(compact_game(chart, all_relationships, session))
+        else:
+            games.append({
+                'chart': chart,
+                'all_relationships': all_relationships,
+                'session': session
+            })
+    return 200, {'games': games}
+
+
+def handler(event, context):
+    """
+    Netlify Function handler for fetching a batch of new games.
+    """
+    # Handle CORS preflight requests
+    if event.get('httpMethod') == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Headers': 'Content-Type',
+                'Access-Control-Allow-Methods': 'POST, OPTIONS'
+            },
+            'body': ''
+        }
+
+    try:
+        status, body = new_games(json.loads(event.get('body') or '{}'))
+        return {'statusCode': status, 'headers': HEADERS, 'body': json.dumps(body, ensure_ascii=False)}
+
+    except Exception as e:
+        return {'statusCode': 500, 'headers': HEADERS, 'body': json.dumps({'error': str(e)})}
@@ -0,0 +1,48 @@
+# netlify/functions/relation_bits.py
+# -*- coding: utf-8 -*-
+"""
+Relation bits and the settings mask, without the tables.
+
+Split out of relation_masks.py so that code which only needs the mask
+does not import ganzhi/datas at startup. relation_masks re-exports
+everything here.
+"""
+import collections
+
+GAN_WUHE = 1 << 0
+GAN_XIANGCHONG = 1 << 1
+ZHI_LIUHE_BIT = 1 << 2
+ZHI_XIANGCHONG = 1 << 3
+ZHI_XIANGXING = 1 << 4
+ZHI_XIANGHAI = 1 << 5
+ZHI_XIANGPO = 1 << 6
+ZHI_ANHE = 1 << 7
+ZHI_SANHE = 1 << 8      # 三合及半合
+ZHI_SANHUI = 1 << 9     # 三会及半会
+
+# 设置项名称 -> 关系位
+SETTING_BITS = {
+    '天干五合': GAN_WUHE, '天干相冲': GAN_XIANGCHONG,
+    '地支六合': ZHI_LIUHE_BIT, '地支相冲': ZHI_XIANGCHONG,
+    '地支相刑': ZHI_XIANGXING, '地支相害': ZHI_XIANGHAI,
+    '地支相破': ZHI_XIANGPO, '地支暗合': ZHI_ANHE,
+    '地支三合局': ZHI_SANHE, '地支三会方': ZHI_SANHUI,
+}
+ALL_BITS = sum(SETTING_BITS.values())
+
+# detect_all_relationships 产出的关系：每个设置项都已由表驱动
+DETECTED_BITS = ALL_BITS
+
+
+def settings_mask(settings):
+    """Bitmask of the enabled settings; a missing key counts as enabled."""
+    mask = 0
+    for name, bit in SETTING_BITS.items():
+        if settings.get(name, True):
+            mask |= bit
+    return mask
+
+
+# 三合/三会：mask 为三个地支的掩码，results 按出现的地支掩码查结果模板
+# (类型, 描述, 分数, 六柱模式下涉及大运流年的分数, 地支编码, 地支)
+Triple = collections.namedtuple("Triple", "bit mask results")
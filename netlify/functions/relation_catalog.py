@@ -0,0 +1,106 @@
+# netlify/functions/relation_catalog.py
+# -*- coding: utf-8 -*-
+"""
+Catalog of relationship descriptions, for compact game payloads.
+
+Every relationship carries a type, a description and sometimes a
+full_description. These come from a small fixed set built from
+ganzhi.py, so they are listed once here and numbered:
+
+    entries()   # [[type, description, full_description, characters], ...]
+    VERSION     # changes whenever the entries change
+
+A compact relationship is [entry id, positions, points]. A found one
+adds actual_positions as a 4th item. Pair characters are left out because
+they can be read from the chart at the positions. 三合/三会 entries keep
+their characters, since those are listed in pattern order, not chart
+order. compact() and expand() convert between this form and the usual
+dicts. The catalog function serves the entries with long-lived cache
+headers, keyed by VERSION.
+"""
+import json
+import zlib
+
+from tables import GAN_RECORDS, ZHI_RECORDS, TRIPLE_PATTERNS
+
+
+class CatalogMismatch(ValueError):
+    """A compact payload refers to another catalog version."""
+
+
+def _build():
+    entries, index = [], {}
+
+    def add(type_, desc, full_desc=None, chars=None):
+        key = (type_, desc, full_desc or None)
+        if key not in index:
+            index[key] = len(entries)
+            entries.append(list(key) + [chars])
+
+    for records in GAN_RECORDS + ZHI_RECORDS:
+        for _, type_, desc, full_desc, _, _ in records:
+            add(type_, desc, full_desc)
+    for pattern in TRIPLE_PATTERNS:
+        for mask in sorted(pattern.results):
+            result = pattern.results[mask]
+            add(result[0], result[1], chars=list(result[5]))
+    return entries, index
+
+
+ENTRIES, _INDEX = _build()
+VERSION = '{:08x}'.format(zlib.crc32(json.dumps(ENTRIES, ensure_ascii=False).encode('utf-8')))
+
+
+def entries():
+    """The catalog body served to clients."""
+    return {'version': VERSION, 'entries': ENTRIES}
+
+
+def entry_id(rel):
+    return _INDEX[(rel['type'], rel['description'], rel.get('full_description'))]
+
+
+def compact(relationships):
+    """Relationship dicts to [id, positions, points] (plus actual_positions when present)."""
+    items = []
+    for rel in relationships:
+        item = [entry_id(rel), list(rel['positions']), rel['points']]
+        if 'actual_positions' in rel:
+            item.append(list(rel['actual_positions']))
+        items.append(item)
+    return items
+
+
+def expand(chart, items, version=VERSION):
+    """Compact items back to relationship dicts; pair characters are read from the chart."""
+    if version != VERSION:
+        raise CatalogMismatch('Catalog version {} is out of date; current is {}.'.format(version, VERSION))
+    relationships = []
+    for item in items:
+        type_, desc, full_desc, chars = ENTRIES[item[0]]
+        if chars is None:
+            pillars = chart['gans'] if type_.startswith('天干') else chart['zhis']
+            chars = [pillars[pos] for pos in item[1]]
+        rel = {'type': type_, 'positions': list(item[1]), 'characters': list(chars), 'description': desc}
+        if full_desc:
+            rel['full_description'] = full_desc
+        rel['points'] = item[2]
+        if len(item) > 3:
+            rel['actual_positions'] = list(item[3])
+        relationships.append(rel)
+    return relationships
+
+
+def compact_game(chart, all_relationships, session=None):
+    """A new_game response body in compact form."""
+    body = {'chart': chart, 'catalog': VERSION, 'relationships': compact(all_relationships)}
+    if session:
+        body['session'] = session
+    return body
+
+
+def compact_result(result):
+    """A check result with the matched relationship in compact form."""
+    if not result.get('found'):
+        return result
+    return {'found': True, 'catalog': VERSION, 'relationship': compact([result['relationship']])[0]}
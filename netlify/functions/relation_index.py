@@ -0,0 +1,85 @@
+# netlify/functions/relation_index.py
+# -*- coding: utf-8 -*-
+"""
+Hash index over a game's relationship list for check_relationship.
+
+A selection is matched by its sorted character multiset: a chart can
+repeat characters, so 甲庚 picked at positions [1, 2] still matches the
+甲庚 relationship detected at [0, 1]. Found relationships are kept as
+sets of position tuples, so a click costs a few dict/set lookups instead
+of rescanning both lists.
+
+Build the index once per game and reuse it. The stateless handlers build
+it per request, which is still one linear pass.
+"""
+
+
+def chars_key(chars):
+    """Canonical key of a character multiset."""
+    return tuple(sorted(chars))
+
+
+def selected_chars(chart, positions):
+    """Characters at the selected positions; zhi positions start at num_pillars."""
+    num_pillars = 6 if chart.get('advanced_mode') else 4
+    gans = chart.get('gans', [])
+    zhis = chart.get('zhis', [])
+    return [zhis[pos - num_pillars] if pos >= num_pillars else gans[pos] for pos in positions]
+
+
+class RelationshipIndex:
+    """all_relationships grouped by chars_key, keeping list order within a key."""
+
+    def __init__(self, all_relationships):
+        self.by_chars = {}
+        for rel in all_relationships:
+            self.by_chars.setdefault(chars_key(rel['characters']), []).append(rel)
+
+    def match(self, chars, positions, found):
+        """First relationship with these characters not yet found at positions, or None."""
+        for rel in self.by_chars.get(chars_key(chars), ()):
+            if (rel['type'], positions) not in found.typed:
+                return rel
+        return None
+
+
+class FoundSet:
+    """found_relationships as sets of sorted position tuples."""
+
+    def __init__(self, found_relationships=()):
+        # actual_positions: any relationship already claimed these positions
+        self.positions = set()
+        # (type, positions): falls back to the detected positions like the old scan did
+        self.typed = set()
+        for rel in found_relationships:
+            self.add(rel)
+
+    def add(self, rel):
+        self.positions.add(tuple(sorted(rel.get('actual_positions', []))))
+        self.typed.add((rel['type'], tuple(sorted(rel.get('actual_positions', rel['positions'])))))
+
+
+def check_selection(chart, positions, all_relationships, found_relationships, index=None):
+    """Response body for a selection: {'found': True, 'relationship': ...} or found False with a message.
+
+    found_relationships may be a list or a FoundSet kept across clicks.
+    """
+    sorted_positions = sorted(positions)
+    key = tuple(sorted_positions)
+    found = found_relationships
+    if not isinstance(found, FoundSet):
+        found = FoundSet(found_relationships)
+
+    # Check if this exact combination of positions has already been found
+    if key in found.positions:
+        return {'found': False, 'message': 'This relationship has already been found.'}
+
+    index = index or RelationshipIndex(all_relationships)
+    match = index.by_chars and index.match(selected_chars(chart, sorted_positions), key, found)
+    if not match:
+        return {'found': False, 'message': 'No valid relationship found for the selection.'}
+
+    # Add the actual positions from user selection to the found relationship
+    response_rel = match.copy()
+    response_rel['actual_positions'] = sorted_positions
+    return {'found': True, 'relationship': response_rel}
@@ -0,0 +1,140 @@
+# netlify/functions/relation_masks.py
+# -*- coding: utf-8 -*-
+"""
+Bitmask relationship tables for detect_all_relationships.
+
+Every relation type has one bit, matching one game setting. The tables
+below are built once from ganzhi.py:
+
+- GAN_MATRIX[gan1 * 10 + gan2]: all relation bits between two stems.
+- ZHI_MATRIX[zhi1 * 12 + zhi2]: all relation bits between two branches.
+  Half 三合/三会 bits are set here too. 相刑 pairs come from zhi_xings in
+  either order, 自刑 from zhi_zixings (the same branch twice) and 暗合
+  from zhi_atts[zhi]['暗'].
+- GAN_RECORDS / ZHI_RECORDS: the result records for each pair, in the
+  order detect_all_relationships emits them.
+- TRIPLE_PATTERNS: 三合/三会 patterns and the 三刑 (寅巳申, 丑戌未, the
+  zhi_xings groups of three) as 12-bit branch masks.
+
+`cell & settings_mask(settings)` gives every enabled relation of a pair
+in one AND.
+"""
+import re
+
+from ganzhi import Gan, Zhi, gan_hes, zhi_6hes, zhi_half_3hes, zhi_xings, zhi_zixings
+from gzcore import (GAN_HE, GAN_CHONG, ZHI_LIUHE, ZHI_CHONG, ZHI_HAI, ZHI_PO, ZHI_AN,
+                    ZHI_INDEX)
+
+# 关系位、settings_mask、Triple
+from relation_bits import *
+
+
+def _xing_groups():
+    """zhi_xings 按刑名分组：{刑名: [(刑者编码, 被刑者编码), ...]}。"""
+    groups = {}
+    for (first, second), text in zhi_xings.items():
+        name = re.search(r'\S*之刑', text).group()
+        groups.setdefault(name, []).append((ZHI_INDEX[first], ZHI_INDEX[second]))
+    return groups
+
+
+_XING_GROUPS = _xing_groups()
+# 相刑不分先后：两个地支编码的集合 -> 刑名
+_XING_PAIRS = {frozenset(pair): name for name, pairs in _XING_GROUPS.items() for pair in pairs}
+_ZIXING = frozenset(ZHI_INDEX[item] for item in zhi_zixings)
+
+
+# 记录模板：(关系位, 类型, 描述, 完整描述, 分数, 六柱模式下涉及大运流年的分数)
+def _gan_records(gan1, gan2):
+    records = []
+    if GAN_HE[gan1] == gan2:
+        first, second = Gan[gan1], Gan[gan2]
+        rel_info = gan_hes.get((first, second), gan_hes.get((second, first)))
+        element = "".join(c for c in rel_info if c in "土金水木火")
+        short_desc = f"{first}{second}合化{element}" if element else f"{first}{second}相合"
+        records.append((GAN_WUHE, '天干五合', short_desc, rel_info, 10, 15))
+    if GAN_CHONG[gan1] == gan2:
+        records.append((GAN_XIANGCHONG, '天干相冲', "天干相冲，主冲突不和", None, 8, 12))
+    return tuple(records)
+
+
+def _zhi_records(zhi1, zhi2):
+    records = []
+    first, second = Zhi[zhi1], Zhi[zhi2]
+    if ZHI_LIUHE[zhi1] == zhi2:
+        element = zhi_6hes.get(first + second, zhi_6hes.get(second + first, ""))
+        desc = f"{first}{second}六合化{element}" if element else f"{first}{second}六合"
+        records.append((ZHI_LIUHE_BIT, '地支六合', desc, None, 12, 18))
+    if ZHI_CHONG[zhi1] == zhi2:
+        records.append((ZHI_XIANGCHONG, '地支相冲', "地支相冲，主动荡变化", None, 10, 15))
+    if zhi1 == zhi2 and zhi1 in _ZIXING:
+        records.append((ZHI_XIANGXING, '地支自刑', f"{first}{second}自刑", None, 12, 18))
+    elif frozenset((zhi1, zhi2)) in _XING_PAIRS:
+        name = _XING_PAIRS[frozenset((zhi1, zhi2))]
+        records.append((ZHI_XIANGXING, '地支相刑', "地支相刑，主刑伤阻滞", f"{first}{second}相刑，{name}", 15, 20))
+    if ZHI_HAI[zhi1] == zhi2:
+        records.append((ZHI_XIANGHAI, '地支相害', "地支相害，主暗中损害", None, 12, 18))
+    if ZHI_PO[zhi1] == zhi2:
+        records.append((ZHI_XIANGPO, '地支相破', "地支相破，主破坏损失", None, 10, 15))
+    if ZHI_AN[zhi1] == zhi2:
+        records.append((ZHI_ANHE, '地支暗合', f"{first}{second}暗合", None, 10, 15))
+    return tuple(records)
+
+
+def _half_sanhe_desc(chars, element):
+    pair_tuple = tuple(sorted(chars))
+    half_info = zhi_half_3hes.get(pair_tuple, zhi_half_3hes.get(tuple(reversed(pair_tuple)), ""))
+    return f"{''.join(chars)}半合 {half_info}" if half_info else f"{''.join(chars)}半合化{element}"
+
+
+def _half_sanhui_desc(chars, element):
+    return f"{''.join(chars)}半会化{element}"
+
+
+def _triple(bit, codes, desc, full_type, full_points, half_type, half_points, half_desc):
+    mask = sum(1 << item for item in codes)
+    results = {mask: (full_type, desc) + full_points + (codes, [Zhi[item] for item in codes])}
+    for missing in codes:
+        found = tuple(item for item in codes if item != missing)
+        chars = [Zhi[item] for item in found]
+        results[mask & ~(1 << missing)] = (half_type, half_desc(chars, desc[-2])) + half_points + (found, chars)
+    return Triple(bit, mask, results)
+
+
+def _sanxing(name, pairs):
+    # 沿 刑者 -> 被刑者 绕一圈，从编码最小的地支起：寅巳申、丑戌未；只有三个都在才算
+    targets = dict(pairs)
+    codes = [min(targets)]
+    while len(codes) < len(targets):
+        codes.append(targets[codes[-1]])
+    chars = [Zhi[item] for item in codes]
+    mask = sum(1 << item for item in codes)
+    return Triple(ZHI_XIANGXING, mask, {mask: ('地支三刑', f"{''.join(chars)}三刑 {name}", 25, 35, tuple(codes), chars)})
+
+
+TRIPLE_PATTERNS = (
+    _triple(ZHI_SANHE, (8, 0, 4), '申子辰三合水局', '地支三合', (20, 30), '地支半合', (12, 18), _half_sanhe_desc),
+    _triple(ZHI_SANHE, (2, 6, 10), '寅午戌三合火局', '地支三合', (20, 30), '地支半合', (12, 18), _half_sanhe_desc),
+    _triple(ZHI_SANHE, (5, 9, 1), '巳酉丑三合金局', '地支三合', (20, 30), '地支半合', (12, 18), _half_sanhe_desc),
+    _triple(ZHI_SANHE, (11, 3, 7), '亥卯未三合木局', '地支三合', (20, 30), '地支半合', (12, 18), _half_sanhe_desc),
+    _triple(ZHI_SANHUI, (11, 0, 1), '亥子丑三会水方', '地支三会', (18, 27), '地支半会', (10, 15), _half_sanhui_desc),
+    _triple(ZHI_SANHUI, (2, 3, 4), '寅卯辰三会木方', '地支三会', (18, 27), '地支半会', (10, 15), _half_sanhui_desc),
+    _triple(ZHI_SANHUI, (5, 6, 7), '巳午未三会火方', '地支三会', (18, 27), '地支半会', (10, 15), _half_sanhui_desc),
+    _triple(ZHI_SANHUI, (8, 9, 10), '申酉戌三会金方', '地支三会', (18, 27), '地支半会', (10, 15), _half_sanhui_desc),
+) + tuple(_sanxing(name, pairs) for name, pairs in _XING_GROUPS.items() if len(pairs) == 3)
+
+
+def _zhi_cell(zhi1, zhi2):
+    mask = 0
+    for bit, *_ in _zhi_records(zhi1, zhi2):
+        mask |= bit
+    for pattern in TRIPLE_PATTERNS:
+        if zhi1 != zhi2 and pattern.mask >> zhi1 & pattern.mask >> zhi2 & 1:
+            mask |= pattern.bit
+    return mask
+
+
+GAN_RECORDS = tuple(_gan_records(gan1, gan2) for gan1 in range(10) for gan2 in range(10))
+ZHI_RECORDS = tuple(_zhi_records(zhi1, zhi2) for zhi1 in range(12) for zhi2 in range(12))
+GAN_MATRIX = tuple(sum(item[0] for item in records) for records in GAN_RECORDS)
+ZHI_MATRIX = tuple(_zhi_cell(zhi1, zhi2) for zhi1 in range(12) for zhi2 in range(12))
@@ -0,0 +1,97 @@
+# netlify/functions/tables.py
+# -*- coding: utf-8 -*-
+"""
+Constant tables for the game functions, loaded from a snapshot at startup.
+
+gzcore and relation_masks build their tables from ganzhi.py and datas.py.
+Those modules pull in bidict and build dozens of dicts on import, which
+dominates cold starts. This module provides the same tables from
+tables.snap, a single marshal file:
+
+    python tables.py        # regenerate tables.snap after changing the tables
+
+The snapshot records a CRC of its source files. If it is missing or out
+of date, the tables are built from the source modules as before.
+"""
+import marshal
+import os
+import sys
+import zlib
+
+from relation_bits import Triple
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.path.join(_HERE, 'tables.snap')
+SOURCES = ('ganzhi.py', 'datas.py', 'gzcore.py', 'relation_masks.py', 'relation_bits.py')
+_VERSION = 1
+
+# 从 gzcore、relation_masks 取出的表
+GZCORE_NAMES = ('Gan', 'Zhi', 'GAN_INDEX', 'ZHI_INDEX', 'PILLARS', 'PILLAR_INDEX')
+MASK_NAMES = ('GAN_MATRIX', 'GAN_RECORDS', 'ZHI_MATRIX', 'ZHI_RECORDS', 'TRIPLE_PATTERNS')
+
+
+def _checksum():
+    crc = 0
+    for name in SOURCES:
+        with open(os.path.join(_HERE, name), 'rb') as f:
+            crc = zlib.crc32(f.read(), crc)
+    return crc
+
+
+def _from_sources():
+    import gzcore
+    import relation_masks
+    tables = {name: getattr(gzcore, name) for name in GZCORE_NAMES}
+    tables.update((name, getattr(relation_masks, name)) for name in MASK_NAMES)
+    tables['Gan'], tables['Zhi'] = tuple(tables['Gan']), tuple(tables['Zhi'])
+    tables['TRIPLE_PATTERNS'] = tuple(tuple(item) for item in tables['TRIPLE_PATTERNS'])
+    return tables
+
+
+def build(path=SNAPSHOT_PATH):
+    """Write the snapshot; returns the number of tables."""
+    tables = _from_sources()
+    with open(path, 'wb') as f:
+        marshal.dump((_VERSION, _checksum(), tables), f)
+    return len(tables)
+
+
+def _load(path=SNAPSHOT_PATH):
+    try:
+        with open(path, 'rb') as f:
+            version, checksum, tables = marshal.load(f)
+        if version == _VERSION and checksum == _checksum():
+            return tables
+    except (OSError, EOFError, ValueError, TypeError):
+        pass
+    return None
+
+
+_tables = _load() or _from_sources()
+
+Gan = _tables['Gan']
+Zhi = _tables['Zhi']
+GAN_INDEX = _tables['GAN_INDEX']
+ZHI_INDEX = _tables['ZHI_INDEX']
+PILLARS = _tables['PILLARS']
+PILLAR_INDEX = _tables['PILLAR_INDEX']
+GAN_MATRIX = _tables['GAN_MATRIX']
+GAN_RECORDS = _tables['GAN_RECORDS']
+ZHI_MATRIX = _tables['ZHI_MATRIX']
+ZHI_RECORDS = _tables['ZHI_RECORDS']
+TRIPLE_PATTERNS = tuple(Triple(*item) for item in _tables['TRIPLE_PATTERNS'])
+
+
+def pillar_code(gan, zhi):
+    """天干、地支编码合成干支编码，同 gzcore.pillar_code。"""
+    return (6 * gan - 5 * zhi) % 60
+
+
+def encode(gans, zhis):
+    """汉字天干、地支序列转为编码列表，同 gzcore.encode。"""
+    return [GAN_INDEX[item] for item in gans], [ZHI_INDEX[item] for item in zhis]
+
+
+if __name__ == '__main__':
+    print("{} tables written to {}".format(build(), SNAPSHOT_PATH))
+    sys.exit(0)
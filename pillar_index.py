@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+四柱反查索引：由八字查可能的出生时间段。
+
+    python pillar_index.py build                           # 生成 pillars.idx（1600-2400年）
+    python pillar_index.py 庚午 辛巳 壬午 甲辰
+    python pillar_index.py 庚午 '*' 壬午 '*' --start 1900 --end 2000
+
+bazi.py -b 每次调用 sxtwl.siZhu2Year 在整个年份范围里搜索。这里事先把
+每一天按年、月、日柱不变的时间段（交节时刻会把一天切成两段）写成按
+(年柱, 月柱, 日柱) 排序的索引，查询时用 mmap 打开，二分查找后再按时柱
+算出当天的时辰窗口。任何一柱都可以写成 * 表示不限。
+
+四柱的算法同 jieqi.py，即 lunar_python 的八字（流派2）：
+23 点起的晚子时日柱不变，时干用次日日干。
+"""
+
+import argparse
+import bisect
+import datetime
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from gzcore import PILLARS, PILLAR_INDEX, pillar_code
+import jieqi
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pillars.idx')
+
+# 文件头：标识、起止年份、时间段个数；之后依次是 key(int32)、起点秒数(int64)、时长秒数(uint32)
+_HEADER = struct.Struct('<4sHHI')
+_MAGIC = b'PX01'
+_DAY_SECONDS = 86400
+_WILDCARDS = (None, '', '*', '?')
+
+
+def _key(year, month, day):
+    return (year * 60 + month) * 60 + day
+
+
+def _code(item):
+    """干支字符串、编码或通配符转为编码，通配符为 None。"""
+    if item in _WILDCARDS:
+        return None
+    if isinstance(item, int):
+        if not 0 <= item < 60:
+            raise ValueError("pillar code must be 0-59: {}".format(item))
+        return item
+    if item not in PILLAR_INDEX:
+        raise ValueError("unknown pillar: {!r}".format(item))
+    return PILLAR_INDEX[item]
+
+
+def build_index(path=INDEX_PATH, table=None):
+    """按节气表生成索引写入 path，返回时间段个数。"""
+    table = table or jieqi.get_table()
+    instants = table.instants
+    segments = []
+    first = datetime.date(table.start_year, 1, 1).toordinal()
+    last = datetime.date(table.end_year, 12, 31).toordinal()
+    term = bisect.bisect_right(instants, first * _DAY_SECONDS)
+    for ordinal in range(first, last + 1):
+        day_code = (ordinal + jieqi._JDN_OFFSET - 11) % 60
+        start = ordinal * _DAY_SECONDS
+        day_end = start + _DAY_SECONDS
+        while start < day_end:
+            while instants[term] <= start:
+                term += 1
+            end = min(instants[term], day_end)
+            year_code, month_code = table.month_year_codes(start)
+            segments.append((_key(year_code, month_code, day_code), start, end - start))
+            start = end
+    segments.sort()
+
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, table.start_year, table.end_year, len(segments)))
+        for seq, typecode in enumerate('iqI'):
+            column = array(typecode, (item[seq] for item in segments))
+            if sys.byteorder != 'little':
+                column.byteswap()
+            f.write(column.tobytes())
+    return len(segments)
+
+
+class PillarIndex:
+    """build_index 生成的索引，用 mmap 只读打开。"""
+
+    def __init__(self, path=INDEX_PATH):
+        if sys.byteorder != 'little':
+            raise OSError("pillar index is little-endian only")
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.start_year, self.end_year, count = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC:
+            raise ValueError("not a pillar index: {}".format(path))
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+        self.keys = view[offset:offset + count * 4].cast('i')
+        offset += count * 4
+        self.starts = view[offset:offset + count * 8].cast('q')
+        offset += count * 8
+        self.lengths = view[offset:offset + count * 4].cast('I')
+
+    def _key_ranges(self, year, month, day):
+        years = range(60) if year is None else (year,)
+        for year_ in years:
+            if month is None:
+                # 五虎遁：年干定寅月的月干
+                months = [(year_ % 10 % 5 * 12 + 2 + item) % 60 for item in range(12)]
+            else:
+                months = [month]
+            for month_ in months:
+                if day is None:
+                    yield _key(year_, month_, 0), _key(year_, month_, 59) + 1
+                else:
+                    key = _key(year_, month_, day)
+                    yield key, key + 1
+
+    def lookup(self, year=None, month=None, day=None, time=None, start_year=None, end_year=None):
+        """四柱查出生时间段，返回按时间排序的 [(起, 止), ...]，均为 datetime，止为开区间。
+
+        每柱可以是 '庚午' 这样的干支、0-59 的编码，或 None/'*' 表示不限。
+        start_year/end_year 按时间段起点的公历年份过滤，含两端。
+        """
+        year, month, day, time = _code(year), _code(month), _code(day), _code(time)
+        lower = None if start_year is None else datetime.date(start_year, 1, 1).toordinal() * _DAY_SECONDS
+        upper = None if end_year is None else datetime.date(end_year + 1, 1, 1).toordinal() * _DAY_SECONDS
+
+        windows = []
+        for low_key, high_key in self._key_ranges(year, month, day):
+            left = bisect.bisect_left(self.keys, low_key)
+            right = bisect.bisect_left(self.keys, high_key, left)
+            for seq in range(left, right):
+                start = self.starts[seq]
+                end = start + self.lengths[seq]
+                day_code = self.keys[seq] % 60
+                for window in _time_windows(start, end, day_code, time):
+                    if (lower is None or window[0] >= lower) and (upper is None or window[0] < upper):
+                        windows.append(window)
+        windows.sort()
+        return [(jieqi._from_seconds(start), jieqi._from_seconds(end)) for start, end in windows]
+
+    def close(self):
+        self._mmap.close()
+
+
+def _time_windows(start, end, day_code, time):
+    """某日 [start, end) 内时柱为 time 的时间窗口。"""
+    if time is None:
+        yield start, end
+        return
+    midnight = start - start % _DAY_SECONDS
+    zhi = time % 12
+    if zhi == 0:
+        # 早子时用当天日干，晚子时用次日日干
+        candidates = ((0, 1, day_code), (23, 24, day_code + 1))
+    else:
+        candidates = ((zhi * 2 - 1, zhi * 2 + 1, day_code),)
+    for first_hour, last_hour, gan_day in candidates:
+        if pillar_code((gan_day % 10 % 5 * 2 + zhi) % 10, zhi) != time:
+            continue
+        window_start = max(start, midnight + first_hour * 3600)
+        window_end = min(end, midnight + last_hour * 3600)
+        if window_start < window_end:
+            yield window_start, window_end
+
+
+_index = None
+
+
+def open_index(path=INDEX_PATH):
+    """打开默认索引，索引文件不存在时返回 None。"""
+    global _index
+    if path != INDEX_PATH:
+        return PillarIndex(path) if os.path.exists(path) else None
+    if _index is None and os.path.exists(path):
+        _index = PillarIndex(path)
+    return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument('pillars', nargs='+', help=u'build，或年、月、日、时四柱，* 表示不限')
+    parser.add_argument('-i', '--index', default=INDEX_PATH, help=u'索引文件')
+    parser.add_argument("--start", type=int, help=u'起始年份')
+    parser.add_argument("--end", type=int, help=u'结束年份')
+    options = parser.parse_args(argv)
+
+    if options.pillars == ['build']:
+        count = build_index(options.index)
+        print("{} segments written to {}".format(count, options.index))
+        return 0
+    if len(options.pillars) != 4:
+        parser.error("need build or four pillars")
+
+    index = PillarIndex(options.index)
+    for start, end in index.lookup(*options.pillars, start_year=options.start, end_year=options.end):
+        print("{} - {}  {}".format(start, end, ' '.join(
+            PILLARS[item] for item in jieqi.four_pillars(start.year, start.month, start.day, start.hour,
+                                                         start.minute, start.second))))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
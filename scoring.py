@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+五行分数与身强弱分数，按命盘签名缓存。
+
+签名是按年、月、日、时顺序连写的干支，例如 "庚午辛巳壬午甲辰"；加上
+大运、流年时在后面接着写，如 "庚午辛巳壬午甲辰壬午乙亥"。算法同 bazi.py：
+天干各 5 分，地支按藏干分数计，月支计两次；strong 为日主的比劫印枭分数之和。
+
+    >>> result = score_signature("庚午辛巳壬午甲辰")
+    >>> dict(zip(ELEMENTS, result.elements)), result.strong
+    ({'金': 12, '木': 7, '水': 6, '火': 20, '土': 15}, 18)
+
+score_signature 带有上限的 LRU 缓存，score_signature.cache_info() 给出
+命中和未命中次数。score_arrays 用 numpy 一次算 N 个命盘。
+"""
+
+import collections
+import functools
+
+from gzcore import (ELEMENTS, GAN_ELEMENT, GAN_INDEX, ZHI_INDEX, HIDDEN_STEMS, HIDDEN_WEIGHTS,
+                    TEN_GODS)
+
+CACHE_SIZE = 4096
+
+# elements 按 ELEMENTS（金木水火土）的顺序，gans 按甲到癸的顺序
+Scores = collections.namedtuple("Scores", "elements gans strong")
+
+# 比劫印枭
+_HELPERS = ('比', '劫', '枭', '印')
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def score_signature(signature):
+    """按签名计算五行分数、十天干分数和 strong，返回 Scores，元素都是元组。"""
+    if len(signature) < 8 or len(signature) % 2:
+        raise ValueError("need four or more pillars such as '庚午辛巳壬午甲辰': {!r}".format(signature))
+    try:
+        gans = [GAN_INDEX[item] for item in signature[0::2]]
+        zhis = [ZHI_INDEX[item] for item in signature[1::2]]
+    except KeyError as e:
+        raise ValueError("unknown stem or branch {} in {!r}".format(e, signature))
+
+    gan_points = [0] * 10
+    for item in gans:
+        gan_points[item] += 5
+    for item in zhis + [zhis[1]]:
+        for gan, weight in zip(HIDDEN_STEMS[item], HIDDEN_WEIGHTS[item]):
+            gan_points[gan] += weight
+
+    element_points = [0] * 5
+    for seq, value in enumerate(gan_points):
+        element_points[GAN_ELEMENT[seq]] += value
+
+    me_row = gans[2] * 10
+    strong = sum(value for seq, value in enumerate(gan_points) if TEN_GODS[me_row + seq] in _HELPERS)
+    return Scores(tuple(element_points), tuple(gan_points), strong)
+
+
+def signature(gans, zhis):
+    """天干、地支序列合成签名。"""
+    return ''.join(gan + zhi for gan, zhi in zip(gans, zhis))
+
+
+def score_arrays(gans, zhis):
+    """N×4（或加上大运流年的 N×6）天干、地支编码数组的分数，需要 numpy。
+
+    返回 Scores，elements 为 N×5，gans 为 N×10，strong 为长度 N 的数组，
+    每行与 score_signature 的结果相同。
+    """
+    import numpy as np
+
+    gans = np.asarray(gans, dtype=np.intp)
+    zhis = np.asarray(zhis, dtype=np.intp)
+    if gans.ndim != 2 or gans.shape != zhis.shape or gans.shape[1] < 4:
+        raise ValueError("need N×4 or wider arrays of the same shape: {} {}".format(gans.shape, zhis.shape))
+
+    gan_table, zhi_table, element_table, helper_table = _tables(np)
+    gan_points = gan_table[gans].sum(axis=1) + zhi_table[zhis].sum(axis=1) + zhi_table[zhis[:, 1]]
+    element_points = gan_points @ element_table
+    strong = (gan_points * helper_table[gans[:, 2]]).sum(axis=1)
+    return Scores(element_points, gan_points, strong)
+
+
+@functools.lru_cache(maxsize=1)
+def _tables(np):
+    gan_table = np.eye(10, dtype=np.int32) * 5
+    zhi_table = np.zeros((12, 10), dtype=np.int32)
+    for zhi in range(12):
+        for gan, weight in zip(HIDDEN_STEMS[zhi], HIDDEN_WEIGHTS[zhi]):
+            zhi_table[zhi, gan] += weight
+    element_table = np.zeros((10, 5), dtype=np.int32)
+    element_table[np.arange(10), GAN_ELEMENT] = 1
+    helper_table = np.array([[TEN_GODS[me * 10 + gan] in _HELPERS for gan in range(10)] for me in range(10)],
+                            dtype=np.int32)
+    return gan_table, zhi_table, element_table, helper_table
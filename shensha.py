@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+神煞查询，由 datas.py 的 year_shens、month_shens、day_shens、g_shens 预先编成反查表。
+
+原来的写法对每一柱都要把四张表的每个神煞循环一遍。这里在导入时按
+(表, 起神煞的干支) 把每个目标干支会带的神煞编成元组，查一柱只要四次下标：
+
+- 年支查地支：year_shens
+- 月支查天干或地支：month_shens
+- 日支查地支：day_shens
+- 日干查地支：g_shens
+
+    >>> stars = chart_stars(*encode("庚辛壬甲", "午巳午辰"))
+    >>> [[item.name for item in row] for row in stars]
+    [['月德', '将星'], ['天德', '亡神', '天乙'], [], ['寡宿']]
+
+返回结构化的 Star，调用方自行决定如何显示。每个位置内的顺序同 bazi.py
+原来的输出：按年、月、日、日干四张表，表内按 datas.py 中神煞的顺序。
+"""
+
+import collections
+
+from datas import year_shens, month_shens, day_shens, g_shens
+from gzcore import Gan, Zhi, GAN_INDEX, ZHI_INDEX, encode
+
+# table: 'year'、'month'、'day'、'me'，对应上面四张表
+# by_gan: 月支表中由天干（而不是地支）带出的神煞
+Star = collections.namedtuple("Star", "name table by_gan")
+
+TABLES = ('year', 'month', 'day', 'me')
+
+# 四柱中各表查哪些位置：年支表不查年柱，日支表不查日柱
+CHART_POSITIONS = {
+    'year': (1, 2, 3),
+    'month': (0, 1, 2, 3),
+    'day': (0, 1, 3),
+    'me': (0, 1, 2, 3),
+}
+
+
+def _compile(table, anchors, targets, name, by_gan=False):
+    """{神煞: {起神煞的干支: 目标干支串}} 编为 [anchor * len(targets) + target] -> (Star, ...)。"""
+    index = [[] for _ in range(len(anchors) * len(targets))]
+    for star, rows in table.items():
+        for anchor, value in rows.items():
+            for char in value:
+                if char in targets:
+                    index[anchors.index(anchor) * len(targets) + targets.index(char)].append(
+                        Star(star, name, by_gan))
+    return tuple(tuple(item) for item in index)
+
+
+def _merge(gan_index, zhi_index):
+    """月支表的天干、地支两种目标合并为 [month_zhi * 120 + gan * 12 + zhi]，按神煞顺序。"""
+    order = list(month_shens)
+    index = []
+    for month_zhi in range(12):
+        for gan in range(10):
+            for zhi in range(12):
+                stars = gan_index[month_zhi * 10 + gan] + zhi_index[month_zhi * 12 + zhi]
+                index.append(tuple(sorted(stars, key=lambda item: order.index(item.name))))
+    return tuple(index)
+
+
+YEAR_INDEX = _compile(year_shens, Zhi, Zhi, 'year')
+MONTH_INDEX = _merge(_compile(month_shens, Zhi, Gan, 'month', by_gan=True),
+                     _compile(month_shens, Zhi, Zhi, 'month'))
+DAY_INDEX = _compile(day_shens, Zhi, Zhi, 'day')
+ME_INDEX = _compile(g_shens, Gan, Zhi, 'me')
+
+
+def pillar_stars(zhis, me, gan, zhi, tables=TABLES):
+    """一柱（天干 gan、地支 zhi，编码）在命盘中带的神煞，返回 Star 列表。
+
+    zhis 为四柱地支编码，me 为日干编码；tables 选用哪几张表，大运、流年四张都用。
+    """
+    stars = []
+    if 'year' in tables:
+        stars.extend(YEAR_INDEX[zhis[0] * 12 + zhi])
+    if 'month' in tables:
+        stars.extend(MONTH_INDEX[zhis[1] * 120 + gan * 12 + zhi])
+    if 'day' in tables:
+        stars.extend(DAY_INDEX[zhis[2] * 12 + zhi])
+    if 'me' in tables:
+        stars.extend(ME_INDEX[me * 12 + zhi])
+    return stars
+
+
+def chart_stars(gans, zhis):
+    """四柱（编码）各柱的神煞，返回四个 Star 列表。"""
+    result = []
+    for seq in range(4):
+        tables = [item for item in TABLES if seq in CHART_POSITIONS[item]]
+        result.append(pillar_stars(zhis, gans[2], gans[seq], zhis[seq], tables))
+    return result
+
+
+def star_names(gans, zhis, gan, zhi):
+    """以汉字给出的四柱与一柱（大运、流年），返回神煞名称列表。"""
+    return [item.name for item in pillar_stars([ZHI_INDEX[item] for item in zhis], GAN_INDEX[gans[2]],
+                                               GAN_INDEX[gan], ZHI_INDEX[zhi])]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the importable ChartAnalyzer API
+
+import sys
+sys.path.append('.')
+
+from analyzer import ChartAnalyzer, get_dayuns
+
+
+def test_analyze_pillars():
+    """Values match what `python bazi.py -g 1990 5 17 8` prints"""
+    chart = ChartAnalyzer().analyze_pillars("庚午 辛巳 壬午 甲辰")
+
+    assert chart.me == '壬'
+    assert chart.gan_shens == ['枭', '印', '--', '食']
+    assert chart.zhi_shens == ['财', '才', '财', '杀']
+    assert chart.scores == {"金": 12, "木": 7, "水": 6, "火": 20, "土": 15}
+    assert chart.strong == 18
+    assert chart.weak is True
+    assert chart.nayins == ['路旁土', '白蜡金', '杨柳木', '覆灯火']
+    assert chart.lunar is None
+    print("✅ analyze_pillars:", chart.scores, chart.strong)
+
+
+def test_analyze_birth_matches_pillars():
+    """A solar birth time gives the same result as its four pillars"""
+    analyzer = ChartAnalyzer()
+    by_birth = analyzer.analyze_birth(1990, 5, 17, 8)
+    by_pillars = analyzer.analyze_pillars("庚午 辛巳 壬午 甲辰")
+
+    assert by_birth.lunar is not None
+    assert by_birth._replace(lunar=None) == by_pillars
+    print("✅ analyze_birth:", ''.join(by_birth.gans), ''.join(by_birth.zhis))
+
+
+def test_dayun_direction():
+    """阳男阴女顺行，阴男阳女逆行"""
+    analyzer = ChartAnalyzer()
+    male = analyzer.analyze_pillars("庚午 辛巳 壬午 甲辰")
+    female = analyzer.analyze_pillars("庚午 辛巳 壬午 甲辰", is_female=True)
+
+    assert male.direction == 1 and male.dayuns[:3] == ['壬午', '癸未', '甲申']
+    assert female.direction == -1 and female.dayuns[:3] == ['庚辰', '己卯', '戊寅']
+    assert get_dayuns('辛', '巳', -1, count=2) == ['庚辰', '己卯']
+    print("✅ dayun direction")
+
+
+def test_no_shared_state():
+    """Results of one chart never leak into another"""
+    analyzer = ChartAnalyzer()
+    first = analyzer.analyze_pillars("甲子 丙寅 戊辰 庚午")
+    snapshot = dict(first.scores)
+    analyzer.analyze_pillars("庚午 辛巳 壬午 甲辰")
+
+    assert first.scores == snapshot
+    assert first.me == '戊'
+    print("✅ no shared state")
+
+
+def test_invalid_pillars():
+    try:
+        ChartAnalyzer().analyze_pillars("甲子 丙寅 戊辰")
+    except ValueError:
+        print("✅ invalid pillars rejected")
+    else:
+        raise AssertionError("three pillars should be rejected")
+
+
+if __name__ == "__main__":
+    test_analyze_pillars()
+    test_analyze_birth_matches_pillars()
+    test_dayun_direction()
+    test_no_shared_state()
+    test_invalid_pillars()
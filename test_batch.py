@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for `bazi.py batch`
+
+import io
+import json
+import sys
+sys.path.append('.')
+
+from batch import analyze_row, read_rows, run
+
+ROWS = [
+    {"id": 1, "year": 1990, "month": 5, "day": 17, "hour": 8},
+    {"id": 2, "pillars": "庚午 辛巳 壬午 甲辰", "female": True},
+    {"id": 3, "year": 1990, "month": 4, "day": 23, "hour": 8, "lunar": True},
+    {"id": 4, "year": 1990, "month": 13, "day": 1, "hour": 8},
+]
+
+
+def test_analyze_row():
+    birth = analyze_row(ROWS[0])
+    pillars = analyze_row(ROWS[1])
+
+    assert birth['pillars'] == "庚午 辛巳 壬午 甲辰"
+    assert birth['solar'] == "1990-05-17 08:00:00"
+    assert birth['scores'] == pillars['scores']
+    assert pillars['direction'] == -1 and 'solar' not in pillars
+    print("✅ analyze_row:", birth['pillars'])
+
+
+def test_lunar_and_bad_rows():
+    lunar = analyze_row(ROWS[2])
+    bad = analyze_row(ROWS[3])
+
+    assert lunar['pillars'] == "庚午 辛巳 壬午 甲辰"
+    assert bad['id'] == 4 and 'error' in bad and 'scores' not in bad
+    print("✅ bad row reported:", bad['error'])
+
+
+def test_read_csv():
+    stream = io.StringIO("id,year,month,day,hour,female\n7,1990,5,17,8,1\n")
+    rows = list(read_rows(stream, 'csv'))
+
+    assert rows == [{'id': '7', 'year': '1990', 'month': '5', 'day': '17', 'hour': '8', 'female': '1'}]
+    assert analyze_row(rows[0])['female'] is True
+    print("✅ csv input")
+
+
+def test_pool_keeps_order():
+    """The process pool writes the same lines, in order, as a single worker"""
+    serial, pooled = io.StringIO(), io.StringIO()
+    count, _ = run(iter(ROWS * 5), serial, workers=1)
+    run(iter(ROWS * 5), pooled, workers=2, chunksize=3)
+
+    assert count == 20
+    assert serial.getvalue() == pooled.getvalue()
+    ids = [json.loads(line)['id'] for line in pooled.getvalue().splitlines()]
+    assert ids == [1, 2, 3, 4] * 5
+    print("✅ pooled output in input order")
+
+
+def test_unordered_has_all_rows():
+    out = io.StringIO()
+    run(iter(ROWS * 5), out, workers=2, ordered=False, chunksize=2)
+    ids = sorted(json.loads(line)['id'] for line in out.getvalue().splitlines())
+
+    assert ids == sorted([1, 2, 3, 4] * 5)
+    print("✅ unordered output complete")
+
+
+def test_malformed_jsonl_line():
+    """A bad JSONL line becomes an error row; the rows around it still come out"""
+    lines = [json.dumps(ROWS[0]), 'not json', '[1, 2]', json.dumps(ROWS[1], ensure_ascii=False)]
+    for workers in (1, 2):
+        out = io.StringIO()
+        count, _ = run(read_rows(io.StringIO('\n'.join(lines) + '\n'), 'jsonl'), out, workers=workers, chunksize=1)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+
+        assert count == 4
+        assert rows[0]['id'] == 1 and rows[3]['id'] == 2 and 'scores' in rows[3]
+        assert rows[1]['error'].startswith('JSONDecodeError') and 'error' in rows[2]
+    print("✅ malformed line reported:", rows[1]['error'])
+
+
+if __name__ == "__main__":
+    test_analyze_row()
+    test_lunar_and_bad_rows()
+    test_read_csv()
+    test_pool_keeps_order()
+    test_unordered_has_all_rows()
+    test_malformed_jsonl_line()
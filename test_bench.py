@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the Netlify handler benchmark runner
+
+import bench
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert bench.percentile(values, 0.5) == 50
+    assert bench.percentile(values, 0.95) == 95
+    assert bench.percentile(values, 0.99) == 99
+    assert bench.percentile([7], 0.99) == 7
+    summary = bench.summarize([3, 1, 2], [10, 20, 30], [5, 4])
+    assert summary == {'count': 3, 'p50': 2, 'p95': 3, 'p99': 3, 'bytes': 20.0, 'import_p50': 4}
+    print("✅ percentile / summarize")
+
+
+def test_compare():
+    baseline = {'warm': {'new_game/basic': {'p50': 1.0, 'p95': 2.0, 'p99': 3.0}},
+                'cold': {'new_game/basic': {'p50': 10.0, 'p95': 12.0, 'p99': 13.0, 'import_p50': 20.0}}}
+    same = {'warm': {'new_game/basic': {'p50': 1.2, 'p95': 2.3, 'p99': 3.4}},
+            'cold': {'new_game/basic': {'p50': 10.0, 'p95': 12.0, 'p99': 13.0, 'import_p50': 24.0}}}
+    assert bench.compare(same, baseline) == []
+    slower = {'warm': {'new_game/basic': {'p50': 1.4, 'p95': 2.0, 'p99': 3.0},
+                       'check_relationship/basic': {'p50': 9.0, 'p95': 9.0, 'p99': 9.0}},
+              'cold': {'new_game/basic': {'p50': 10.0, 'p95': 12.0, 'p99': 13.0, 'import_p50': 40.0}}}
+    # p50 多了 40%，但差值低于 0.5 毫秒，视为噪声；基线里没有的键不比较
+    assert bench.compare(slower, baseline) == [('cold', 'new_game/basic', 'import_p50', 20.0, 40.0)]
+    assert bench.compare(slower, baseline, threshold=1.5) == [('cold', 'new_game/basic', 'import_p50', 20.0, 40.0)]
+    assert bench.compare(slower, baseline, threshold=2.5) == []
+    print("✅ compare reports regressions above threshold and floor")
+
+
+def test_run():
+    results = bench.run(cold=1, warm=5)
+    keys = {'{}/{}'.format(name, mode) for name in ('new_game', 'check_relationship') for mode in bench.MODES}
+    assert set(results['cold']) == keys
+    assert set(results['warm']) == keys | {'check_relationship_token/' + mode for mode in bench.MODES}
+    for key, item in results['cold'].items():
+        assert item['count'] == 1 and item['import_p50'] > 0 and item['bytes'] > 0, key
+    for key, item in results['warm'].items():
+        assert item['count'] == 5 and item['p50'] <= item['p95'] <= item['p99'], key
+        assert 'import_p50' not in item
+    assert bench.compare(results, results) == []
+    print("✅ run: cold and warm results for both handlers and modes")
+
+
+if __name__ == "__main__":
+    test_percentile()
+    test_compare()
+    test_run()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the offline chart pack builder
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from bazi_utils import generate_random_bazi, detect_all_relationships
+from chart_packs import MODES, PRESETS, build, chart_from_row
+from relation_catalog import VERSION, expand
+
+
+def read_pack(directory, name):
+    with open(os.path.join(directory, name), 'rb') as f:
+        return json.loads(gzip.decompress(f.read()))
+
+
+def test_build():
+    with tempfile.TemporaryDirectory() as publish_dir:
+        lines = []
+        manifest = build(count=40, shards=2, jobs=2, base=5, publish_dir=publish_dir, log=lines.append)
+        directory = os.path.join(publish_dir, 'packs')
+        assert manifest['catalog'] == VERSION and len(manifest['packs']) == len(MODES) * len(PRESETS) * 2
+        with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+            assert json.load(f) == manifest
+        assert 'games/s' in lines[-1] and len(lines) == len(manifest['packs']) + 1
+
+        for item in manifest['packs']:
+            pack = read_pack(directory, item['file'])
+            assert pack['mode'] == item['mode'] and pack['preset'] == item['preset'] and pack['catalog'] == VERSION
+            assert item['settings'] == PRESETS[item['preset']] and len(pack['games']) == item['count'] == 40
+            assert item['bytes'] == os.path.getsize(os.path.join(directory, item['file']))
+            advanced_mode = MODES[pack['mode']]
+            for row in pack['games'][:10]:
+                chart = chart_from_row(row, advanced_mode)
+                assert chart == generate_random_bazi(advanced_mode, seed=row[0])
+                assert expand(chart, row[6]) == detect_all_relationships(chart, PRESETS[pack['preset']])
+        seeds = {row[0] for item in manifest['packs'] for row in read_pack(directory, item['file'])['games']}
+        assert len(seeds) == 40 * len(manifest['packs'])
+        first = read_pack(directory, 'basic-default-0.json.gz')
+
+        # 同一个基础种子生成同样的包
+        build(count=40, shards=1, jobs=1, base=5, publish_dir=publish_dir, log=lambda line: None)
+        assert read_pack(directory, 'basic-default-0.json.gz') == first
+    print("✅ packs per mode, preset and shard; rows rebuild the same games")
+
+
+if __name__ == "__main__":
+    test_build()
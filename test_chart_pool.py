@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the pre-generated chart pool
+
+import os
+import sys
+import time
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from chart_pool import ChartPool, generate_game
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_inline_then_refill():
+    pool = ChartPool(size=4, low_water=2)
+    chart, relationships = pool.get(False, {})
+    assert len(chart['gans']) == 4 and isinstance(relationships, list)
+    wait_for(lambda: pool.stats()['ready'].get('basic:{}'.format(ChartPool.key(False, {})[1])) == 4)
+    stats = pool.stats()
+    assert stats['misses'] == 1 and stats['hits'] == 0 and stats['generated'] == 4
+    pool.get(False, {})
+    assert pool.stats()['hits'] == 1
+    pool.close()
+    print("✅ first request inline, then served from the pool:", pool.stats())
+
+
+def test_keys_by_mode_and_settings():
+    pool = ChartPool(size=2, low_water=1)
+    pool.fill(True, {'地支相刑': False})
+    pool.fill(False, {})
+    chart, relationships = pool.get(True, {'地支相刑': False})
+    assert chart['advanced_mode'] and len(chart['gans']) == 6
+    assert not any(item['type'] == '地支相刑' for item in relationships)
+    assert len(pool.stats()['ready']) == 2
+    pool.close()
+    print("✅ separate queues per mode and settings mask")
+
+
+def test_take_batch():
+    pool = ChartPool(size=3, low_water=1)
+    pool.fill(False, {})
+    games = pool.take(False, {}, 5)
+    assert len(games) == 5 and all(len(chart['gans']) == 4 for chart, _ in games)
+    stats = pool.stats()
+    assert stats['hits'] == 3 and stats['misses'] == 2
+    key = 'basic:{}'.format(ChartPool.key(False, {})[1])
+    wait_for(lambda: pool.stats()['ready'].get(key) == 3)
+    assert len(pool.take(False, {}, 2)) == 2 and pool.stats()['hits'] == 5
+    pool.close()
+    print("✅ take: ready games first, the rest generated inline, queue refilled")
+
+
+def test_disabled_and_errors():
+    calls = []
+
+    def generate(advanced_mode, settings):
+        calls.append(advanced_mode)
+        return generate_game(advanced_mode, settings)
+
+    pool = ChartPool(size=0, low_water=0, generate=generate)
+    pool.get(False, {})
+    pool.get(False, {})
+    assert calls == [False, False] and pool._worker is None
+
+    def broken(advanced_mode, settings):
+        raise RuntimeError("no charts")
+
+    pool = ChartPool(size=2, low_water=1, generate=broken)
+    pool.fill(False, {}, count=0)
+    try:
+        pool.get(False, {})
+    except RuntimeError:
+        pass
+    wait_for(lambda: pool.stats()['errors'] == 1)
+    pool.close()
+    print("✅ size 0 disables the pool; refill errors are counted")
+
+
+if __name__ == "__main__":
+    test_inline_then_refill()
+    test_keys_by_mode_and_settings()
+    test_take_batch()
+    test_disabled_and_errors()
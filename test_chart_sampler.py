@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the lookup-table chart sampler
+
+import collections
+import os
+import random
+import subprocess
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions')
+sys.path.append(FUNCTIONS)
+
+import chart_sampler
+from chart_sampler import COMBOS, ADVANCED_COMBOS, DAYS, HOURS, get_sampler
+from bazi_utils import generate_random_bazi, calculate_dayun
+from jieqi import four_pillars
+from tables import PILLARS
+
+
+def number_of(draw):
+    """draw 的逆运算。"""
+    day_index = ((draw.year - chart_sampler.START_YEAR) * 12 + draw.month - 1) * 28 + draw.day - 1
+    rest = (draw.dayun_steps - 2) * 5 + draw.current_year - 2020
+    return ((rest * DAYS + day_index) * 2 + draw.is_female) * HOURS + draw.hour
+
+
+def test_matches_calendar():
+    sampler = get_sampler()
+    rng = random.Random(2024)
+    numbers = [rng.randrange(COMBOS) for _ in range(20000)]
+    # 交节的那些天逐时都查一遍
+    for day_index in range(DAYS):
+        if sampler.switch[day_index] != 24:
+            numbers.extend(day_index * HOURS * 2 + hour for hour in range(HOURS))
+    for number in numbers:
+        draw = sampler.draw(number)
+        assert draw.codes == four_pillars(draw.year, draw.month, draw.day, draw.hour), draw
+        assert number_of(draw) == number
+    print("✅ {} sampled hours match jieqi.four_pillars".format(len(numbers)))
+
+
+def test_combinations():
+    sampler = get_sampler()
+    first, last = sampler.draw(0), sampler.draw(ADVANCED_COMBOS - 1)
+    assert (first.year, first.month, first.day, first.hour, first.is_female) == (1950, 1, 1, 0, False)
+    assert (first.dayun_steps, first.current_year) == (2, 2020)
+    assert (last.year, last.month, last.day, last.hour, last.is_female) == (2020, 12, 28, 23, True)
+    assert (last.dayun_steps, last.current_year) == (6, 2024)
+    assert COMBOS == 71 * 12 * 28 * 24 * 2 and ADVANCED_COMBOS == COMBOS * 25
+    for year in range(2020, 2025):
+        assert sampler.draw(COMBOS * (year - 2020)).liunian == four_pillars(year, 1, 1, 0)[0]
+
+    # 各项的边缘分布与逐项 randint 时一样是均匀的
+    rng = random.Random(7)
+    counts = collections.defaultdict(collections.Counter)
+    total = 60000
+    for _ in range(total):
+        draw = sampler.sample(rng, True)
+        for name in ('year', 'month', 'day', 'hour', 'is_female', 'dayun_steps', 'current_year'):
+            counts[name][getattr(draw, name)] += 1
+    for name, counter in counts.items():
+        expected = total / len(counter)
+        assert all(abs(count - expected) < 6 * expected ** 0.5 for count in counter.values()), name
+    assert len(counts['year']) == 71 and len(counts['day']) == 28 and len(counts['hour']) == 24
+    print("✅ one draw covers every combination once, marginals uniform")
+
+
+def test_charts():
+    rng = random.Random(11)
+    for _ in range(3000):
+        chart = generate_random_bazi(True, rng=rng)
+        year, month, day, hour = (int(item) for item in
+                                  chart['date_info'].replace('年', ' ').replace('月', ' ').replace('日', ' ')
+                                  .replace('时', '').split())
+        codes = four_pillars(year, month, day, hour)
+        assert chart['gans'][:4] == [PILLARS[item][0] for item in codes]
+        assert chart['zhis'][:4] == [PILLARS[item][1] for item in codes]
+        assert chart['liunian_gan'] + chart['liunian_zhi'] == PILLARS[four_pillars(chart['current_year'], 1, 1, 0)[0]]
+        # 大运与 calculate_dayun 逐步推算的结果之一相同
+        month_gz = chart['month_gan'] + chart['month_zhi']
+        options = {calculate_dayun(chart['year_gan'], month_gz, chart['is_female'], FixedSteps(steps))
+                   for steps in range(2, 7)}
+        assert (chart['dayun_gan'], chart['dayun_zhi']) in options
+        assert chart['gans'][4:] == [chart['dayun_gan'], chart['liunian_gan']]
+    print("✅ charts agree with the calendar and calculate_dayun")
+
+
+class FixedSteps:
+    def __init__(self, steps):
+        self.steps = steps
+
+    def randint(self, low, high):
+        return self.steps
+
+
+def test_snapshot_current():
+    script = ("import chart_sampler as c; s = c._load(); t = c._from_table(); "
+              "print(s is not None and (s.start, s.switch, s.after) == t and s.liunian == c._liunian(), "
+              "c._load('missing.snap'))")
+    output = subprocess.run([sys.executable, '-c', script], cwd=FUNCTIONS, capture_output=True, text=True,
+                            check=True).stdout.split()
+    assert output == ['True', 'None'], "charts.snap is stale: run python netlify/functions/chart_sampler.py"
+    print("✅ charts.snap matches the jieqi table")
+
+
+if __name__ == "__main__":
+    test_matches_calendar()
+    test_combinations()
+    test_charts()
+    test_snapshot_current()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the Netlify function import path (cold start)
+
+import os
+import subprocess
+import sys
+
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions')
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(FUNCTIONS)
+
+# 导入 new_game 和 check_relationship 的时间上限（毫秒），取三次中最快的一次
+IMPORT_BUDGET_MS = 75
+HEAVY_MODULES = ('bidict', 'datas', 'ganzhi', 'gzcore', 'relation_masks', 'common', 'sqlite3', 'lunar_python')
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import new_game, check_relationship
+elapsed = (time.perf_counter() - start) * 1000
+print(elapsed, ' '.join(name for name in {!r} if name in sys.modules))
+""".format(HEAVY_MODULES)
+
+
+def run_import():
+    output = subprocess.run([sys.executable, '-c', SCRIPT], cwd=FUNCTIONS, capture_output=True, text=True,
+                            check=True).stdout.split()
+    return float(output[0]), output[1:]
+
+
+def test_no_heavy_imports():
+    _, loaded = run_import()
+    assert loaded == [], loaded
+    print("✅ no heavy modules imported at startup")
+
+
+def test_import_budget():
+    elapsed = min(run_import()[0] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_MS, "import took {:.1f} ms".format(elapsed)
+    print("✅ functions import in {:.1f} ms (budget {} ms)".format(elapsed, IMPORT_BUDGET_MS))
+
+
+def test_snapshot_current():
+    # 在函数目录里比对，ganzhi/datas 用 netlify 版
+    script = "import tables; print(tables._load() == tables._from_sources(), tables._load('missing.snap'))"
+    output = subprocess.run([sys.executable, '-c', script], cwd=FUNCTIONS, capture_output=True, text=True,
+                            check=True).stdout.split()
+    assert output[0] == 'True', "tables.snap is out of date, run python netlify/functions/tables.py"
+    assert output[1] == 'None'
+    print("✅ tables.snap matches its sources")
+
+
+if __name__ == "__main__":
+    test_no_heavy_imports()
+    test_import_budget()
+    test_snapshot_current()
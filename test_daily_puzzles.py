@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the daily puzzle generator and endpoint
+
+import datetime
+import json
+import os
+import subprocess
+import sys
+import tempfile
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+FUNCTIONS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions')
+sys.path.append(FUNCTIONS)
+
+import daily
+from daily_puzzles import entry, entry_json, today, seconds_left, write_days
+from relation_index import check_selection
+
+
+def test_same_everywhere():
+    date = datetime.date(2026, 10, 18)
+    first = entry_json(date)
+    assert entry_json(date) == first
+    data = json.loads(first)
+    assert data['date'] == '2026-10-18' and data['basic']['chart']['daily'] == '2026-10-18'
+    assert len(data['basic']['chart']['gans']) == 4 and len(data['advanced']['chart']['gans']) == 6
+    assert entry_json(date + datetime.timedelta(days=1)) != first
+    script = "import datetime, daily_puzzles; print(daily_puzzles.entry_json(datetime.date(2026, 10, 18)))"
+    output = subprocess.run([sys.executable, '-c', script], cwd=FUNCTIONS, capture_output=True, text=True,
+                            check=True, env=dict(os.environ, PYTHONHASHSEED='1')).stdout.strip()
+    assert output == first
+    print("✅ a day's puzzle is the same in every process")
+
+
+def test_day_boundary():
+    # 北京时间零点换题
+    assert today(datetime.datetime(2026, 10, 17, 15, 59, 59)) == datetime.date(2026, 10, 17)
+    assert seconds_left(datetime.datetime(2026, 10, 17, 15, 59, 59)) == 1
+    assert today(datetime.datetime(2026, 10, 17, 16, 0, 0)) == datetime.date(2026, 10, 18)
+    assert seconds_left(datetime.datetime(2026, 10, 17, 16, 0, 0)) == 86400
+    print("✅ days change at midnight UTC+8")
+
+
+def test_write_days():
+    start = datetime.date(2026, 12, 30)
+    with tempfile.TemporaryDirectory() as publish_dir:
+        directory = write_days(start, 4, publish_dir)
+        names = sorted(os.listdir(directory))
+        assert names == ['2026-12-30.json', '2026-12-31.json', '2027-01-01.json', '2027-01-02.json']
+        with open(os.path.join(directory, names[2]), encoding='utf-8') as f:
+            assert f.read() == entry_json(datetime.date(2027, 1, 1))
+    print("✅ static files written for each day")
+
+
+def test_playable():
+    data = entry(datetime.date(2026, 10, 18))
+    for mode, game in data.items():
+        if mode == 'date':
+            continue
+        chart = game['chart']
+        num_pillars = 6 if chart['advanced_mode'] else 4
+        for rel in game['all_relationships']:
+            offset = num_pillars if rel['type'].startswith('地支') else 0
+            result = check_selection(chart, [item + offset for item in rel['positions']], game['all_relationships'], [])
+            assert result['found'], rel
+    print("✅ every daily relationship can be found")
+
+
+def test_handler():
+    now = datetime.datetime(2026, 10, 17, 20, 0, 0)
+    status, headers, body = daily.daily_response({}, now)
+    assert status == 200 and json.loads(body)['date'] == '2026-10-18'
+    assert headers['Cache-Control'] == 'public, max-age={}'.format(20 * 3600)
+    status, headers, body = daily.daily_response({'date': '2025-01-01'}, now)
+    assert status == 200 and 'immutable' in headers['Cache-Control']
+    assert body == entry_json(datetime.date(2025, 1, 1))
+    assert daily.daily_response({'date': '2025-13-01'})[0] == 400
+    response = daily.handler({'httpMethod': 'GET', 'queryStringParameters': {'date': '2025-01-01'}}, None)
+    assert response['statusCode'] == 200 and response['body'] == body
+    assert response['headers']['Content-Type'] == 'application/json'
+    print("✅ daily endpoint: today's entry until midnight, dated entries cached for good")
+
+
+if __name__ == "__main__":
+    test_same_everywhere()
+    test_day_boundary()
+    test_write_days()
+    test_playable()
+    test_handler()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the memoized relationship detection
+
+import json
+import os
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from bazi_utils import detect_all_relationships, detect_relationships, detection_stats
+
+CHART = {'gans': ['甲', '庚', '庚', '己'], 'zhis': ['子', '午', '寅', '申'], 'advanced_mode': False}
+
+
+def test_cache_hits():
+    detect_relationships.cache_clear()
+    first = detect_all_relationships(CHART, {})
+    # 设置写法不同但掩码相同，也命中缓存
+    second = detect_all_relationships(dict(CHART, year_gan='甲'), {'地支相冲': True})
+    assert first is second
+    stats = detection_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+    other = detect_all_relationships(CHART, {'天干相冲': False})
+    assert other is not first and not any(item['type'] == '天干相冲' for item in other)
+    print("✅ cache keyed on pillars and settings mask:", detection_stats())
+
+
+def test_read_only():
+    relationships = detect_all_relationships(CHART, {})
+    for change in (lambda: relationships.append({}),
+                   lambda: relationships[0].update(points=0),
+                   lambda: relationships[0]['positions'].append(3)):
+        try:
+            change()
+        except TypeError:
+            continue
+        raise AssertionError("cached result was changed")
+    copy = relationships[0].copy()
+    copy['actual_positions'] = [0, 1]
+    assert 'actual_positions' not in relationships[0]
+    print("✅ cached relationships are read-only")
+
+
+def test_plain_values():
+    relationships = detect_all_relationships(CHART, {})
+    assert relationships[0]['positions'] == [0, 1] and isinstance(relationships, list)
+    assert json.loads(json.dumps(relationships, ensure_ascii=False)) == relationships
+    print("✅ results compare and serialize like lists of dicts")
+
+
+if __name__ == "__main__":
+    test_cache_hits()
+    test_read_only()
+    test_plain_values()
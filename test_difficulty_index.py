@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the difficulty index
+
+import json
+import os
+import random
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+import difficulty_index
+import new_game
+from bazi_utils import detect_all_relationships, generate_random_bazi
+from difficulty_index import DIFFICULTIES, MODES, Query, corpus_seed, get_index, parse_query
+from new_game import DEFAULT_SETTINGS
+
+
+def call(body):
+    response = new_game.handler({'httpMethod': 'POST', 'body': json.dumps(body, ensure_ascii=False)}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+def test_snapshot_current():
+    index = difficulty_index._load()
+    assert index is not None, "difficulty.snap 过期，请运行 python netlify/functions/difficulty_index.py"
+    assert index.size == difficulty_index.CORPUS_SIZE
+    # 抽查快照中的命盘与现算一致
+    for mode, advanced_mode in MODES.items():
+        relationships, scores, _ = index.totals(mode, difficulty_index.settings_mask(DEFAULT_SETTINGS)
+                                                & difficulty_index.DETECTED_BITS)
+        for number in random.Random(mode).sample(range(index.size), 50):
+            chart = generate_random_bazi(advanced_mode, seed=corpus_seed(mode, number))
+            rels = detect_all_relationships(chart, DEFAULT_SETTINGS)
+            assert relationships[number] == len(rels) and scores[number] == sum(rel['points'] for rel in rels)
+    print("✅ snapshot is current and matches regenerated charts")
+
+
+def test_levels():
+    index = get_index()
+    for advanced_mode in MODES.values():
+        levels = index.levels(advanced_mode, DEFAULT_SETTINGS)
+        # 按排名切分，相邻两档只在边界上可能有同样的关系数
+        assert levels['easy'][0] == 1 and levels['easy'][1] <= levels['medium'][0] <= levels['medium'][1]
+        assert levels['medium'][1] <= levels['hard'][0] <= levels['hard'][1]
+        # 三档都不空，各占有关系命盘的一部分
+        sizes = [len(index.bucket(advanced_mode, DEFAULT_SETTINGS, Query(level, (), None, None)))
+                 for level in DIFFICULTIES]
+        assert all(size > index.size // 10 for size in sizes), sizes
+    print("✅ easy/medium/hard split the corpus by relationship count")
+
+
+def test_single_type_levels():
+    # 只开一种关系时多数命盘只有一个关系，三档仍然都有命盘
+    index = get_index()
+    for name in ('天干五合', '地支三会方', '地支暗合', '地支相破'):
+        settings = {key: key == name for key in DEFAULT_SETTINGS}
+        sizes = [len(index.bucket(False, settings, Query(level, (), None, None))) for level in DIFFICULTIES]
+        assert all(sizes) and max(sizes) - min(sizes) <= 1, (name, sizes)
+        for level in DIFFICULTIES:
+            status, body = call({'difficulty': level, 'settings': settings})
+            assert status == 200 and body['all_relationships'], (name, level, status)
+    print("✅ every difficulty has charts when only one relationship type is enabled")
+
+
+def test_draw_matches_query():
+    index = get_index()
+    rng = random.Random(7)
+    queries = [Query('hard', (), None, None), Query(None, ('地支三合',), None, None),
+               Query('easy', ('地支三会',), None, None), Query(None, (), (2, 3), (20, None))]
+    for advanced_mode in MODES.values():
+        levels = index.levels(advanced_mode, DEFAULT_SETTINGS)
+        for query in queries:
+            for _ in range(20):
+                chart, rels = difficulty_index.draw_game(advanced_mode, DEFAULT_SETTINGS, query, rng)
+                types = {rel['type'] for rel in rels}
+                low, high = levels[query.difficulty] if query.difficulty else query.relationships or (0, 99)
+                assert low <= len(rels) <= high and set(query.must_include) <= types
+                if query.points:
+                    assert sum(rel['points'] for rel in rels) >= query.points[0]
+                assert chart['advanced_mode'] == advanced_mode and 'seed' in chart
+    # 同一条件的编号列表只算一次
+    assert index.bucket(True, DEFAULT_SETTINGS, queries[0]) is index.bucket(True, DEFAULT_SETTINGS, queries[0])
+    print("✅ drawn charts match the difficulty, types and ranges")
+
+
+def test_parse_query():
+    assert parse_query({}) is None and parse_query({'must_include': []}) is None
+    assert parse_query({'must_include': ['地支三会', '天干五合']}) == Query(None, ('天干五合', '地支三会'), None, None)
+    assert parse_query({'difficulty': 'easy', 'points': [None, 30]}) == Query('easy', (), None, (None, 30))
+    for params in ({'difficulty': 'extreme'}, {'must_include': '地支三合'}, {'must_include': ['地支三合局']},
+                   {'relationships': [1]}, {'points': ['a', 2]}, {'relationships': [True, 3]}):
+        try:
+            parse_query(params)
+        except ValueError:
+            continue
+        raise AssertionError(params)
+    print("✅ query parameters are validated")
+
+
+def test_new_game_handler():
+    status, body = call({'difficulty': 'hard', 'must_include': ['地支三合'], 'advanced_mode': True})
+    assert status == 200 and '地支三合' in {rel['type'] for rel in body['all_relationships']}
+    assert len(body['all_relationships']) >= get_index().levels(True, DEFAULT_SETTINGS)['hard'][0]
+
+    status, body = call({'difficulty': 'extreme'})
+    assert status == 400 and 'difficulty' in body['error']
+    # 要求的类型在设置里关掉了
+    status, body = call({'must_include': ['地支三合'], 'settings': {'地支三合局': False}})
+    assert status == 400 and '地支三合' in body['error']
+    status, body = call({'relationships': [50, None]})
+    assert status == 404
+
+    import new_games
+    status, body = new_games.new_games({'count': 3, 'difficulty': 'easy'})
+    easy = get_index().levels(False, DEFAULT_SETTINGS)['easy']
+    assert status == 200 and all(easy[0] <= len(game['all_relationships']) <= easy[1] for game in body['games'])
+    print("✅ new_game and new_games draw from the index")
+
+
+if __name__ == "__main__":
+    test_snapshot_current()
+    test_levels()
+    test_single_type_levels()
+    test_draw_matches_query()
+    test_parse_query()
+    test_new_game_handler()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for server-side game sessions
+
+import json
+import os
+import sys
+import tempfile
+import threading
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from bazi_utils import detect_all_relationships, generate_random_bazi
+from game_sessions import (GameSession, MemoryStore, SQLiteStore, SessionExpired, check_request,
+                           check_session, create_session, parse_token)
+
+CHART = {'gans': ['甲', '庚', '庚', '己'], 'zhis': ['子', '午', '寅', '申'], 'advanced_mode': False}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def new_game(store):
+    relationships = detect_all_relationships(CHART, {})
+    return create_session(CHART, relationships, store), relationships
+
+
+def test_session_flow():
+    store = MemoryStore()
+    token, relationships = new_game(store)
+    status, body = check_request({'session': token, 'positions': [0, 1]}, store)
+    assert status == 200 and body['found'] and body['relationship']['type'] == '天干相冲'
+    status, body = check_request({'session': token, 'positions': [1, 0]}, store)
+    assert status == 200 and not body['found'] and 'already' in body['message']
+    assert len(store.get(token).found_relationships) == 1
+
+    full = json.dumps({'positions': [0, 1], 'chart': CHART, 'all_relationships': relationships,
+                       'found_relationships': store.get(token).found_relationships}, ensure_ascii=False)
+    small = json.dumps({'session': token, 'positions': [0, 1]})
+    assert len(full.encode()) > 10 * len(small.encode())
+    print("✅ session flow, request size {} -> {} bytes".format(len(full.encode()), len(small.encode())))
+
+
+def test_expired_and_fallback():
+    clock = Clock()
+    store = MemoryStore(ttl=60, clock=clock)
+    token, relationships = new_game(store)
+    clock.now += 61
+    status, body = check_request({'session': token, 'positions': [0, 1]}, store)
+    assert status == 410 and body['expired']
+    # 带上完整状态时按无状态方式处理
+    status, body = check_request({'session': token, 'positions': [0, 1], 'chart': CHART,
+                                  'all_relationships': relationships, 'found_relationships': []}, store)
+    assert status == 200 and body['found']
+    status, body = check_request({'positions': [0, 1]}, store)
+    assert status == 400
+    print("✅ expired session answers 410, full state still accepted")
+
+
+def test_lru_bound():
+    clock = Clock()
+    store = MemoryStore(max_sessions=3, clock=clock)
+    tokens = [new_game(store)[0] for _ in range(3)]
+    store.get(tokens[0])                  # 最近用过，不会被挤出
+    new_game(store)
+    assert len(store) == 3
+    store.get(tokens[0])
+    try:
+        store.get(tokens[1])
+    except SessionExpired:
+        print("✅ least recently used session evicted")
+    else:
+        raise AssertionError("session should have been evicted")
+
+
+def test_sqlite_store():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'sessions.db')
+        store = SQLiteStore(path)
+        token, _ = new_game(store)
+        status, body = check_request({'session': token, 'positions': [1, 0]}, store)
+        assert status == 200 and body['found']
+        store.close()
+
+        # 重新打开后会话和已找到的关系都还在
+        store = SQLiteStore(path)
+        session = store.get(token)
+        assert isinstance(session, GameSession) and len(session.found_relationships) == 1
+        status, body = check_request({'session': token, 'positions': [0, 1]}, store)
+        assert not body['found'] and 'already' in body['message']
+        store.close()
+    print("✅ sqlite store survives reopening")
+
+
+def seeded_game(seed=11):
+    settings = {'地支暗合': False}
+    chart = generate_random_bazi(True, seed=seed)
+    relationships = detect_all_relationships(chart, settings)
+    while len(relationships) < 2:
+        seed += 1
+        chart = generate_random_bazi(True, seed=seed)
+        relationships = detect_all_relationships(chart, settings)
+    return chart, relationships, settings
+
+
+def positions_of(chart, rel):
+    offset = 0 if rel['type'].startswith('天干') else 6
+    return [pos + offset for pos in rel['positions']]
+
+
+def test_token_across_instances():
+    # new_game 和 check_relationship 是不同的函数，互不共享内存
+    chart, relationships, settings = seeded_game()
+    token = create_session(chart, relationships, MemoryStore(), settings)
+    assert parse_token(token)[:2] == (chart['seed'], True)
+    first, second = (positions_of(chart, rel) for rel in relationships[:2])
+
+    status, body = check_request({'session': token, 'positions': first}, MemoryStore())
+    assert status == 200 and body['found'] and body['relationship']['type'] == relationships[0]['type']
+    # 另一个实例：带上已找到的位置，同一选择不能再得分
+    other = MemoryStore()
+    status, body = check_request({'session': token, 'positions': first, 'found_positions': [first]}, other)
+    assert status == 200 and not body['found']
+    status, body = check_request({'session': token, 'positions': second, 'found_positions': [first]}, other)
+    assert status == 200 and body['found'] and len(other.get(token).found_relationships) == 2
+
+    size = len(json.dumps({'session': token, 'positions': second, 'found_positions': [first]}).encode())
+    assert size < 120, size
+    # 签名不符或不是令牌时按过期处理，前端改发完整状态
+    for bad in (token[:-2] + 'xx', token.replace('.1.', '.0.', 1), 'nonsense'):
+        status, body = check_request({'session': bad, 'positions': first}, MemoryStore())
+        assert status == 410 and body['expired'], bad
+    assert create_session(chart, relationships, MemoryStore(), settings) != token
+    print("✅ game token resolves on another instance, {} bytes per click".format(size))
+
+
+def test_concurrent_clicks():
+    chart, relationships, settings = seeded_game(23)
+    token = create_session(chart, relationships, settings=settings)
+    positions = positions_of(chart, relationships[0])
+    store, results, start = MemoryStore(), [], threading.Barrier(8)
+
+    def click():
+        start.wait()
+        results.append(check_session(token, positions, store)['found'])
+
+    threads = [threading.Thread(target=click) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1 and len(store.get(token).found_relationships) == 1
+
+    # 锁只按令牌：一局的检查进行中，另一局照样能检查
+    other, _ = new_game(store)
+    done = threading.Event()
+    with store.token_locks.hold(token):
+        thread = threading.Thread(target=lambda: (check_session(other, [0, 1], store), done.set()))
+        thread.start()
+        assert done.wait(5)
+    thread.join()
+    assert len(store.token_locks) == 0
+    print("✅ concurrent clicks score a relationship once, other games are not blocked")
+
+
+def test_signing_secret():
+    import game_sessions
+    saved = game_sessions._secret, game_sessions.SECRET_PATH, dict(os.environ)
+    try:
+        game_sessions.SECRET_PATH = os.path.join(tempfile.mkdtemp(), 'session.key')
+        os.environ.pop('BAZI_SESSION_SECRET', None)
+        # 部署的函数既没有环境变量也没有 session.key：拒绝签发，而不是用公开的默认值
+        os.environ['AWS_LAMBDA_FUNCTION_NAME'] = 'new_game'
+        game_sessions._secret = None
+        try:
+            game_sessions.game_token(1, False, 1)
+            raise AssertionError('signed without a secret')
+        except RuntimeError:
+            pass
+        # 构建时写入的 session.key
+        with open(game_sessions.SECRET_PATH, 'w') as f:
+            f.write('deploy-key\n')
+        game_sessions._secret = None
+        token = game_sessions.game_token(1, False, 1, nonce='n')
+        assert parse_token(token) == (1, False, 1)
+        # 环境变量优先，另一把密钥签的令牌不认
+        os.environ['BAZI_SESSION_SECRET'] = 'site-secret'
+        game_sessions._secret = None
+        assert game_sessions.game_token(1, False, 1, nonce='n') != token
+        try:
+            parse_token(token)
+            raise AssertionError('token from another key accepted')
+        except SessionExpired:
+            pass
+    finally:
+        game_sessions._secret, game_sessions.SECRET_PATH = saved[:2]
+        os.environ.clear()
+        os.environ.update(saved[2])
+    print("✅ tokens are signed with the deploy secret, never a built-in one")
+
+
+if __name__ == "__main__":
+    test_session_flow()
+    test_expired_and_fallback()
+    test_lru_bound()
+    test_sqlite_store()
+    test_token_across_instances()
+    test_concurrent_clicks()
+    test_signing_secret()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the integer-coded ganzhi core
+
+import sys
+sys.path.append('.')
+
+from ganzhi import Gan, Zhi, ten_deities, zhi5, zhi_atts, ganzhi60
+from datas import nayins, empties
+from gzcore import *
+
+
+def test_pillar_codes():
+    """甲子=0 ... 癸亥=59，与 ganzhi60（从 1 开始）一致"""
+    assert PILLARS[0] == '甲子' and PILLARS[59] == '癸亥'
+    for seq, item in enumerate(PILLARS):
+        assert ganzhi60[seq + 1] == item
+        assert pillar_code(GAN_INDEX[item[0]], ZHI_INDEX[item[1]]) == seq
+    assert decode(*encode("庚辛壬甲", "午巳午辰")) == (list("庚辛壬甲"), list("午巳午辰"))
+    print("✅ pillar codes")
+
+
+def test_tables_match_dicts():
+    for me in Gan:
+        for item in Gan:
+            assert TEN_GODS[GAN_INDEX[me] * 10 + GAN_INDEX[item]] == ten_deities[me][item]
+        for item in Zhi:
+            assert LIFE_STAGES[GAN_INDEX[me] * 12 + ZHI_INDEX[item]] == ten_deities[me][item]
+    for item in Zhi:
+        code = ZHI_INDEX[item]
+        assert [Gan[gan] for gan in HIDDEN_STEMS[code]] == list(zhi5[item])
+        assert list(HIDDEN_WEIGHTS[code]) == list(zhi5[item].values())
+        assert ZHI_CHONG[code] == ZHI_INDEX[zhi_atts[item]['冲']]
+    print("✅ tables match ten_deities / zhi5 / zhi_atts")
+
+
+def test_nayin_and_kongwang():
+    for seq, item in enumerate(PILLARS):
+        assert NAYIN[seq] == nayins[(item[0], item[1])]
+        assert tuple(Zhi[zhi] for zhi in KONGWANG[seq]) == empties[(item[0], item[1])]
+    print("✅ nayin and kongwang")
+
+
+if __name__ == "__main__":
+    test_pillar_codes()
+    test_tables_match_dicts()
+    test_nayin_and_kongwang()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the solar-term table and arithmetic four pillars
+
+import datetime
+import sys
+sys.path.append('.')
+
+from lunar_python import Solar
+
+from gzcore import PILLARS
+from jieqi import check, four_pillars, get_table
+
+
+def lunar_pillars(year, month, day, hour, minute=0, second=0):
+    ba = Solar.fromYmdHms(year, month, day, hour, minute, second).getLunar().getEightChar()
+    return [ba.getYear(), ba.getMonth(), ba.getDay(), ba.getTime()]
+
+
+def test_known_chart():
+    assert [PILLARS[item] for item in four_pillars(1990, 5, 17, 8)] == ['庚午', '辛巳', '壬午', '甲辰']
+    print("✅ 1990-05-17 08:00 庚午 辛巳 壬午 甲辰")
+
+
+def test_boundaries():
+    """交节前一秒和交节时刻，以及 23 点晚子时"""
+    table = get_table()
+    moments = []
+    for index in range(3 + 24 * (2024 - 1600), 3 + 24 * (2025 - 1600), 2):
+        name, dt = table.term(index)
+        moments.append((dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second))
+        before = dt - datetime.timedelta(seconds=1)
+        moments.append((before.year, before.month, before.day, before.hour, before.minute, before.second))
+    moments += [(2023, 12, 31, 23, 30), (1600, 1, 1, 0), (2400, 12, 31, 23, 59, 59)]
+    for args in moments:
+        assert [PILLARS[item] for item in four_pillars(*args)] == lunar_pillars(*args), args
+    print("✅ {} boundary moments match lunar_python".format(len(moments)))
+
+
+def test_random_moments():
+    count, mismatches = check(300, seed=1, boundaries=False)
+    assert not mismatches, mismatches[:3]
+    print("✅ {} moments match lunar_python".format(count))
+
+
+def test_out_of_range():
+    try:
+        four_pillars(1599, 12, 31, 12)
+    except ValueError:
+        print("✅ out of range rejected")
+    else:
+        raise AssertionError("1599 is outside the table")
+
+
+if __name__ == "__main__":
+    test_known_chart()
+    test_boundaries()
+    test_random_moments()
+    test_out_of_range()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the batch new-game endpoint
+
+import json
+import os
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+import new_games
+from game_sessions import check_session
+
+
+def call(body):
+    response = new_games.handler({'httpMethod': 'POST', 'body': json.dumps(body, ensure_ascii=False)}, None)
+    return response['statusCode'], json.loads(response['body'])
+
+
+def test_batch():
+    status, body = call({'count': 4, 'advanced_mode': True, 'settings': {'地支暗合': False}})
+    assert status == 200 and len(body['games']) == 4
+    assert len({game['session'] for game in body['games']}) == 4
+    for game in body['games']:
+        assert game['chart']['advanced_mode'] and len(game['chart']['zhis']) == 6
+        assert not any(rel['type'] == '地支暗合' for rel in game['all_relationships'])
+    status, body = call({})
+    assert status == 200 and len(body['games']) == new_games.DEFAULT_COUNT
+    assert all(len(game['chart']['gans']) == 4 for game in body['games'])
+    print("✅ count games per request, each with its own session")
+
+
+def test_sessions_work():
+    status, body = call({'count': 3})
+    for game in body['games']:
+        if not game['all_relationships']:
+            continue
+        rel = game['all_relationships'][0]
+        offset = 4 if rel['type'].startswith('地支') else 0
+        positions = [item + offset for item in rel['positions']]
+        assert check_session(game['session'], positions)['found']
+        assert not check_session(game['session'], positions)['found']
+    print("✅ prefetched games can be played through their sessions")
+
+
+def test_bad_count():
+    for count in (0, new_games.MAX_COUNT + 1, '3', True, 2.5):
+        status, body = call({'count': count})
+        assert status == 400 and 'count' in body['error'], count
+    response = new_games.handler({'httpMethod': 'OPTIONS'}, None)
+    assert response['statusCode'] == 200
+    print("✅ count outside 1..{} answers 400".format(new_games.MAX_COUNT))
+
+
+if __name__ == "__main__":
+    test_batch()
+    test_sessions_work()
+    test_bad_count()
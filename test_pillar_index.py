@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the reverse pillar index used by bazi.py -b
+
+import datetime
+import os
+import random
+import sys
+import tempfile
+sys.path.append('.')
+
+import jieqi
+from pillar_index import PillarIndex, build_index
+
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        path = os.path.join(tempfile.mkdtemp(), 'pillars.idx')
+        build_index(path)
+        _index = PillarIndex(path)
+    return _index
+
+
+def test_lookup_matches_sxtwl():
+    """与 sxtwl.siZhu2Year 在 1850-2030 年的结果一致"""
+    windows = get_index().lookup('庚午', '辛巳', '壬午', '甲辰', 1850, 2030)
+    assert [start for start, _ in windows] == [datetime.datetime(1930, 6, 1, 7), datetime.datetime(1990, 5, 17, 7)]
+    assert windows[1][1] == datetime.datetime(1990, 5, 17, 9)
+    print("✅ 庚午 辛巳 壬午 甲辰:", [str(start) for start, _ in windows])
+
+
+def test_random_moments():
+    """任意时刻都落在按它的四柱查出的某个时间段里"""
+    index = get_index()
+    table = jieqi.get_table()
+    rng = random.Random(5)
+    for _ in range(300):
+        dt = jieqi._from_seconds(rng.randrange(table.lower, table.upper))
+        codes = jieqi.four_pillars(dt.year, dt.month, dt.day, dt.hour, dt.minute, dt.second)
+        windows = index.lookup(*codes)
+        assert any(start <= dt < end for start, end in windows), dt
+        assert any(start <= dt < end for start, end in index.lookup(codes[0], '*', codes[2], None))
+    print("✅ random moments found")
+
+
+def test_late_zi_hour():
+    """晚子时（23 点）日柱不变，时干用次日日干"""
+    windows = get_index().lookup('癸卯', '甲子', '癸亥', '甲子', 2023, 2023)
+    assert windows == [(datetime.datetime(2023, 12, 31, 23), datetime.datetime(2024, 1, 1))]
+    print("✅ late zi hour")
+
+
+if __name__ == "__main__":
+    test_lookup_matches_sxtwl()
+    test_random_moments()
+    test_late_zi_hour()
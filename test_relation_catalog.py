@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the relationship catalog and compact payloads
+
+import json
+import os
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+import catalog
+import new_game
+from bazi_utils import generate_random_bazi, detect_all_relationships
+from game_sessions import MemoryStore, check_request, create_session
+from relation_catalog import VERSION, ENTRIES, compact, expand, compact_game, CatalogMismatch
+
+ALL = {name: True for name in new_game.DEFAULT_SETTINGS}
+
+
+def position_of(chart, rel):
+    offset = (6 if chart['advanced_mode'] else 4) if rel['type'].startswith('地支') else 0
+    return [item + offset for item in rel['positions']]
+
+
+def test_round_trip():
+    full = compact_size = 0
+    for seq in range(2000):
+        chart = generate_random_bazi(seq % 2 == 1)
+        relationships = detect_all_relationships(chart, ALL)
+        items = compact(relationships)
+        assert expand(chart, items) == relationships
+        full += len(json.dumps(relationships, ensure_ascii=False).encode('utf-8'))
+        compact_size += len(json.dumps(items).encode('utf-8'))
+    assert compact_size * 3 < full
+    found = dict(relationships[0], actual_positions=[0, 1]) if relationships else None
+    if found:
+        assert expand(chart, compact([found])) == [found]
+    try:
+        expand(chart, items, 'old')
+        raise AssertionError("version not checked")
+    except CatalogMismatch:
+        pass
+    print("✅ compact/expand round trip; relationships {} -> {} bytes".format(full, compact_size))
+
+
+def test_check_compact():
+    store = MemoryStore()
+    chart = generate_random_bazi(False)
+    relationships = detect_all_relationships(chart, ALL)
+    while not relationships:
+        chart = generate_random_bazi(False)
+        relationships = detect_all_relationships(chart, ALL)
+    positions = position_of(chart, relationships[0])
+
+    token = create_session(chart, relationships, store)
+    status, body = check_request({'session': token, 'positions': positions, 'compact': True}, store)
+    assert status == 200 and body['found'] and body['catalog'] == VERSION
+    assert expand(chart, [body['relationship']])[0]['actual_positions'] == sorted(positions)
+    status, body = check_request({'session': token, 'positions': positions, 'compact': True}, store)
+    assert status == 200 and not body['found'] and body['message']
+
+    # 会话过期后，用紧凑格式发送完整状态
+    game = compact_game(chart, relationships)
+    request = {'compact': True, 'catalog': game['catalog'], 'chart': chart, 'positions': positions,
+               'relationships': game['relationships'], 'found': []}
+    status, body = check_request(request, store)
+    assert status == 200 and body['found']
+    status, body = check_request(dict(request, found=[body['relationship']]), store)
+    assert status == 200 and not body['found']
+    status, body = check_request(dict(request, catalog='old'), store)
+    assert status == 409 and body['catalog'] == VERSION
+    print("✅ check_relationship in compact form, with and without a session")
+
+
+def test_handlers():
+    response = new_game.handler({'httpMethod': 'POST', 'body': json.dumps({'compact': True})}, None)
+    body = json.loads(response['body'])
+    assert response['statusCode'] == 200 and body['catalog'] == VERSION and 'all_relationships' not in body
+    assert all(0 <= item[0] < len(ENTRIES) for item in body['relationships'])
+
+    response = catalog.handler({'httpMethod': 'GET'}, None)
+    assert response['statusCode'] == 200 and response['headers']['ETag'] == catalog.ETAG
+    assert json.loads(response['body']) == {'version': VERSION, 'entries': ENTRIES}
+    assert 'immutable' not in response['headers']['Cache-Control']
+    response = catalog.handler({'httpMethod': 'GET', 'queryStringParameters': {'v': VERSION}}, None)
+    assert 'immutable' in response['headers']['Cache-Control']
+    response = catalog.handler({'httpMethod': 'GET', 'headers': {'If-None-Match': catalog.ETAG}}, None)
+    assert response['statusCode'] == 304 and response['body'] == ''
+    print("✅ new_game compact mode; catalog with {} entries, version {}".format(len(ENTRIES), VERSION))
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_check_compact()
+    test_handlers()
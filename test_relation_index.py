@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the hash-indexed check_relationship matching
+
+import itertools
+import os
+import random
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from ganzhi import Gan, Zhi
+from bazi_utils import detect_all_relationships
+from relation_index import RelationshipIndex, check_selection, chars_key
+
+
+def scan(chart, positions, all_relationships, found_relationships):
+    """原来 check_relationship 的逐条扫描"""
+    sorted_positions = sorted(positions)
+    for rel in found_relationships:
+        if sorted(rel.get('actual_positions', [])) == sorted_positions:
+            return {'found': False, 'message': 'This relationship has already been found.'}
+    num_pillars = 6 if chart.get('advanced_mode') else 4
+    for rel in all_relationships:
+        selected = [chart['zhis'][pos - num_pillars] if pos >= num_pillars else chart['gans'][pos]
+                    for pos in sorted_positions]
+        if sorted(rel['characters']) == sorted(selected):
+            if not any(item['type'] == rel['type'] and
+                       sorted(item.get('actual_positions', item['positions'])) == sorted_positions
+                       for item in found_relationships):
+                response_rel = rel.copy()
+                response_rel['actual_positions'] = sorted_positions
+                return {'found': True, 'relationship': response_rel}
+    return {'found': False, 'message': 'No valid relationship found for the selection.'}
+
+
+def test_duplicate_chars():
+    """甲庚庚：[0, 1] 和 [0, 2] 是两个关系"""
+    chart = {'gans': ['甲', '庚', '庚', '丁'], 'zhis': ['子', '丑', '寅', '卯'], 'advanced_mode': False}
+    relationships = detect_all_relationships(chart, {})
+    first = check_selection(chart, [1, 0], relationships, [])
+    assert first['found'] and first['relationship']['actual_positions'] == [0, 1]
+    again = check_selection(chart, [0, 1], relationships, [first['relationship']])
+    assert not again['found'] and 'already' in again['message']
+    second = check_selection(chart, [0, 2], relationships, [first['relationship']])
+    assert second['found'] and second['relationship']['type'] == '天干相冲'
+    print("✅ duplicate characters match at each position set")
+
+
+def test_index_keys():
+    index = RelationshipIndex([{'characters': ['巳', '寅'], 'type': '地支相刑', 'positions': [4, 6]}])
+    assert list(index.by_chars) == [chars_key('寅巳')]
+    print("✅ index keyed by sorted characters")
+
+
+def test_against_scan():
+    rng = random.Random(11)
+    for _ in range(300):
+        advanced = rng.random() < 0.5
+        num_pillars = 6 if advanced else 4
+        chart = {'gans': [rng.choice(Gan[:4]) for _ in range(num_pillars)],
+                 'zhis': [rng.choice(Zhi[:6]) for _ in range(num_pillars)], 'advanced_mode': advanced}
+        relationships = detect_all_relationships(chart, {})
+        found = []
+        selections = [list(item) for size in (2, 3) for item in itertools.combinations(range(2 * num_pillars), size)]
+        rng.shuffle(selections)
+        for positions in selections[:40]:
+            expected = scan(chart, positions, relationships, found)
+            got = check_selection(chart, positions, relationships, found)
+            assert got == expected, (chart, positions)
+            if got['found']:
+                found.append(got['relationship'])
+    print("✅ indexed matching equals the old scan on 300 charts")
+
+
+if __name__ == "__main__":
+    test_duplicate_chars()
+    test_index_keys()
+    test_against_scan()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the bitmask relationship tables used by the game
+
+import os
+import sys
+# 放在最后：ganzhi/datas/gzcore 用顶层的完整版，和其它测试共用同一份模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from relation_masks import *
+from bazi_utils import detect_all_relationships
+
+ZI, CHOU, YIN, SI, WU, SHEN, XU = 0, 1, 2, 5, 6, 8, 10
+
+
+def test_settings_mask():
+    assert settings_mask({}) == ALL_BITS
+    mask = settings_mask({'地支相刑': False, '地支相害': False, '地支相破': False})
+    assert mask & ZHI_XIANGCHONG and not mask & (ZHI_XIANGXING | ZHI_XIANGHAI | ZHI_XIANGPO)
+    print("✅ settings mask")
+
+
+def test_matrix_cells():
+    assert GAN_MATRIX[0 * 10 + 5] == GAN_WUHE           # 甲己
+    assert GAN_MATRIX[0 * 10 + 6] == GAN_XIANGCHONG     # 甲庚
+    assert ZHI_MATRIX[ZI * 12 + WU] == ZHI_XIANGCHONG
+    assert ZHI_MATRIX[ZI * 12 + CHOU] & (ZHI_LIUHE_BIT | ZHI_SANHUI) == ZHI_LIUHE_BIT | ZHI_SANHUI
+    assert ZHI_MATRIX[ZI * 12 + SHEN] & ZHI_SANHE
+    # 寅刑巳：相刑不分先后，都来自 zhi_xings
+    assert ZHI_MATRIX[YIN * 12 + SI] & ZHI_XIANGXING and ZHI_MATRIX[SI * 12 + YIN] & ZHI_XIANGXING
+    assert [item[1] for item in ZHI_RECORDS[YIN * 12 + SI]] == ['地支相刑', '地支相害']
+    assert ZHI_RECORDS[SI * 12 + YIN][0][3] == '巳寅相刑，无恩之刑'
+    # 自刑只有辰午酉亥；暗合来自 zhi_atts 的 '暗'
+    assert [item[1] for item in ZHI_RECORDS[WU * 12 + WU]] == ['地支自刑']
+    assert not ZHI_RECORDS[ZI * 12 + ZI]
+    assert ZHI_MATRIX[CHOU * 12 + YIN] & ZHI_ANHE and ZHI_MATRIX[YIN * 12 + CHOU] & ZHI_ANHE
+    print("✅ matrix cells")
+
+
+def test_detect_with_masks():
+    chart = {'gans': ['甲', '己', '庚', '甲', '丙', '辛'], 'zhis': ['子', '申', '辰', '午', '寅', '戌'],
+             'advanced_mode': True}
+    types = [item['type'] for item in detect_all_relationships(chart, {})]
+    assert types.count('天干五合') == 3 and types.count('天干相冲') == 2
+    assert '地支三合' in types and types.index('地支三合') > types.index('地支相冲')
+
+    found = detect_all_relationships(dict(chart, advanced_mode=False), {'天干五合': False, '地支三合局': False})
+    assert all(item['type'] not in ('天干五合', '地支三合', '地支半合') for item in found)
+    assert all(max(item['positions']) < 4 for item in found)
+    assert [item['points'] for item in found if item['type'] == '地支相冲'] == [10]
+    print("✅ detect_all_relationships on masks")
+
+
+def test_sanxing_and_anhe():
+    chart = {'gans': ['甲', '乙', '丙', '丁'], 'zhis': ['申', '寅', '午', '巳'], 'advanced_mode': False}
+    found = detect_all_relationships(chart, {})
+    sanxing = [item for item in found if item['type'] == '地支三刑']
+    assert len(sanxing) == 1 and sanxing[0]['positions'] == [0, 1, 3] and sanxing[0]['points'] == 25
+    assert sanxing[0]['characters'] == ['寅', '巳', '申'] and '无恩之刑' in sanxing[0]['description']
+    assert [item['positions'] for item in found if item['type'] == '地支相刑'] == [[0, 1], [0, 3], [1, 3]]
+    assert [item['positions'] for item in found if item['type'] == '地支自刑'] == []
+
+    # 丑戌未 三个都在才算三刑；相刑关掉时三刑一起关掉
+    chart['zhis'] = ['丑', '戌', '午', '午']
+    found = detect_all_relationships(chart, {})
+    assert '地支三刑' not in {item['type'] for item in found}
+    assert [item['description'] for item in found if item['type'] == '地支自刑'] == ['午午自刑']
+    chart['zhis'][3] = '未'
+    assert '地支三刑' in {item['type'] for item in detect_all_relationships(chart, {})}
+    assert not any('刑' in item['type'] for item in detect_all_relationships(chart, {'地支相刑': False}))
+
+    chart['zhis'] = ['卯', '子', '申', '亥']
+    found = detect_all_relationships(chart, {})
+    assert [item['description'] for item in found if item['type'] == '地支暗合'] == ['卯申暗合']
+    assert not any(item['type'] == '地支暗合' for item in detect_all_relationships(chart, {'地支暗合': False}))
+    print("✅ 三刑, 自刑 and 暗合")
+
+
+def test_duplicate_branches():
+    # 两个子：申子辰三合有两种位置组合，各算一条；半合同理
+    chart = {'gans': ['甲', '乙', '丙', '丁', '戊', '己'], 'zhis': ['申', '子', '卯', '辰', '子', '巳'],
+             'advanced_mode': True}
+    found = detect_all_relationships(chart, {})
+    sanhe = [item for item in found if item['type'] == '地支三合']
+    assert [item['positions'] for item in sanhe] == [[0, 1, 3], [0, 3, 4]]
+    assert [item['points'] for item in sanhe] == [20, 30]
+    assert all(item['characters'] == ['申', '子', '辰'] for item in sanhe)
+
+    chart['zhis'][3] = '午'
+    halves = [item['positions'] for item in detect_all_relationships(chart, {}) if item['type'] == '地支半合']
+    assert halves == [[0, 1], [0, 4]]
+
+    from relation_index import FoundSet, check_selection
+    all_relationships = detect_all_relationships(dict(chart, zhis=['申', '子', '卯', '辰', '子', '巳']), {})
+    found_set = FoundSet()
+    for positions in ([6, 7, 9], [6, 9, 10]):
+        result = check_selection(dict(chart, zhis=['申', '子', '卯', '辰', '子', '巳']), positions,
+                                 all_relationships, found_set)
+        assert result['found'] and result['relationship']['type'] == '地支三合'
+        found_set.add(result['relationship'])
+    print("✅ every position combination of repeated branches")
+
+
+if __name__ == "__main__":
+    test_settings_mask()
+    test_matrix_cells()
+    test_detect_with_masks()
+    test_sanxing_and_anhe()
+    test_duplicate_branches()
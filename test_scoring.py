@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the memoized five-element scoring
+
+import sys
+sys.path.append('.')
+
+import numpy as np
+
+from gzcore import ELEMENTS, encode
+from scoring import score_arrays, score_signature, signature
+
+
+def test_score_signature():
+    """Values match what `python bazi.py -g 1990 5 17 8` prints"""
+    result = score_signature("庚午辛巳壬午甲辰")
+    assert dict(zip(ELEMENTS, result.elements)) == {"金": 12, "木": 7, "水": 6, "火": 20, "土": 15}
+    assert result.strong == 18 and sum(result.gans) == sum(result.elements)
+    print("✅ score_signature:", result.elements, result.strong)
+
+
+def test_cache_counters():
+    score_signature.cache_clear()
+    score_signature("甲子丙寅戊辰庚午")
+    score_signature("甲子丙寅戊辰庚午")
+    info = score_signature.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    print("✅ cache hits/misses:", info)
+
+
+def test_dayun_liunian():
+    """加上大运、流年后分数增加，月支仍只多算一次"""
+    base = score_signature("庚午辛巳壬午甲辰")
+    more = score_signature("庚午辛巳壬午甲辰" + "癸未" + "甲子")
+    assert sum(more.gans) == sum(base.gans) + 5 + 8 + 5 + 8
+    print("✅ dayun/liunian pillars")
+
+
+def test_score_arrays():
+    charts = ["庚午辛巳壬午甲辰", "甲子丙寅戊辰庚午", "辛酉辛丑辛丑辛卯"]
+    gans, zhis = zip(*(encode(item[0::2], item[1::2]) for item in charts))
+    result = score_arrays(np.array(gans), np.array(zhis))
+    for seq, item in enumerate(charts):
+        expected = score_signature(item)
+        assert tuple(result.elements[seq]) == expected.elements
+        assert tuple(result.gans[seq]) == expected.gans
+        assert result.strong[seq] == expected.strong
+    assert signature("庚辛壬甲", "午巳午辰") == charts[0]
+    print("✅ score_arrays matches score_signature")
+
+
+def test_bad_signature():
+    try:
+        score_signature("庚午辛巳壬午")
+    except ValueError:
+        print("✅ short signature rejected")
+    else:
+        raise AssertionError("three pillars should be rejected")
+
+
+if __name__ == "__main__":
+    test_score_signature()
+    test_cache_counters()
+    test_dayun_liunian()
+    test_score_arrays()
+    test_bad_signature()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the indexed shensha lookup
+
+import random
+import sys
+sys.path.append('.')
+
+from datas import year_shens, month_shens, day_shens, g_shens
+from gzcore import Gan, Zhi, encode
+from shensha import chart_stars, pillar_stars, star_names
+
+
+def scan(gans, zhis, gan, zhi, tables=('year', 'month', 'day', 'me')):
+    """逐表扫描，即 bazi.py 原来的算法"""
+    result = []
+    if 'year' in tables:
+        result += [item for item in year_shens if zhi in year_shens[item][zhis[0]]]
+    if 'month' in tables:
+        result += [item for item in month_shens
+                   if gan in month_shens[item][zhis[1]] or zhi in month_shens[item][zhis[1]]]
+    if 'day' in tables:
+        result += [item for item in day_shens if zhi in day_shens[item][zhis[2]]]
+    if 'me' in tables:
+        result += [item for item in g_shens if zhi in g_shens[item][gans[2]]]
+    return result
+
+
+def test_chart_stars():
+    stars = chart_stars(*encode("庚辛壬甲", "午巳午辰"))
+    assert [[item.name for item in row] for row in stars] == [['月德', '将星'], ['天德', '亡神', '天乙'], [], ['寡宿']]
+    # 巳月天德在辛，由月干带出
+    assert stars[1][0] == ('天德', 'month', True)
+    print("✅ chart_stars: 庚午 辛巳 壬午 甲辰")
+
+
+def test_by_gan():
+    """巳月天德在辛：日干辛带出的天德标为 by_gan"""
+    stars = chart_stars(*encode("甲辛辛甲", "子巳丑子"))
+    assert any(item.name == '天德' and item.by_gan for item in stars[2])
+    print("✅ by_gan marks stars triggered by the stem")
+
+
+def test_against_scan():
+    rng = random.Random(9)
+    positions = ((1, 2, 3), range(4), (0, 1, 3), range(4))
+    for _ in range(5000):
+        gans = [rng.choice(Gan) for _ in range(4)]
+        zhis = [rng.choice(Zhi) for _ in range(4)]
+        for seq, row in enumerate(chart_stars(*encode(gans, zhis))):
+            tables = [name for name, items in zip(('year', 'month', 'day', 'me'), positions) if seq in items]
+            assert [item.name for item in row] == scan(gans, zhis, gans[seq], zhis[seq], tables)
+        gan, zhi = rng.choice(Gan), rng.choice(Zhi)
+        assert star_names(gans, zhis, gan, zhi) == scan(gans, zhis, gan, zhi)
+    print("✅ index matches table scan on 5000 charts")
+
+
+def test_pillar_tables():
+    gan_codes, zhi_codes = encode("庚辛壬甲", "午巳午辰")
+    assert [item.name for item in pillar_stars(zhi_codes, gan_codes[2], 8, 5)] == ['亡神', '天乙']
+    assert [item.name for item in pillar_stars(zhi_codes, gan_codes[2], 8, 5, tables=('me',))] == ['天乙']
+    print("✅ pillar_stars with selected tables")
+
+
+if __name__ == "__main__":
+    test_chart_stars()
+    test_by_gan()
+    test_against_scan()
+    test_pillar_tables()
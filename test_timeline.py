@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the dayun/liunian timeline generator
+
+import sys
+sys.path.append('.')
+
+from lunar_python import Solar
+
+from analyzer import Gans, Zhis
+from timeline import timeline
+
+GANS, ZHIS = Gans(*"庚辛壬甲"), Zhis(*"午巳午辰")
+
+
+def get_yun():
+    return Solar.fromYmdHms(1990, 5, 17, 8, 0, 0).getLunar().getEightChar().getYun(1)
+
+
+def test_full_timeline():
+    rows = list(timeline(get_yun(), GANS, ZHIS))
+    dayuns = [item for item in rows if item.kind == '大运']
+    assert len(dayuns) == 9 and len(rows) == 9 + 90
+    assert [item.gan + item.zhi for item in dayuns[:3]] == ['壬午', '癸未', '甲申']
+    print("✅ full timeline:", len(rows), "rows")
+
+
+def test_year_range():
+    rows = list(timeline(get_yun(), GANS, ZHIS, 2024, 2025))
+    assert [(item.kind, item.year) for item in rows] == [('大运', 2017), ('流年', 2024), ('流年', 2025)]
+    row = rows[1]
+    assert row.gan + row.zhi == '甲辰' and row.fu
+    assert ('合', '申') in row.relations     # 与大运甲申的关系也算在内
+    print("✅ year range 2024-2025:", [item.gan + item.zhi for item in rows])
+
+
+class CountingYun:
+    """记录调用了几次 getLiuNian()"""
+
+    def __init__(self, yun):
+        self.yun = yun
+        self.calls = 0
+
+    def getDaYun(self):
+        outer = self
+
+        class DaYun:
+            def __init__(self, dayun):
+                self.dayun = dayun
+
+            def __getattr__(self, name):
+                return getattr(self.dayun, name)
+
+            def getLiuNian(self):
+                outer.calls += 1
+                return self.dayun.getLiuNian()
+
+        return [DaYun(item) for item in self.yun.getDaYun()]
+
+
+def test_lazy():
+    yun = CountingYun(get_yun())
+    rows = timeline(yun, GANS, ZHIS, 2024, 2024)
+    assert yun.calls == 0
+    assert len(list(rows)) == 2 and yun.calls == 1
+    print("✅ only the dayun covering 2024 expands its liunian")
+
+
+def test_dayun_only():
+    rows = list(timeline(get_yun(), GANS, ZHIS, liunian=False))
+    assert {item.kind for item in rows} == {'大运'} and not any(item.patterns for item in rows)
+    print("✅ dayun rows only")
+
+
+if __name__ == "__main__":
+    test_full_timeline()
+    test_year_range()
+    test_lazy()
+    test_dayun_only()
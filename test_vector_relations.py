@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Test script for the NumPy relationship counts
+
+import random
+import sys
+sys.path.append('.')
+
+import numpy as np
+
+from ganzhi import Gan, Zhi
+from vector_relations import TYPES, detect_arrays, relation_counts
+from bazi_utils import detect_all_relationships
+
+SETTING_KEYS = ('天干五合', '天干相冲', '地支相冲', '地支六合', '地支相刑', '地支三合局',
+                '地支三会方', '地支暗合', '地支相害', '地支相破')
+
+
+def check_against_scalar(num_pillars, settings, rng):
+    gans = np.array([[rng.randrange(10) for _ in range(num_pillars)] for _ in range(300)])
+    zhis = np.array([[rng.randrange(12) for _ in range(num_pillars)] for _ in range(300)])
+    result = detect_arrays(gans, zhis, settings)
+    for seq in range(len(gans)):
+        chart = {'gans': [Gan[item] for item in gans[seq]], 'zhis': [Zhi[item] for item in zhis[seq]],
+                 'advanced_mode': num_pillars == 6}
+        expected = relation_counts(detect_all_relationships(chart, settings))
+        assert (result.counts[seq] == expected).all(), chart
+        assert result.bits[seq] == sum(1 << k for k in range(len(TYPES)) if expected[k])
+
+
+def test_matches_detect_all_relationships():
+    rng = random.Random(7)
+    for num_pillars in (4, 6):
+        check_against_scalar(num_pillars, {}, rng)
+        check_against_scalar(num_pillars, {key: rng.random() < 0.6 for key in SETTING_KEYS}, rng)
+    print("✅ vectorized counts equal scalar detection")
+
+
+def test_disabled_settings():
+    gans, zhis = np.array([[6, 7, 8, 0]]), np.array([[6, 5, 6, 4]])  # 庚午 辛巳 壬午 甲辰
+    counts = detect_arrays(gans, zhis, {'地支相刑': False, '地支三会方': False}).counts[0]
+    assert {TYPES[k]: int(n) for k, n in enumerate(counts) if n} == {'天干相冲': 1}
+    print("✅ settings respected")
+
+
+def test_bad_shape():
+    try:
+        detect_arrays(np.zeros((3, 5)), np.zeros((3, 5)), {})
+    except ValueError:
+        print("✅ bad shape rejected")
+    else:
+        raise AssertionError("5 pillars should be rejected")
+
+
+if __name__ == "__main__":
+    test_matches_detect_all_relationships()
+    test_disabled_settings()
+    test_bad_shape()
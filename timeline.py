@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大运、流年时间线，按需逐行生成。
+
+bazi.py 的大运部分一次算完一生的大运和流年（一百多行）。timeline() 是生成器，
+只对 [start_year, end_year] 内的大运调用 getLiuNian()，每行给出结构化的 Row，
+例如只看今年：
+
+    >>> from lunar_python import Solar
+    >>> from analyzer import Gans, Zhis
+    >>> yun = Solar.fromYmdHms(1990, 5, 17, 8, 0, 0).getLunar().getEightChar().getYun(1)
+    >>> row = list(timeline(yun, Gans(*"庚辛壬甲"), Zhis(*"午巳午辰"), 2024, 2024))[-1]
+    >>> row.kind, row.year, row.gan + row.zhi, row.relations
+    ('流年', 2024, '甲辰', (('刑', '辰'), ('被刑', '辰'), ('合', '申')))
+
+yun 只要有 lunar_python Yun 的 getDaYun()，以及 DaYun、LiuNian 的
+getGanZhi()、getStartYear()/getEndYear()/getStartAge()、getYear()/getAge()。
+"""
+
+import collections
+
+from datas import empties
+from ganzhi import Zhi, zhi5, zhi_atts, gong_he, ten_deities
+from gzcore import PILLAR_INDEX, ZHI_INDEX, NAYIN
+from shensha import star_names
+
+# kind: '大运' 或 '流年'；year、age：大运为起运的年份和岁数
+# hidden: ((藏干, 十神), ...)；he_chong: (('合'或'冲', 天干), ...)
+# relations: ((关系, 地支), ...)，按原局地支、再按 zhi_atts 的关系排列
+# jia: (('夹'或'拱', 地支), ...)；patterns: 天罗地网、四生、四败、四库中成立的
+Row = collections.namedtuple("Row", [
+    "kind", "year", "age", "gan", "zhi", "gan_shen", "zhi_shen", "hidden", "nayin",
+    "fu", "empty", "he_chong", "relations", "jia", "stars", "patterns",
+])
+
+# 流年与原局、大运地支凑齐的组合；四生、四败、四库要求原局已有其中两个
+PATTERNS = (
+    ('天罗地网', '戌亥辰巳'),
+    ('四生', '寅申巳亥'),
+    ('四败', '子午卯酉'),
+    ('四库', '辰戌丑未'),
+)
+
+
+def _he_chong(gan, gans):
+    # 同 common.check_gan
+    result = []
+    if ten_deities[gan]['合'] in gans:
+        result.append(('合', ten_deities[gan]['合']))
+    if ten_deities[gan]['冲'] in gans:
+        result.append(('冲', ten_deities[gan]['冲']))
+    return tuple(result)
+
+
+def _relations(zhi, zhis, skip=()):
+    result = []
+    for item in zhis:
+        for type_, targets in zhi_atts[zhi].items():
+            if type_ not in skip and item in targets and (type_, item) not in result:
+                result.append((type_, item))
+    return tuple(result)
+
+
+def _jia(gan, zhi, gans, zhis, gong=False):
+    result = []
+    for other_gan, other_zhi in zip(gans, zhis):
+        if other_gan != gan:
+            continue
+        distance = abs(ZHI_INDEX[zhi] - ZHI_INDEX[other_zhi])
+        if distance == 2:
+            result.append(('夹', Zhi[(ZHI_INDEX[zhi] + ZHI_INDEX[other_zhi]) // 2]))
+        if distance == 10:
+            result.append(('夹', Zhi[(ZHI_INDEX[zhi] + ZHI_INDEX[other_zhi]) % 12]))
+        if gong and other_zhi + zhi in gong_he and gong_he[other_zhi + zhi] not in zhis[:4]:
+            result.append(('拱', gong_he[other_zhi + zhi]))
+    return tuple(result)
+
+
+def _patterns(zhis, zhis2):
+    all_zhis = set(zhis2)
+    result = []
+    for name, items in PATTERNS:
+        if set(items).issubset(all_zhis) and (name == '天罗地网' or len(set(items) & set(zhis)) == 2):
+            result.append(name)
+    return tuple(result)
+
+
+def _row(kind, year, age, ganzhi, gans, zhis, others, liunian):
+    gan, zhi = ganzhi[0], ganzhi[1]
+    me = gans[2]
+    return Row(
+        kind=kind, year=year, age=age, gan=gan, zhi=zhi,
+        gan_shen=ten_deities[me][gan], zhi_shen=ten_deities[me][zhi],
+        hidden=tuple((item, ten_deities[me][item]) for item in zhi5[zhi]),
+        nayin=NAYIN[PILLAR_INDEX[ganzhi]],
+        fu=(gan, zhi) in zip(gans, zhis),
+        empty=zhi in empties[(gans[2], zhis[2])],
+        he_chong=_he_chong(gan, others[0]),
+        relations=_relations(zhi, others[1], ('破',) if liunian else ()),
+        jia=_jia(gan, zhi, others[0], others[1], gong=liunian),
+        stars=tuple(star_names(gans, zhis, gan, zhi)),
+        patterns=_patterns(zhis, others[1] + [zhi]) if liunian else (),
+    )
+
+
+def timeline(yun, gans, zhis, start_year=None, end_year=None, liunian=True):
+    """逐行生成大运和（liunian 为真时）其下的流年，只含与 [start_year, end_year] 相交的部分。
+
+    gans、zhis 为四柱的天干、地支；流年的关系、夹拱按原局加当步大运计。
+    """
+    for dayun in yun.getDaYun()[1:]:
+        if start_year is not None and dayun.getEndYear() < start_year:
+            continue
+        if end_year is not None and dayun.getStartYear() > end_year:
+            break
+        ganzhi = dayun.getGanZhi()
+        yield _row('大运', dayun.getStartYear(), dayun.getStartAge(), ganzhi, gans, zhis,
+                   (list(gans), list(zhis)), False)
+        if not liunian:
+            continue
+        others = (list(gans) + [ganzhi[0]], list(zhis) + [ganzhi[1]])
+        for item in dayun.getLiuNian():
+            if start_year is not None and item.getYear() < start_year:
+                continue
+            if end_year is not None and item.getYear() > end_year:
+                break
+            yield _row('流年', item.getYear(), item.getAge(), item.getGanZhi(), gans, zhis, others, True)
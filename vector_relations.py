@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+干支关系的 NumPy 批量统计，用于大样本（例如两百年逐时命盘）的人群研究。
+
+detect_all_relationships 每次处理一个命盘 dict。这里一次处理 N 个命盘：
+输入 N×4 或 N×6 的天干、地支编码数组（见 gzcore），按游戏的设置项
+（缺省为开启，同 DEFAULT_SETTINGS 的语义）统计每个命盘每种关系的条数。
+
+    >>> import numpy as np
+    >>> gans, zhis = np.array([[6, 7, 8, 0]]), np.array([[6, 5, 6, 4]])  # 庚午 辛巳 壬午 甲辰
+    >>> result = detect_arrays(gans, zhis, {})
+    >>> {TYPES[seq]: int(n) for seq, n in enumerate(result.counts[0]) if n}
+    {'天干相冲': 1, '地支自刑': 1, '地支半会': 2}
+
+同一命盘的 result.counts[i] 与 relation_counts(detect_all_relationships(...))
+相等。表全部来自 netlify/functions/relation_masks.py，与游戏共用。
+"""
+
+import collections
+import os
+import sys
+
+import numpy as np
+
+# 与 app.py 一样从 netlify/functions 取关系表，放在最后以免遮住顶层的 ganzhi
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'netlify', 'functions'))
+
+from relation_masks import (GAN_RECORDS, ZHI_RECORDS, TRIPLE_PATTERNS, DETECTED_BITS,
+                            settings_mask)
+
+# 关系类型，顺序同 detect_all_relationships 的输出
+TYPES = ('天干五合', '天干相冲', '地支六合', '地支相冲', '地支相刑', '地支自刑', '地支相害', '地支相破',
+         '地支暗合', '地支三合', '地支半合', '地支三会', '地支半会', '地支三刑')
+TYPE_INDEX = {item: seq for seq, item in enumerate(TYPES)}
+
+# bits 的第 k 位表示 counts[:, k] > 0
+Relations = collections.namedtuple("Relations", "bits counts")
+
+_NUM_BITS = DETECTED_BITS.bit_length()
+
+
+def _pair_table(records, size):
+    """(size*size, 类型数, 关系位数) 的 0/1 表：每个干支对有哪些关系。"""
+    table = np.zeros((size * size, len(TYPES), _NUM_BITS), dtype=np.uint8)
+    for cell, items in enumerate(records):
+        for bit, type_, *_ in items:
+            table[cell, TYPE_INDEX[type_], bit.bit_length() - 1] = 1
+    return table
+
+
+def _triple_results():
+    """三合、三会、半合、半会、三刑：(关系位, 模式掩码, 结果掩码, 类型序号, 地支编码)。"""
+    return tuple((pattern.bit, pattern.mask, mask, TYPE_INDEX[result[0]], list(result[4]))
+                 for pattern in TRIPLE_PATTERNS for mask, result in pattern.results.items())
+
+
+_GAN_TABLE = _pair_table(GAN_RECORDS, 10)
+_ZHI_TABLE = _pair_table(ZHI_RECORDS, 12)
+_TRIPLE_RESULTS = _triple_results()
+_BIT_VALUES = 1 << np.arange(_NUM_BITS)
+
+
+def _enabled(table, mask):
+    """按设置掩码把关系位那一维合掉，得到 (格子数, 类型数) 的条数表。"""
+    return (table * ((_BIT_VALUES & mask) > 0)).sum(axis=2, dtype=np.uint8)
+
+
+def detect_arrays(gans, zhis, settings):
+    """Count relations for N charts given as N×4 or N×6 code arrays.
+
+    Returns Relations(bits, counts): counts is an N×len(TYPES) array,
+    bits an N-vector with bit k set when counts[:, k] > 0.
+    """
+    gans = np.asarray(gans, dtype=np.intp)
+    zhis = np.asarray(zhis, dtype=np.intp)
+    if gans.ndim != 2 or gans.shape != zhis.shape or gans.shape[1] not in (4, 6):
+        raise ValueError("need N×4 or N×6 arrays of the same shape: {} {}".format(gans.shape, zhis.shape))
+
+    mask = settings_mask(settings) & DETECTED_BITS
+    gan_table = _enabled(_GAN_TABLE, mask)
+    zhi_table = _enabled(_ZHI_TABLE, mask)
+
+    num_pillars = gans.shape[1]
+    counts = np.zeros((len(gans), len(TYPES)), dtype=np.int16)
+    branch_mask = np.zeros(len(gans), dtype=np.intp)
+    # 每个地支出现的次数：地支重复时三合等按位置组合数计
+    occurrences = np.zeros((len(gans), 12), dtype=np.int16)
+    for i in range(num_pillars):
+        branch_mask |= 1 << zhis[:, i]
+        occurrences[np.arange(len(gans)), zhis[:, i]] += 1
+        for j in range(i + 1, num_pillars):
+            counts += gan_table[gans[:, i] * 10 + gans[:, j]]
+            counts += zhi_table[zhis[:, i] * 12 + zhis[:, j]]
+    for bit, pattern_mask, result_mask, type_index, codes in _TRIPLE_RESULTS:
+        if bit & mask:
+            hit = (branch_mask & pattern_mask) == result_mask
+            counts[:, type_index] += hit * occurrences[:, codes].prod(axis=1, dtype=np.int16)
+
+    bits = ((counts > 0) << np.arange(len(TYPES))).sum(axis=1)
+    return Relations(bits, counts)
+
+
+def relation_counts(relationships):
+    """detect_all_relationships 的结果转为与 detect_arrays 同样的计数向量。"""
+    counts = np.zeros(len(TYPES), dtype=np.int16)
+    for item in relationships:
+        counts[TYPE_INDEX[item['type']]] += 1
+    return counts